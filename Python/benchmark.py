@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Sintetik ma'lumotlarda yuklash va hisobotlar benchmarki: bir nechta hajm bo'yicha
+bosqichlar tezligi va xotirasi, saqlangan bazaviy natija bilan solishtirish.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from config import Config
+
+from main import BigDataApp
+from src.benchmark import BenchmarkSuite, BaselineComparator
+from src.data_loader import DataLoader
+from src.synthetic import SyntheticDataset
+
+logger = logging.getLogger('benchmark')
+
+
+def pipeline_runner(args: argparse.Namespace):
+    """To'liq BigDataApp.run - har bir hajmda schema qayta yaratiladi."""
+
+    def run(rooms_path: str, students_path: str, work_dir: str):
+        config = {
+            'db_host': args.db_host,
+            'db_name': args.db_name,
+            'db_user': args.db_user,
+            'db_password': args.db_password,
+            'db_port': args.db_port,
+            'create_schema': True,
+            'chunk_size': args.chunk_size,
+            'parse_workers': args.parse_workers,
+            'pipeline_depth': args.pipeline_depth,
+            'load_strategy': args.load_strategy,
+            'trace_memory': not args.no_trace_memory,
+            'output_name': os.path.join(work_dir, 'results')
+        }
+        app = BigDataApp(config)
+        app.run(rooms_path=rooms_path, students_path=students_path, output_format='json')
+        return app.metrics
+
+    return run
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description='Sintetik ma\'lumotlarda benchmark',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Misollar:
+  python benchmark.py --scales 10k,100k
+  python benchmark.py --scales 1m --modes in-process,pipeline --save-baseline
+  python benchmark.py --scales 100k,1m --room-distribution zipf --single-gender-rooms 0.3
+  python benchmark.py --scales 2000x500000 --baseline benchmarks/baseline.json
+        """
+    )
+
+    parser.add_argument(
+        '--scales',
+        type=str,
+        default='10k,100k',
+        help=f'Hajmlar: {", ".join(BenchmarkSuite.SCALES)} yoki <xonalar>x<talabalar>, vergul bilan (default: 10k,100k)'
+    )
+
+    parser.add_argument(
+        '--modes',
+        type=str,
+        default='in-process',
+        help='in-process (PostgreSQL siz bosqichlar) va/yoki pipeline (to\'liq yuklash va hisobotlar; '
+             'bazadagi jadvallar qayta yaratiladi!), vergul bilan (default: in-process)'
+    )
+
+    parser.add_argument('--seed', type=int, default=0, help='Generator seed (default: 0)')
+
+    parser.add_argument(
+        '--room-distribution',
+        choices=SyntheticDataset.ROOM_DISTRIBUTIONS,
+        default='uniform',
+        help='Talabalarning xonalar bo\'yicha taqsimoti (default: uniform)'
+    )
+
+    parser.add_argument('--zipf-s', type=float, default=1.1, help='zipf taqsimoti darajasi (default: 1.1)')
+
+    parser.add_argument('--empty-rooms', type=float, default=0.0, help='Bo\'sh xonalar ulushi (default: 0)')
+
+    parser.add_argument('--age-min', type=int, default=16, help='Eng kichik yosh (default: 16)')
+
+    parser.add_argument('--age-max', type=int, default=30, help='Eng katta yosh (default: 30)')
+
+    parser.add_argument(
+        '--room-age-spread',
+        type=int,
+        default=None,
+        help='Bitta xonadagi yoshlar oralig\'i, yil (default: butun oraliq)'
+    )
+
+    parser.add_argument('--male-ratio', type=float, default=0.5, help='Erkaklar ulushi (default: 0.5)')
+
+    parser.add_argument(
+        '--single-gender-rooms',
+        type=float,
+        default=0.0,
+        help='Bir jinsli xonalar ulushi (default: 0)'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=str,
+        default='bench_data',
+        help='Generatsiya qilingan fayllar papkasi - qayta ishlatiladi (default: bench_data)'
+    )
+
+    parser.add_argument(
+        '--work-dir',
+        type=str,
+        default=os.path.join('bench_data', 'work'),
+        help='Benchmark natija fayllari uchun vaqtinchalik papka (default: bench_data/work)'
+    )
+
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=DataLoader.DEFAULT_CHUNK_SIZE,
+        help=f'Bo\'lak hajmi (default: {DataLoader.DEFAULT_CHUNK_SIZE})'
+    )
+
+    parser.add_argument('--parse-workers', type=int, default=1, help='pipeline: parse jarayonlari (default: 1)')
+
+    parser.add_argument(
+        '--pipeline-depth',
+        type=int,
+        default=DataLoader.DEFAULT_PIPELINE_DEPTH,
+        help=f'pipeline: navbatlar chuqurligi (default: {DataLoader.DEFAULT_PIPELINE_DEPTH})'
+    )
+
+    parser.add_argument(
+        '--load-strategy',
+        choices=DataLoader.STRATEGIES,
+        default='auto',
+        help='pipeline: yuklash strategiyasi (default: auto)'
+    )
+
+    parser.add_argument(
+        '--no-trace-memory',
+        action='store_true',
+        help='tracemalloc siz (tezroq, lekin bosqichlar xotirasi o\'lchanmaydi)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='benchmark_results.json',
+        help='Natijalar fayli (default: benchmark_results.json)'
+    )
+
+    parser.add_argument(
+        '--baseline',
+        type=str,
+        default=os.path.join('benchmarks', 'baseline.json'),
+        help='Bazaviy natija fayli (default: benchmarks/baseline.json)'
+    )
+
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Natijalarni bazaviy natija sifatida saqlash (solishtirmasdan)'
+    )
+
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.2,
+        help='Regressiya chegarasi: qator/s yoki xotira shuncha ulushga yomonlashsa (default: 0.2)'
+    )
+
+    parser.add_argument('--verbose', '-v', action='store_true', help='Bosqichlar loglarini ham chiqarish')
+
+    parser.add_argument('--db-host', type=str, default=Config.DB_HOST, help='Database host')
+
+    parser.add_argument('--db-name', type=str, default=Config.DB_NAME, help='Database nomi')
+
+    parser.add_argument('--db-user', type=str, default=Config.DB_USER, help='Database user')
+
+    parser.add_argument('--db-password', type=str, default=Config.DB_PASSWORD, help='Database parol')
+
+    parser.add_argument('--db-port', type=int, default=Config.DB_PORT, help='Database port')
+
+    args = parser.parse_args()
+
+    args.scales = [scale.strip() for scale in args.scales.split(',') if scale.strip()]
+    args.modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    for mode in args.modes:
+        if mode not in BenchmarkSuite.MODES:
+            parser.error(f"Noma'lum rejim: {mode} ({', '.join(BenchmarkSuite.MODES)})")
+    try:
+        for scale in args.scales:
+            BenchmarkSuite.parse_scale(scale)
+    except ValueError as e:
+        parser.error(str(e))
+
+    return args
+
+
+def main():
+    args = parse_arguments()
+
+    if not args.verbose:
+        # main import qilinganda logging sozlangan - faqat benchmark xabarlari qoladi
+        for name in ('src', '__main__', 'main'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    logging.getLogger('src.benchmark').setLevel(logging.INFO)
+
+    suite = BenchmarkSuite(
+        data_dir=args.data_dir,
+        work_dir=args.work_dir,
+        dataset_options={
+            'seed': args.seed,
+            'room_distribution': args.room_distribution,
+            'zipf_s': args.zipf_s,
+            'empty_rooms': args.empty_rooms,
+            'age_min': args.age_min,
+            'age_max': args.age_max,
+            'room_age_spread': args.room_age_spread,
+            'male_ratio': args.male_ratio,
+            'single_gender_rooms': args.single_gender_rooms
+        },
+        chunk_size=args.chunk_size,
+        trace_memory=not args.no_trace_memory,
+        pipeline_runner=pipeline_runner(args)
+    )
+
+    report = suite.run(args.scales, args.modes)
+    suite.print_report(report)
+    suite.save(report, args.output)
+
+    if args.save_baseline:
+        suite.save(report, args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        logger.warning(f"Bazaviy natija topilmadi: {args.baseline} (--save-baseline bilan yarating)")
+        return 0
+
+    comparator = BaselineComparator(tolerance=args.tolerance)
+    regressions = comparator.compare(report, suite.load(args.baseline))
+    comparator.print_regressions(regressions)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import re
 from typing import Dict
 
 
@@ -9,11 +10,54 @@ class Config:
     DB_PASSWORD = os.getenv('DB_PASSWORD', '001106')
     DB_PORT = int(os.getenv('DB_PORT', '5432'))
     
+    # Ulanishlar pooli (0 - poolsiz)
+    DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '0'))
+    DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '0'))
+    
+    # Server tomonidagi kursordan bir marta olinadigan qatorlar soni
+    DB_ITERSIZE = int(os.getenv('DB_ITERSIZE', '2000'))
+    
+    # Bosqichlar uchun PostgreSQL sessiya profillari (set_config). Qiymatni env orqali o'zgartirish:
+    # DB_PROFILE_<BOSQICH>_<SOZLAMA>, masalan DB_PROFILE_REPORTS_WORK_MEM=256MB yoki
+    # DB_PROFILE_REPORTS_STATEMENT_TIMEOUT=5min; bo'sh qiymat sozlamani profildan olib tashlaydi.
+    # DB_SESSION_PROFILES=0 - profillarsiz (server standart sozlamalari)
+    SESSION_PROFILES = {
+        'load': {
+            # Bo'lak commitlari WAL flush ni kutmaydi. Server qulasa oxirgi commitlar yo'qolishi
+            # mumkin, lekin checkpoint bo'lak bilan bitta tranzaksiyada - --resume shu joydan davom etadi
+            'synchronous_commit': 'off',
+            # merge strategiyasidagi staging jadval saralash/xesh amallari uchun
+            'work_mem': '256MB',
+            'statement_timeout': '0'
+        },
+        'index': {
+            'maintenance_work_mem': '512MB',
+            # Indekslar bir nechta ulanishda parallel quriladi - har biriga 2 ta qo'shimcha worker
+            'max_parallel_maintenance_workers': '2',
+            'statement_timeout': '0'
+        },
+        'reports': {
+            # room_id bo'yicha HashAggregate lar (xonalar soni x bir necha o'nlab bayt) va
+            # DISTINCT/ORDER BY saralashlari diskka tushmasligi uchun; har bir parallel worker ga alohida
+            'work_mem': '64MB',
+            'max_parallel_workers_per_gather': '4',
+            # Bo'limlangan students da har bir bo'lim alohida agregatlanadi (hisobotlar room_id bo'yicha)
+            'enable_partitionwise_aggregate': 'on',
+            'enable_partitionwise_join': 'on',
+            'statement_timeout': '0'
+        }
+    }
+    SESSION_PROFILES_ENABLED = os.getenv('DB_SESSION_PROFILES', '1').lower() not in ('0', 'false', 'off', 'no')
+    
     # Fayllar yo'li
     DATA_DIR = 'data'
     SQL_DIR = 'sql'
     OUTPUT_DIR = 'output'
     
+    # Ma'lumotlar avlodi hisoblagichlari (natijalar keshi kaliti) - har bir yuklash --cache-dir
+    # berilmasa ham shu yerdagi baza uchun faylni oshiradi
+    GENERATION_DIR = os.getenv('GENERATION_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'bigdata_app'))
+    
     # Logging
     LOG_FILE = 'bigdata_app.log'
     LOG_LEVEL = 'INFO'
@@ -28,6 +72,32 @@ class Config:
             'port': cls.DB_PORT
         }
     
+    @classmethod
+    def generation_path(cls, host: str, port: int, database: str) -> str:
+        # Har bir server va baza uchun alohida hisoblagich; socket yo'li ham fayl nomiga aylanadi
+        name = re.sub(r'[^\w.-]', '_', f"{host}_{port}_{database}")
+        return os.path.join(cls.GENERATION_DIR, f"generation_{name}")
+    
+    @classmethod
+    def get_session_profiles(cls) -> Dict[str, Dict[str, str]]:
+        """SESSION_PROFILES env dagi DB_PROFILE_<BOSQICH>_<SOZLAMA> qiymatlari bilan."""
+        if not cls.SESSION_PROFILES_ENABLED:
+            return {}
+        
+        profiles = {stage: dict(settings) for stage, settings in cls.SESSION_PROFILES.items()}
+        for key, value in os.environ.items():
+            if not key.startswith('DB_PROFILE_'):
+                continue
+            stage, _, name = key[len('DB_PROFILE_'):].lower().partition('_')
+            if not name:
+                continue
+            settings = profiles.setdefault(stage, {})
+            if value:
+                settings[name] = value
+            else:
+                settings.pop(name, None)
+        return profiles
+    
     @classmethod
     def validate(cls) -> bool:
         required = [cls.DB_HOST, cls.DB_NAME, cls.DB_USER, cls.DB_PASSWORD]
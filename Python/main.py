@@ -10,12 +10,25 @@ import os
 import logging
 from typing import Optional
 
+from config import Config
+
 # Src modullarini import qilish
 from src.database import DatabaseManager
 from src.data_loader import DataLoader
+from src.parallel_loader import ParallelDataLoader
 from src.queries import QueryExecutor
 from src.formatter import ResultFormatter
 from src.indexes import IndexManager
+from src.room_stats import RoomStatsManager
+from src.partitions import StudentPartitions
+from src.manifest import LoadManifest
+from src.checkpoint import LoadCheckpoint, DeadLetter
+from src.index_advisor import IndexAdvisor
+from src.result_cache import DataGeneration, ResultCache
+from src.memory_engine import MemoryReportEngine
+from src.column_cache import ColumnCache
+from src.loader import FileLoader
+from src.metrics import RunMetrics
 
 # Logging sozlash
 logging.basicConfig(
@@ -36,25 +49,104 @@ class BigDataApp:
         self.data_loader: Optional[DataLoader] = None
         self.query_executor: Optional[QueryExecutor] = None
         self.index_manager: Optional[IndexManager] = None
+        self.room_stats: Optional[RoomStatsManager] = None
+        self.result_cache: Optional[ResultCache] = None
+        self.metrics = RunMetrics(
+            profile_dir=self.metrics_dir() if config.get('profile', False) else None,
+            trace_memory=config.get('trace_memory', False)
+        )
     
-    def initialize(self) -> None:
+    def metrics_dir(self) -> Optional[str]:
+        # --profile metrikalar papkasisiz berilsa - standart papka
+        if self.config.get('metrics_dir'):
+            return self.config['metrics_dir']
+        return 'metrics' if self.config.get('profile', False) else None
+    
+    def session_profiles(self) -> dict:
+        """Bosqichlar sessiya profillari: Config/env, ustiga --maintenance-work-mem va --session-setting."""
+        profiles = Config.get_session_profiles() if self.config.get('session_profiles', True) else {}
+        
+        overrides = list(self.config.get('session_settings') or [])
+        if self.config.get('maintenance_work_mem'):
+            overrides.insert(0, f"index.maintenance_work_mem={self.config['maintenance_work_mem']}")
+        for item in overrides:
+            key, sep, value = item.partition('=')
+            stage, dot, name = key.strip().partition('.')
+            if not (sep and dot and stage and name):
+                raise ValueError(f"Noto'g'ri sessiya sozlamasi: {item} (bosqich.nom=qiymat bo'lishi kerak)")
+            profiles.setdefault(stage, {})[name.strip()] = value.strip()
+        return profiles
+    
+    def initialize(self, connect: bool = True) -> None:
         logger.info("=" * 70)
         logger.info("BIGDATA APPLICATION ISHGA TUSHDI")
         logger.info("=" * 70)
 
+        # Avlod hisoblagichi doim baza uchun belgilangan faylda: keshsiz yuklash ham uni oshiradi,
+        # aks holda keyingi --cache-dir ishga tushirish yuklashdan oldingi natijalarni berardi
+        cache_dir = self.config.get('cache_dir')
+        generation = DataGeneration(
+            Config.generation_path(self.config['db_host'], self.config['db_port'], self.config['db_name'])
+        )
+        if self.config.get('result_cache', False) or cache_dir:
+            self.result_cache = ResultCache(
+                generation,
+                max_entries=self.config.get('cache_size', ResultCache.DEFAULT_MAX_ENTRIES),
+                cache_dir=cache_dir
+            )
+        
         self.db_manager = DatabaseManager(
             host=self.config['db_host'],
             database=self.config['db_name'],
             user=self.config['db_user'],
             password=self.config['db_password'],
-            port=self.config['db_port']
+            port=self.config['db_port'],
+            pool_min=self.config.get('pool_min', 0),
+            pool_max=self.config.get('pool_max', 0),
+            generation=generation,
+            itersize=self.config.get('itersize', Config.DB_ITERSIZE),
+            round_trips=self.metrics.round_trips,
+            session_profiles=self.session_profiles()
         )
         
-        self.db_manager.connect()
+        if connect:
+            self.db_manager.connect()
         
-        self.data_loader = DataLoader(self.db_manager)
-        self.query_executor = QueryExecutor(self.db_manager)
-        self.index_manager = IndexManager(self.db_manager)
+        load_workers = self.config.get('load_workers', 1)
+        self.index_manager = IndexManager(
+            self.db_manager,
+            workers=self.config.get('index_workers', 4),
+            concurrently=self.config.get('index_concurrently', False),
+            index_set=self.config.get('index_set', 'default')
+        )
+        
+        loader_options = {
+            'chunk_size': self.config.get('chunk_size', DataLoader.DEFAULT_CHUNK_SIZE),
+            'column_cache': self.column_cache(),
+            'parse_workers': self.config.get('parse_workers', 1),
+            'pipeline_depth': self.config.get('pipeline_depth', DataLoader.DEFAULT_PIPELINE_DEPTH),
+            'checkpoint': LoadCheckpoint(self.db_manager) if self.config.get('resume', False) else None,
+            'dead_letter': self.dead_letter(),
+            'strategy': self.config.get('load_strategy', 'auto'),
+            'manifest': LoadManifest(self.db_manager) if self.config.get('manifest', False) else None,
+            'force_reload': self.config.get('force_reload', False),
+            # Katta yuklashda indekslarni o'chirib, keyin parallel qayta qurish
+            'index_manager': self.index_manager if self.config.get('index_lifecycle', False) else None
+        }
+        if load_workers > 1:
+            self.data_loader = ParallelDataLoader(self.db_manager, workers=load_workers, **loader_options)
+        else:
+            self.data_loader = DataLoader(self.db_manager, **loader_options)
+        self.query_executor = QueryExecutor(
+            self.db_manager,
+            concurrent=self.db_manager.pool_max > 0,
+            combined=self.config.get('combined_reports', False),
+            use_room_stats=self.config.get('room_stats', False),
+            age_mode=self.config.get('age_mode', 'extract'),
+            cache=self.result_cache,
+            metrics=self.metrics
+        )
+        self.room_stats = RoomStatsManager(self.db_manager)
     
     def setup_schema(self) -> None:
         logger.info("Schema yaratish boshlandi...")
@@ -64,65 +156,246 @@ class BigDataApp:
             self.db_manager.create_schema(schema_file)
         else:
             logger.warning(f"Schema fayl topilmadi: {schema_file}")
+        
+        partitions = self.config.get('partitions', 0)
+        if partitions:
+            # Jadval hali bo'sh - migratsiya faqat tuzilmani almashtiradi
+            StudentPartitions(self.db_manager).migrate(partitions)
+    
+    @staticmethod
+    def input_exists(path: str) -> bool:
+        # Fayl, glob yoki shardlar papkasi
+        return all(os.path.exists(p) for p in FileLoader.expand_inputs(path) or [path])
+    
+    @staticmethod
+    def input_bytes(path: str) -> int:
+        return sum(os.path.getsize(p) for p in FileLoader.expand_inputs(path) if os.path.exists(p))
     
-    def load_data(self, rooms_path: str, students_path: str) -> None:
-        if not os.path.exists(rooms_path):
+    def load_data(self, rooms_path: str, students_path: str) -> dict:
+        if not self.input_exists(rooms_path):
             raise FileNotFoundError(f"Rooms fayli topilmadi: {rooms_path}")
         
-        if not os.path.exists(students_path):
+        if not self.input_exists(students_path):
             raise FileNotFoundError(f"Students fayli topilmadi: {students_path}")
         
         stats = self.data_loader.load_all(rooms_path, students_path)
         
         logger.info(f"Yuklandi: {stats['rooms']} xona, {stats['students']} talaba")
+        return stats
+    
+    def setup_room_stats(self) -> None:
+        # Triggerlar yuklashdan oldin o'rnatilishi kerak
+        if not self.room_stats.is_installed():
+            self.room_stats.install('sql/room_stats.sql')
+    
+    def check_room_stats(self) -> None:
+        mismatches = self.room_stats.check_consistency()
+        if mismatches:
+            logger.warning(f"Nomuvofiq xonalar: {[m['room_id'] for m in mismatches[:20]]}")
     
     def create_indexes(self) -> None:
         self.index_manager.create_indexes()
     
     def execute_queries(self) -> dict:
+        if self.config.get('stream_results', False):
+            # Generatorlar - qatorlar server kursoridan to'g'ridan-to'g'ri faylga yoziladi
+            return self.query_executor.iter_all_queries()
         return self.query_executor.execute_all_queries()
     
-    def save_results(self, results: dict, output_format: str, output_file: str) -> None:
+    def output_path(self, output_format: str) -> str:
+        output_file = f"{self.config.get('output_name', 'results')}.{output_format}"
+        if self.config.get('compress', False):
+            output_file += '.gz'
+        return output_file
+    
+    def save_results(self, results: dict, output_format: str, output_file: str) -> dict:
         
         formatter = ResultFormatter()
         
-        if output_format.lower() == 'json':
-            content = formatter.to_json(results)
-        elif output_format.lower() == 'xml':
-            content = formatter.to_xml(results)
-        else:
-            raise ValueError(f"Noto'g'ri format: {output_format}. 'json' yoki 'xml' bo'lishi kerak.")
+        # Oqimli yozish - JSON/XML tuzilishi to_json/to_xml bilan bir xil
+        summary = formatter.write_results(results, output_format, output_file,
+                                          compress=self.config.get('compress', False),
+                                          columns=QueryExecutor.REPORT_COLUMNS)
         
-        formatter.save_to_file(content, output_file)
-        
-        formatter.print_summary(results)
+        formatter.print_stream_summary(summary)
         
         logger.info(f"Natijalar saqlandi: {output_file}")
+        return summary
+    
+    def output_bytes(self, output_format: str, output_file: str, summary: dict) -> int:
+        if output_format == 'csv':
+            paths = [ResultFormatter.csv_path(output_file, name) for name in summary]
+        else:
+            paths = [output_file]
+        return sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+    
+    def write_metrics(self) -> None:
+        """Bosqichlar metrikalari: log xulosasi, JSON run hisoboti va Prometheus fayli."""
+        if self.db_manager:
+            self.metrics.session_profiles = self.db_manager.session_log
+        self.metrics.print_summary()
+        metrics_dir = self.metrics_dir()
+        if not metrics_dir:
+            return
+        
+        settings = ('load_strategy', 'chunk_size', 'load_workers', 'parse_workers', 'pipeline_depth',
+                    'pool_max', 'age_mode', 'combined_reports', 'room_stats', 'resume', 'partitions')
+        self.metrics.write_json(
+            os.path.join(metrics_dir, 'run_report.json'),
+            extra={'config': {key: self.config.get(key) for key in settings}}
+        )
+        self.metrics.write_prometheus(os.path.join(metrics_dir, 'metrics.prom'))
     
     def run(self, rooms_path: str, students_path: str, output_format: str = 'json') -> None:
+        metrics = self.metrics
         try:
-            self.initialize()
+            with metrics.stage('initialize'):
+                self.initialize()
             
             if self.config.get('create_schema', False):
-                self.setup_schema()
+                with metrics.stage('schema'):
+                    self.setup_schema()
             
-            self.load_data(rooms_path, students_path)
+            if self.config.get('room_stats', False):
+                self.setup_room_stats()
             
-            self.create_indexes()
+            # parse / validate+transform / write - yuklash pipeline ining read, transform va write bosqichlari
+            with metrics.stage('load') as stage, self.db_manager.session('load'):
+                stage['bytes_read'] = self.input_bytes(rooms_path) + self.input_bytes(students_path)
+                stats = self.load_data(rooms_path, students_path)
+                stage['rows'] = stats['rooms'] + stats['students']
+            for pipeline in self.data_loader.pipelines.values():
+                metrics.add_pipeline(pipeline, prefix='load')
+            
+            if len(self.data_loader.skipped_tables) == 2:
+                logger.info("Ma'lumotlar o'zgarmagan - to'g'ridan-to'g'ri so'rovlarga o'tiladi")
+            else:
+                with metrics.stage('indexes'):
+                    self.create_indexes()
             
-            results = self.execute_queries()
+            if self.config.get('check_room_stats', False):
+                self.check_room_stats()
             
-            output_file = f"results.{output_format}"
-            self.save_results(results, output_format, output_file)
+            # Hisobotlar (--stream-results da yozish bosqichida o'qiladi) 'reports' profilida
+            with self.db_manager.session('reports'):
+                # Har bir hisobot QueryExecutor ichida report.<nom> bosqichi sifatida o'lchanadi
+                results = self.execute_queries()
+                
+                if self.config.get('cross_check', False):
+                    results = {name: list(rows) for name, rows in results.items()}
+                    with metrics.stage('cross_check'):
+                        self.cross_check(results, rooms_path, students_path)
+                
+                # Formatlash va yozish bitta oqimda (--stream-results da hisobotlar ham shu yerda o'qiladi)
+                output_file = self.output_path(output_format)
+                with metrics.stage('write') as stage:
+                    summary = self.save_results(results, output_format, output_file)
+                    stage['rows'] = sum(entry['count'] for entry in summary.values())
+                    stage['bytes_written'] = self.output_bytes(output_format, output_file, summary)
+                
+                if self.config.get('profile', False):
+                    metrics.explain_files = self.query_executor.explain_reports(
+                        os.path.join(self.metrics_dir(), 'explain')
+                    )
             
+            metrics.status = 'ok'
             logger.info("=" * 70)
             logger.info("DASTUR MUVAFFAQIYATLI YAKUNLANDI!")
             logger.info("=" * 70)
             
         except Exception as e:
+            metrics.status = 'failed'
             logger.error(f"✗ Dastur xatosi: {e}", exc_info=True)
             raise
         
+        finally:
+            self.write_metrics()
+            if self.db_manager:
+                self.db_manager.disconnect()
+    
+    def dead_letter(self) -> Optional[DeadLetter]:
+        path = self.config.get('dead_letter')
+        max_rejects = self.config.get('max_rejects')
+        if path is None and not max_rejects:
+            return None
+        # Faqat --dead-letter berilsa byudjet cheklanmagan - barcha noto'g'ri yozuvlar faylga
+        return DeadLetter(path, max_rejects)
+    
+    def column_cache(self) -> Optional[ColumnCache]:
+        cache_dir = self.config.get('column_cache')
+        if not cache_dir:
+            return None
+        return ColumnCache(cache_dir, chunk_size=self.config.get('chunk_size', DataLoader.DEFAULT_CHUNK_SIZE))
+    
+    def compute_in_memory(self, rooms_path: str, students_path: str, today=None) -> dict:
+        engine = MemoryReportEngine(
+            chunk_size=self.config.get('chunk_size', DataLoader.DEFAULT_CHUNK_SIZE),
+            today=today,
+            column_cache=self.column_cache()
+        )
+        engine.load(rooms_path, students_path)
+        return engine.execute_all()
+    
+    def cross_check(self, results: dict, rooms_path: str, students_path: str) -> None:
+        # Bugungi sana DB dagi CURRENT_DATE bilan bir xil bo'lishi kerak
+        today = self.db_manager.fetch_all("SELECT CURRENT_DATE")[0][0]
+        differences = MemoryReportEngine.diff(results, self.compute_in_memory(rooms_path, students_path, today))
+        
+        if differences:
+            for name, reason in differences.items():
+                logger.warning(f"✗ {name}: DB va memory engine farq qiladi - {reason}")
+        else:
+            logger.info("✓ DB va memory engine natijalari bir xil")
+    
+    def run_memory(self, rooms_path: str, students_path: str, output_format: str = 'json') -> None:
+        """PostgreSQL siz: fayllar NumPy ustunlariga o'qiladi, hisobotlar xotirada hisoblanadi."""
+        for path in (rooms_path, students_path):
+            if not self.input_exists(path):
+                raise FileNotFoundError(f"Fayl topilmadi: {path}")
+        
+        results = self.compute_in_memory(rooms_path, students_path)
+        
+        output_file = self.output_path(output_format)
+        self.save_results(results, output_format, output_file)
+        
+        logger.info("=" * 70)
+        logger.info("DASTUR MUVAFFAQIYATLI YAKUNLANDI!")
+        logger.info("=" * 70)
+    
+    def run_reports(self, output_format: str = 'json') -> None:
+        """Yuklashsiz faqat hisobotlar - keshda bo'lsa PostgreSQL ga ulanilmaydi."""
+        try:
+            self.initialize(connect=False)
+            
+            with self.db_manager.session('reports'):
+                results = self.execute_queries()
+                
+                output_file = self.output_path(output_format)
+                self.save_results(results, output_format, output_file)
+        finally:
+            if self.db_manager:
+                self.db_manager.disconnect()
+    
+    def migrate_partitions(self, partitions: int) -> None:
+        """Mavjud students ni ma'lumotlari bilan boshqa bo'limlar soniga (0 - oddiy jadval) ko'chirish."""
+        try:
+            self.initialize()
+            # Triggerlar va ikkilamchi indekslar eski jadval bilan o'chadi
+            had_room_stats = self.room_stats.is_installed()
+            report = StudentPartitions(self.db_manager).migrate(partitions)
+            if report['rows'] is None:
+                return
+            if had_room_stats:
+                self.setup_room_stats()
+            self.create_indexes()
+        finally:
+            if self.db_manager:
+                self.db_manager.disconnect()
+    
+    def advise_indexes(self, apply: bool = False) -> None:
+        try:
+            self.initialize()
+            IndexAdvisor(self.db_manager).advise(apply=apply)
         finally:
             if self.db_manager:
                 self.db_manager.disconnect()
@@ -147,23 +420,33 @@ Misollar:
     parser.add_argument(
         '--students', '-s',
         type=str,
-        required=True,
-        help='Students JSON fayl yo\'li'
+        help='Students JSON/NDJSON fayl yo\'li, glob yoki shardlar papkasi (.gz, .zst ham)'
     )
     
     parser.add_argument(
         '--rooms', '-r',
         type=str,
-        required=True,
-        help='Rooms JSON fayl yo\'li'
+        help='Rooms JSON/NDJSON fayl yo\'li, glob yoki shardlar papkasi (.gz, .zst ham)'
     )
     
     parser.add_argument(
         '--format', '-f',
         type=str,
-        choices=['json', 'xml'],
+        choices=list(ResultFormatter.FORMATS),
         default='json',
-        help='Chiqish formati (default: json)'
+        help='Chiqish formati; csv da har bir hisobot alohida faylga (default: json)'
+    )
+    
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='Natija faylini gzip bilan siqish (.gz)'
+    )
+    
+    parser.add_argument(
+        '--stream-results',
+        action='store_true',
+        help='Hisobotlarni server kursoridan oqim bilan to\'g\'ridan-to\'g\'ri faylga yozish (keshsiz)'
     )
     
     parser.add_argument(
@@ -172,6 +455,258 @@ Misollar:
         help='Schema yaratish (birinchi marta ishlatish uchun)'
     )
     
+    parser.add_argument(
+        '--partitions',
+        type=int,
+        default=0,
+        help='--create-schema bilan: students ni room_id bo\'yicha N ta hash bo\'limli yaratish (default: 0 - bo\'limsiz)'
+    )
+    
+    parser.add_argument(
+        '--migrate-partitions',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Mavjud students ni ma\'lumotlari bilan N ta hash bo\'limga ko\'chirish (0 - oddiy jadvalga qaytarish)'
+    )
+    
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=DataLoader.DEFAULT_CHUNK_SIZE,
+        help='Fayldan bir martada o\'qiladigan yozuvlar soni (default: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--load-strategy',
+        type=str,
+        choices=DataLoader.STRATEGIES,
+        default='auto',
+        help='Yuklash strategiyasi: auto, upsert yoki merge (staging jadval orqali) (default: auto)'
+    )
+    
+    parser.add_argument(
+        '--manifest',
+        action='store_true',
+        help='O\'zgarmagan fayl va bo\'laklarni (bazadagi xeshlar bo\'yicha) qayta yuklamaslik'
+    )
+    
+    parser.add_argument(
+        '--force-reload',
+        action='store_true',
+        help='Manifestga qaramasdan hamma ma\'lumotni qayta yuklash'
+    )
+    
+    parser.add_argument(
+        '--index-set',
+        type=str,
+        choices=sorted(IndexManager.INDEX_SETS),
+        default='default',
+        help='Yaratiladigan indekslar to\'plami (default: default)'
+    )
+    
+    parser.add_argument(
+        '--advise-indexes',
+        action='store_true',
+        help='Indekslarni EXPLAIN va statistikalar bo\'yicha baholash (yuklashsiz)'
+    )
+    
+    parser.add_argument(
+        '--apply-index-advice',
+        action='store_true',
+        help='--advise-indexes tavsiyasini bazaga qo\'llash'
+    )
+    
+    parser.add_argument(
+        '--index-lifecycle',
+        action='store_true',
+        help='Katta yuklashdan oldin indekslarni o\'chirish va keyin parallel qayta qurish'
+    )
+    
+    parser.add_argument(
+        '--index-workers',
+        type=int,
+        default=4,
+        help='Indekslarni parallel quruvchi ulanishlar soni (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--index-concurrently',
+        action='store_true',
+        help='Indekslarni CREATE INDEX CONCURRENTLY bilan qurish (jadval bloklanmaydi, lekin ketma-ket)'
+    )
+    
+    parser.add_argument(
+        '--maintenance-work-mem',
+        type=str,
+        default=None,
+        help='Indeks qurishda maintenance_work_mem - \'index\' sessiya profilidagini almashtiradi (default: 512MB)'
+    )
+    
+    parser.add_argument(
+        '--session-setting',
+        action='append',
+        default=[],
+        metavar='BOSQICH.NOM=QIYMAT',
+        help='Bosqich sessiya profiliga sozlama (load, index, reports), masalan '
+             'reports.statement_timeout=5min; bir necha marta berish mumkin'
+    )
+    
+    parser.add_argument(
+        '--no-session-profiles',
+        action='store_true',
+        help='Bosqichlar sessiya profillarisiz (server standart sozlamalari)'
+    )
+    
+    parser.add_argument(
+        '--load-workers',
+        type=int,
+        default=1,
+        help='Students ni parallel yuklovchi ulanishlar soni (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=1,
+        help='Shardlar yoki katta NDJSON oraliqlarini parse qiluvchi jarayonlar soni (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--metrics-dir',
+        type=str,
+        default=None,
+        help='Bosqichlar metrikalari papkasi: run_report.json va metrics.prom (Prometheus)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Har bir bosqich uchun cProfile va hisobotlar uchun EXPLAIN (ANALYZE, BUFFERS) '
+             '(--metrics-dir yoki metrics/ papkasiga)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Bo\'laklab commit qilish va checkpointdan (oxirgi commit qilingan bo\'lakdan) davom etish'
+    )
+    
+    parser.add_argument(
+        '--dead-letter',
+        type=str,
+        default=None,
+        help='Noto\'g\'ri yozuvlar yoziladigan NDJSON fayl (yuklash to\'xtatilmaydi)'
+    )
+    
+    parser.add_argument(
+        '--max-rejects',
+        type=int,
+        default=None,
+        help='Xatolar byudjeti: shundan ko\'p noto\'g\'ri yozuv bo\'lsa yuklash to\'xtatiladi '
+             '(default: --dead-letter bilan cheklanmagan, aksincha 0)'
+    )
+    
+    parser.add_argument(
+        '--pipeline-depth',
+        type=int,
+        default=DataLoader.DEFAULT_PIPELINE_DEPTH,
+        help='read -> transform -> write bosqichlari orasidagi navbat hajmi; 0 - ketma-ket '
+             f'(default: {DataLoader.DEFAULT_PIPELINE_DEPTH})'
+    )
+    
+    parser.add_argument(
+        '--combined-reports',
+        action='store_true',
+        help='Barcha hisobotlarni students jadvalini bir marta skanerlab hisoblash'
+    )
+    
+    parser.add_argument(
+        '--age-mode',
+        choices=['extract', 'cutoff'],
+        default='extract',
+        help='Yosh hisoblash: har qatorda AGE() (extract) yoki oldindan hisoblangan sanalar (cutoff)'
+    )
+    
+    parser.add_argument(
+        '--engine',
+        choices=['db', 'memory'],
+        default='db',
+        help='Hisobotlarni PostgreSQL da (db) yoki fayllardan xotirada NumPy bilan (memory) hisoblash'
+    )
+    
+    parser.add_argument(
+        '--cross-check',
+        action='store_true',
+        help='DB natijalarini memory engine natijalari bilan solishtirish'
+    )
+    
+    parser.add_argument(
+        '--column-cache',
+        type=str,
+        default=None,
+        help='students faylining parse qilingan ustunlari keshi papkasi (.npy, mmap bilan o\'qiladi)'
+    )
+    
+    parser.add_argument(
+        '--result-cache',
+        action='store_true',
+        help='Hisobot natijalarini xotirada keshlash (LRU)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help='Natijalar keshining disk qatlami papkasi (qayta ishga tushirishda saqlanadi)'
+    )
+    
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=ResultCache.DEFAULT_MAX_ENTRIES,
+        help=f'Xotiradagi keshda saqlanadigan natijalar soni (default: {ResultCache.DEFAULT_MAX_ENTRIES})'
+    )
+    
+    parser.add_argument(
+        '--reports-only',
+        action='store_true',
+        help='Ma\'lumotlarni yuklamasdan faqat hisobotlarni chiqarish'
+    )
+    
+    parser.add_argument(
+        '--room-stats',
+        action='store_true',
+        help='Hisobotlarni inkremental yangilanadigan room_stats jadvalidan olish'
+    )
+    
+    parser.add_argument(
+        '--check-room-stats',
+        action='store_true',
+        help='room_stats ni to\'liq qayta hisoblash bilan solishtirish'
+    )
+    
+    parser.add_argument(
+        '--pool-min',
+        type=int,
+        default=Config.DB_POOL_MIN,
+        help='Pooldagi minimal ulanishlar soni (default: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--pool-max',
+        type=int,
+        default=Config.DB_POOL_MAX,
+        help='Pooldagi maksimal ulanishlar soni; 0 - poolsiz, hisobotlar ketma-ket (default: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--itersize',
+        type=int,
+        default=Config.DB_ITERSIZE,
+        help='Oqimli o\'qishda server kursoridan bir marta olinadigan qatorlar (default: %(default)s)'
+    )
+    
     parser.add_argument(
         '--db-host',
         type=str,
@@ -207,7 +742,24 @@ Misollar:
         help='Database port (default: 5432)'
     )
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    
+    if not (args.advise_indexes or args.apply_index_advice or args.reports_only
+            or args.migrate_partitions is not None) and not (args.students and args.rooms):
+        parser.error("--students va --rooms majburiy")
+    
+    if args.engine == 'memory' and not (args.students and args.rooms):
+        # Memory engine hisobotlarni faqat fayllardan hisoblaydi - --reports-only da ham
+        parser.error("--engine memory uchun --students va --rooms majburiy")
+    
+    if args.partitions and not args.create_schema:
+        parser.error("--partitions faqat --create-schema bilan ishlaydi (mavjud jadval uchun --migrate-partitions)")
+    
+    for value in (args.partitions, args.migrate_partitions):
+        if value is not None and (value < 0 or value == 1):
+            parser.error("Bo'limlar soni 0 yoki 2 dan katta bo'lishi kerak")
+    
+    return args
 
 
 def main():
@@ -219,10 +771,61 @@ def main():
         'db_user': args.db_user,
         'db_password': args.db_password,
         'db_port': args.db_port,
-        'create_schema': args.create_schema
+        'create_schema': args.create_schema,
+        'partitions': args.partitions,
+        'chunk_size': args.chunk_size,
+        'load_workers': args.load_workers,
+        'parse_workers': args.parse_workers,
+        'pipeline_depth': args.pipeline_depth,
+        'resume': args.resume,
+        'metrics_dir': args.metrics_dir,
+        'profile': args.profile,
+        'dead_letter': args.dead_letter,
+        'max_rejects': args.max_rejects,
+        'load_strategy': args.load_strategy,
+        'manifest': args.manifest,
+        'force_reload': args.force_reload,
+        'index_lifecycle': args.index_lifecycle,
+        'index_set': args.index_set,
+        'index_workers': args.index_workers,
+        'index_concurrently': args.index_concurrently,
+        'maintenance_work_mem': args.maintenance_work_mem,
+        'session_settings': args.session_setting,
+        'session_profiles': not args.no_session_profiles,
+        'pool_min': args.pool_min,
+        'pool_max': args.pool_max,
+        'itersize': args.itersize,
+        'compress': args.compress,
+        'stream_results': args.stream_results,
+        'cross_check': args.cross_check,
+        'column_cache': args.column_cache,
+        'combined_reports': args.combined_reports,
+        'age_mode': args.age_mode,
+        'result_cache': args.result_cache,
+        'cache_dir': args.cache_dir,
+        'cache_size': args.cache_size,
+        'room_stats': args.room_stats,
+        'check_room_stats': args.check_room_stats
     }
     
     app = BigDataApp(config)
+    
+    if args.advise_indexes or args.apply_index_advice:
+        app.advise_indexes(apply=args.apply_index_advice)
+        return
+    
+    if args.migrate_partitions is not None:
+        app.migrate_partitions(args.migrate_partitions)
+        return
+    
+    if args.engine == 'memory':
+        app.run_memory(rooms_path=args.rooms, students_path=args.students, output_format=args.format)
+        return
+    
+    if args.reports_only:
+        app.run_reports(output_format=args.format)
+        return
+    
     app.run(
         rooms_path=args.rooms,
         students_path=args.students,
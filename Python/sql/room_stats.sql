@@ -0,0 +1,298 @@
+-- Xonalar bo'yicha inkremental yig'ma jadval (students triggerlari orqali yangilanadi)
+
+CREATE TABLE IF NOT EXISTS room_stats (
+    room_id INTEGER PRIMARY KEY,
+    student_count BIGINT NOT NULL DEFAULT 0,
+    male_count BIGINT NOT NULL DEFAULT 0,
+    female_count BIGINT NOT NULL DEFAULT 0,
+    min_birthday TIMESTAMP,
+    max_birthday TIMESTAMP,
+    birthday_epoch_sum NUMERIC NOT NULL DEFAULT 0,
+    birth_year_sum BIGINT NOT NULL DEFAULT 0
+);
+
+-- Yillik yoshni aniq hisoblash uchun: tug'ilgan kun (oy, kun, vaqt) kaliti bo'yicha sonlar
+CREATE TABLE IF NOT EXISTS room_birthday_counts (
+    room_id INTEGER NOT NULL,
+    birth_key INTEGER NOT NULL,
+    student_count BIGINT NOT NULL,
+    PRIMARY KEY (room_id, birth_key)
+);
+
+COMMENT ON TABLE room_stats IS 'Per-room summary of students, maintained by triggers';
+COMMENT ON COLUMN room_birthday_counts.birth_key IS '(month * 100 + day) * 2, plus 1 if the birthday has a non-midnight time';
+
+-- Yubiley kalitini hisoblash: bugungi kalitdan katta bo'lsa, bu yil tug'ilgan kun hali kelmagan
+CREATE OR REPLACE FUNCTION room_stats_birth_key(ts TIMESTAMP) RETURNS INTEGER
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT ((EXTRACT(MONTH FROM ts) * 100 + EXTRACT(DAY FROM ts)) * 2
+            + CASE WHEN ts::time > TIME '00:00' THEN 1 ELSE 0 END)::INTEGER
+$$;
+
+CREATE OR REPLACE FUNCTION room_stats_recompute()
+RETURNS TABLE (
+    room_id INTEGER,
+    student_count BIGINT,
+    male_count BIGINT,
+    female_count BIGINT,
+    min_birthday TIMESTAMP,
+    max_birthday TIMESTAMP,
+    birthday_epoch_sum NUMERIC,
+    birth_year_sum BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        s.room_id,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE s.sex = 'M'),
+        COUNT(*) FILTER (WHERE s.sex = 'F'),
+        MIN(s.birthday),
+        MAX(s.birthday),
+        SUM(EXTRACT(EPOCH FROM s.birthday)),
+        SUM(EXTRACT(YEAR FROM s.birthday))::BIGINT
+    FROM students s
+    WHERE s.room_id IS NOT NULL
+    GROUP BY s.room_id
+$$;
+
+CREATE OR REPLACE FUNCTION room_birthday_counts_recompute()
+RETURNS TABLE (room_id INTEGER, birth_key INTEGER, student_count BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT s.room_id, room_stats_birth_key(s.birthday), COUNT(*)
+    FROM students s
+    WHERE s.room_id IS NOT NULL
+    GROUP BY s.room_id, room_stats_birth_key(s.birthday)
+$$;
+
+CREATE OR REPLACE FUNCTION room_stats_on_insert() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Parallel/bulk yuklashda trigger o'chiriladi, keyin to'liq qayta hisoblanadi
+    IF current_setting('room_stats.deferred', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO room_stats AS rs
+    SELECT
+        n.room_id,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE n.sex = 'M'),
+        COUNT(*) FILTER (WHERE n.sex = 'F'),
+        MIN(n.birthday),
+        MAX(n.birthday),
+        SUM(EXTRACT(EPOCH FROM n.birthday)),
+        SUM(EXTRACT(YEAR FROM n.birthday))::BIGINT
+    FROM new_rows n
+    WHERE n.room_id IS NOT NULL
+    GROUP BY n.room_id
+    ORDER BY n.room_id
+    ON CONFLICT (room_id) DO UPDATE SET
+        student_count = rs.student_count + EXCLUDED.student_count,
+        male_count = rs.male_count + EXCLUDED.male_count,
+        female_count = rs.female_count + EXCLUDED.female_count,
+        min_birthday = LEAST(rs.min_birthday, EXCLUDED.min_birthday),
+        max_birthday = GREATEST(rs.max_birthday, EXCLUDED.max_birthday),
+        birthday_epoch_sum = rs.birthday_epoch_sum + EXCLUDED.birthday_epoch_sum,
+        birth_year_sum = rs.birth_year_sum + EXCLUDED.birth_year_sum;
+
+    INSERT INTO room_birthday_counts AS c
+    SELECT n.room_id, room_stats_birth_key(n.birthday), COUNT(*)
+    FROM new_rows n
+    WHERE n.room_id IS NOT NULL
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT (room_id, birth_key) DO UPDATE SET
+        student_count = c.student_count + EXCLUDED.student_count;
+
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION room_stats_on_delete() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('room_stats.deferred', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    -- min/max faqat chegaraviy qiymat o'chirilganda shu xona bo'yicha qayta hisoblanadi
+    UPDATE room_stats rs SET
+        student_count = rs.student_count - d.cnt,
+        male_count = rs.male_count - d.male_cnt,
+        female_count = rs.female_count - d.female_cnt,
+        birthday_epoch_sum = rs.birthday_epoch_sum - d.epoch_sum,
+        birth_year_sum = rs.birth_year_sum - d.year_sum,
+        min_birthday = CASE WHEN d.min_bd <= rs.min_birthday
+            THEN (SELECT MIN(s.birthday) FROM students s WHERE s.room_id = rs.room_id)
+            ELSE rs.min_birthday END,
+        max_birthday = CASE WHEN d.max_bd >= rs.max_birthday
+            THEN (SELECT MAX(s.birthday) FROM students s WHERE s.room_id = rs.room_id)
+            ELSE rs.max_birthday END
+    FROM (
+        SELECT
+            o.room_id,
+            COUNT(*) AS cnt,
+            COUNT(*) FILTER (WHERE o.sex = 'M') AS male_cnt,
+            COUNT(*) FILTER (WHERE o.sex = 'F') AS female_cnt,
+            SUM(EXTRACT(EPOCH FROM o.birthday)) AS epoch_sum,
+            SUM(EXTRACT(YEAR FROM o.birthday))::BIGINT AS year_sum,
+            MIN(o.birthday) AS min_bd,
+            MAX(o.birthday) AS max_bd
+        FROM old_rows o
+        WHERE o.room_id IS NOT NULL
+        GROUP BY o.room_id
+    ) d
+    WHERE rs.room_id = d.room_id;
+
+    UPDATE room_birthday_counts c SET
+        student_count = c.student_count - d.cnt
+    FROM (
+        SELECT o.room_id, room_stats_birth_key(o.birthday) AS birth_key, COUNT(*) AS cnt
+        FROM old_rows o
+        WHERE o.room_id IS NOT NULL
+        GROUP BY 1, 2
+    ) d
+    WHERE c.room_id = d.room_id AND c.birth_key = d.birth_key;
+
+    DELETE FROM room_birthday_counts WHERE student_count = 0;
+
+    RETURN NULL;
+END;
+$$;
+
+-- UPDATE = eski qatorlarni ayirish + yangilarini qo'shish
+CREATE OR REPLACE FUNCTION room_stats_on_update() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('room_stats.deferred', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    -- Qiymati o'zgarmagan qatorlar (masalan faqat name) hisobga olinmaydi
+    UPDATE room_stats rs SET
+        student_count = rs.student_count - d.cnt,
+        male_count = rs.male_count - d.male_cnt,
+        female_count = rs.female_count - d.female_cnt,
+        birthday_epoch_sum = rs.birthday_epoch_sum - d.epoch_sum,
+        birth_year_sum = rs.birth_year_sum - d.year_sum,
+        min_birthday = CASE WHEN d.min_bd <= rs.min_birthday
+            THEN (SELECT MIN(s.birthday) FROM students s WHERE s.room_id = rs.room_id)
+            ELSE rs.min_birthday END,
+        max_birthday = CASE WHEN d.max_bd >= rs.max_birthday
+            THEN (SELECT MAX(s.birthday) FROM students s WHERE s.room_id = rs.room_id)
+            ELSE rs.max_birthday END
+    FROM (
+        SELECT
+            o.room_id,
+            COUNT(*) AS cnt,
+            COUNT(*) FILTER (WHERE o.sex = 'M') AS male_cnt,
+            COUNT(*) FILTER (WHERE o.sex = 'F') AS female_cnt,
+            SUM(EXTRACT(EPOCH FROM o.birthday)) AS epoch_sum,
+            SUM(EXTRACT(YEAR FROM o.birthday))::BIGINT AS year_sum,
+            MIN(o.birthday) AS min_bd,
+            MAX(o.birthday) AS max_bd
+        FROM old_rows o
+        WHERE o.room_id IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM new_rows n
+              WHERE n.id = o.id
+                AND (n.room_id, n.birthday, n.sex) IS NOT DISTINCT FROM (o.room_id, o.birthday, o.sex)
+          )
+        GROUP BY o.room_id
+    ) d
+    WHERE rs.room_id = d.room_id;
+
+    UPDATE room_birthday_counts c SET
+        student_count = c.student_count - d.cnt
+    FROM (
+        SELECT o.room_id, room_stats_birth_key(o.birthday) AS birth_key, COUNT(*) AS cnt
+        FROM old_rows o
+        WHERE o.room_id IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM new_rows n
+              WHERE n.id = o.id
+                AND (n.room_id, n.birthday, n.sex) IS NOT DISTINCT FROM (o.room_id, o.birthday, o.sex)
+          )
+        GROUP BY 1, 2
+    ) d
+    WHERE c.room_id = d.room_id AND c.birth_key = d.birth_key;
+
+    DELETE FROM room_birthday_counts WHERE student_count = 0;
+
+    INSERT INTO room_stats AS rs
+    SELECT
+        n.room_id,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE n.sex = 'M'),
+        COUNT(*) FILTER (WHERE n.sex = 'F'),
+        MIN(n.birthday),
+        MAX(n.birthday),
+        SUM(EXTRACT(EPOCH FROM n.birthday)),
+        SUM(EXTRACT(YEAR FROM n.birthday))::BIGINT
+    FROM new_rows n
+    WHERE n.room_id IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM old_rows o
+          WHERE o.id = n.id
+            AND (o.room_id, o.birthday, o.sex) IS NOT DISTINCT FROM (n.room_id, n.birthday, n.sex)
+      )
+    GROUP BY n.room_id
+    ORDER BY n.room_id
+    ON CONFLICT (room_id) DO UPDATE SET
+        student_count = rs.student_count + EXCLUDED.student_count,
+        male_count = rs.male_count + EXCLUDED.male_count,
+        female_count = rs.female_count + EXCLUDED.female_count,
+        min_birthday = LEAST(rs.min_birthday, EXCLUDED.min_birthday),
+        max_birthday = GREATEST(rs.max_birthday, EXCLUDED.max_birthday),
+        birthday_epoch_sum = rs.birthday_epoch_sum + EXCLUDED.birthday_epoch_sum,
+        birth_year_sum = rs.birth_year_sum + EXCLUDED.birth_year_sum;
+
+    INSERT INTO room_birthday_counts AS c
+    SELECT n.room_id, room_stats_birth_key(n.birthday), COUNT(*)
+    FROM new_rows n
+    WHERE n.room_id IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM old_rows o
+          WHERE o.id = n.id
+            AND (o.room_id, o.birthday, o.sex) IS NOT DISTINCT FROM (n.room_id, n.birthday, n.sex)
+      )
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT (room_id, birth_key) DO UPDATE SET
+        student_count = c.student_count + EXCLUDED.student_count;
+
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION room_stats_on_truncate() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    TRUNCATE room_stats, room_birthday_counts;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_room_stats_insert ON students;
+DROP TRIGGER IF EXISTS trg_room_stats_delete ON students;
+DROP TRIGGER IF EXISTS trg_room_stats_update ON students;
+DROP TRIGGER IF EXISTS trg_room_stats_truncate ON students;
+
+CREATE TRIGGER trg_room_stats_insert
+    AFTER INSERT ON students
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION room_stats_on_insert();
+
+CREATE TRIGGER trg_room_stats_delete
+    AFTER DELETE ON students
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION room_stats_on_delete();
+
+CREATE TRIGGER trg_room_stats_update
+    AFTER UPDATE ON students
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION room_stats_on_update();
+
+CREATE TRIGGER trg_room_stats_truncate
+    AFTER TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION room_stats_on_truncate();
@@ -1,5 +1,10 @@
 DROP TABLE IF EXISTS students CASCADE;
 DROP TABLE IF EXISTS rooms CASCADE;
+DROP TABLE IF EXISTS room_stats;
+DROP TABLE IF EXISTS room_birthday_counts;
+DROP TABLE IF EXISTS load_manifest;
+DROP TABLE IF EXISTS load_manifest_chunks;
+DROP TABLE IF EXISTS load_checkpoints;
 
 CREATE TABLE rooms (
     id INTEGER PRIMARY KEY,
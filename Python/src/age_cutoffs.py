@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+from .database import DatabaseManager
+
+
+class AgeCutoffs:
+    """Yillik yoshni har bir qator uchun AGE() o'rniga oldindan hisoblangan sanalar bilan topish.
+
+    So'rov boshida bugungi sana uchun chegara sanalar bir marta hisoblanadi:
+    T_k - yoshi kamida k bo'lgan eng kech tug'ilgan vaqt. Tug'ilgan sana b uchun
+    yosh = #{k : b <= T_k}, ya'ni saralangan chegaralar massivida width_bucket.
+    Natija EXTRACT(YEAR FROM AGE(b)) bilan aynan bir xil (29-fevral va vaqt qismi ham);
+    oraliqdan tashqaridagi sanalar (kelajak yoki MAX_AGE dan katta) AGE() ga qaytadi.
+    """
+
+    MODES = ('extract', 'cutoff')
+
+    # Chegaralar soni - undan kattalar uchun AGE() ishlatiladi
+    MAX_AGE = 200
+
+    EXTRACT_EXPR = "EXTRACT(YEAR FROM AGE({column}))"
+
+    CUTOFF_EXPR = (
+        "CASE WHEN {column} BETWEEN %(age_lowest)s AND %(age_today)s "
+        "THEN %(age_max)s - width_bucket({column}, %(age_bounds)s::timestamp[]) "
+        "ELSE EXTRACT(YEAR FROM AGE({column})) END"
+    )
+
+    @staticmethod
+    def cutoff(today: date, years: int) -> datetime:
+        """Bugun kamida ``years`` yosh bo'lganlar uchun tug'ilgan vaqtning yuqori chegarasi."""
+        try:
+            return datetime(today.year - years, today.month, today.day)
+        except ValueError:
+            # Bugun 29-fevral, kabisa bo'lmagan yil: 28-fevral kun oxirigacha
+            return datetime(today.year - years, 3, 1) - timedelta(microseconds=1)
+
+    @classmethod
+    def bounds(cls, today: date, max_age: int = MAX_AGE) -> List[datetime]:
+        # width_bucket "<=" ni sanaydi, bizga "T_k >= b" kerak - 1 mikrosekund siljitiladi
+        return [
+            cls.cutoff(today, years) + timedelta(microseconds=1)
+            for years in range(max_age, 0, -1)
+        ]
+
+    @classmethod
+    def params(cls, db_manager: DatabaseManager) -> Dict[str, Any]:
+        """Bugungi sana (server vaqt zonasi bo'yicha) uchun so'rov parametrlari."""
+        return cls.params_for(db_manager.fetch_all("SELECT CURRENT_DATE")[0][0])
+
+    @classmethod
+    def params_for(cls, today: date) -> Dict[str, Any]:
+        bounds = cls.bounds(today)
+        return {
+            'age_today': datetime(today.year, today.month, today.day),
+            'age_lowest': bounds[0],
+            'age_max': len(bounds),
+            'age_bounds': bounds
+        }
+
+    @classmethod
+    def expr(cls, column: str, mode: str = 'cutoff') -> str:
+        template = cls.CUTOFF_EXPR if mode == 'cutoff' else cls.EXTRACT_EXPR
+        return template.format(column=column)
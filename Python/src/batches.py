@@ -0,0 +1,236 @@
+from abc import ABC, abstractmethod
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ixtiyoriy
+    np = None
+
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+US_PER_DAY = 86_400_000_000
+COPY_NULL = '\\N'
+
+
+def datetime_to_us(value: datetime) -> int:
+    """Epoch dan mikrosekundlar (vaqt zonasi bo'lsa tashlab yuboriladi - PostgreSQL timestamp kabi)."""
+    return ((value.toordinal() - EPOCH_ORDINAL) * US_PER_DAY
+            + (value.hour * 3600 + value.minute * 60 + value.second) * 1_000_000
+            + value.microsecond)
+
+
+def us_to_datetime(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+def _escape_copy(text: str) -> str:
+    # COPY text formatidagi maxsus belgilar (_CopyStream bilan bir xil)
+    return (text.replace('\\', '\\\\')
+                .replace('\t', '\\t')
+                .replace('\n', '\\n')
+                .replace('\r', '\\r'))
+
+
+class RecordBatch(ABC):
+    """Ustunli (struct-of-arrays) yozuvlar to'plami: sonlar array da, satrlar bitta bayt uyumida.
+
+    Satrlar uyumi: name_offsets (n + 1 ta) va name_bytes (UTF-8). Har bir qator uchun Python
+    obyektlari faqat rows() yoki copy_text() chaqirilganda yaratiladi.
+    """
+
+    __slots__ = ('ids', 'name_offsets', 'name_bytes')
+
+    def __init__(self, ids: array, name_offsets: array, name_bytes: bytes):
+        self.ids = ids
+        self.name_offsets = name_offsets
+        self.name_bytes = name_bytes
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return self.rows()
+
+    @staticmethod
+    def _heap(names: Iterable[str]) -> Tuple[array, bytes]:
+        encoded = [name.encode('utf-8') for name in names]
+        offsets = array('q', [0])
+        total = 0
+        for item in encoded:
+            total += len(item)
+            offsets.append(total)
+        return offsets, b''.join(encoded)
+
+    def names(self) -> List[str]:
+        heap = self.name_bytes
+        offsets = self.name_offsets
+        return [heap[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in self._arrays()) + len(self.name_bytes)
+
+    def _arrays(self) -> Sequence[array]:
+        return self.ids, self.name_offsets
+
+    @staticmethod
+    def _take_array(values: array, indices: 'np.ndarray') -> array:
+        return array(values.typecode, np.frombuffer(values, dtype=values.typecode).take(indices).tobytes())
+
+    def _take_names(self, indices: Sequence[int]) -> Tuple[array, bytes]:
+        """Berilgan qatorlar ismlari uchun yangi uyum (name_offsets, name_bytes)."""
+        heap, offsets = self.name_bytes, self.name_offsets
+        if np is None:
+            names = [heap[offsets[i]:offsets[i + 1]] for i in indices]
+            name_offsets = array('q', [0])
+            total = 0
+            for name in names:
+                total += len(name)
+                name_offsets.append(total)
+            return name_offsets, b''.join(names)
+
+        bounds = np.frombuffer(offsets, dtype=np.int64)
+        starts = bounds[:-1].take(indices)
+        lengths = bounds[1:].take(indices) - starts
+        name_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=name_offsets[1:])
+        # Har bir yangi bayt o'rni -> eski uyumdagi o'rni (ism boshi + ism ichidagi siljish)
+        positions = np.arange(name_offsets[-1], dtype=np.int64) + np.repeat(starts - name_offsets[:-1], lengths)
+        return array('q', name_offsets.tobytes()), np.frombuffer(heap, dtype=np.uint8).take(positions).tobytes()
+
+    @abstractmethod
+    def rows(self) -> Iterator[tuple]:
+        """Qatorlar Python tuple lari sifatida (execute_batch uchun)."""
+
+    @abstractmethod
+    def copy_text(self) -> str:
+        """Butun to'plam COPY text formatida."""
+
+
+class RoomBatch(RecordBatch):
+    """rooms (id, name) qatorlari."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'RoomBatch':
+        rows = list(rows)
+        offsets, heap = cls._heap(r[1] for r in rows)
+        return cls(array('q', (r[0] for r in rows)), offsets, heap)
+
+    def rows(self) -> Iterator[tuple]:
+        return zip(self.ids, self.names())
+
+    def copy_text(self) -> str:
+        return ''.join(f"{room_id}\t{_escape_copy(name)}\n" for room_id, name in self.rows())
+
+
+class StudentBatch(RecordBatch):
+    """students (id, name, birthday, sex, room_id) qatorlari.
+
+    birthday - epoch dan mikrosekundlar (int64; timestamp ning vaqt qismi ham saqlanadi),
+    sex - 1 = 'M', 0 = 'F', room_id - int32. Xonasizlik alohida no_room niqobida (1 - room_id
+    NULL, room_ids da 0): INTEGER oralig'idagi har qanday son, jumladan manfiylar ham haqiqiy xona.
+    """
+
+    __slots__ = ('birthdays', 'sex', 'room_ids', 'no_room')
+
+    def __init__(self, ids: array, name_offsets: array, name_bytes: bytes,
+                 birthdays: array, sex: array, room_ids: array, no_room: array):
+        super().__init__(ids, name_offsets, name_bytes)
+        self.birthdays = birthdays
+        self.sex = sex
+        self.room_ids = room_ids
+        self.no_room = no_room
+
+    def _arrays(self) -> Sequence[array]:
+        return self.ids, self.name_offsets, self.birthdays, self.sex, self.room_ids, self.no_room
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'StudentBatch':
+        rows = list(rows)
+        offsets, heap = cls._heap(r[1] for r in rows)
+        return cls(
+            array('q', (r[0] for r in rows)),
+            offsets,
+            heap,
+            array('q', (datetime_to_us(r[2]) for r in rows)),
+            array('B', (r[3] == 'M' for r in rows)),
+            array('i', (0 if r[4] is None else r[4] for r in rows)),
+            array('B', (r[4] is None for r in rows))
+        )
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any], start: int = 0, stop: Optional[int] = None) -> 'StudentBatch':
+        """ColumnCache (NumPy/mmap) ustunlari bo'lagidan - qatorma-qator Python obyektlarisiz."""
+        stop = len(columns['id']) if stop is None else stop
+        offsets = columns['name_offsets'][start:stop + 1]
+        base = int(offsets[0]) if len(offsets) else 0
+        end = int(offsets[-1]) if len(offsets) else 0
+        return cls(
+            array('q', columns['id'][start:stop].astype(np.int64).tobytes()),
+            array('q', (offsets - base).astype(np.int64).tobytes()),
+            columns['name_bytes'][base:end].tobytes(),
+            array('q', columns['birthday'][start:stop].astype('datetime64[us]').astype(np.int64).tobytes()),
+            array('B', columns['male'][start:stop].astype(np.uint8).tobytes()),
+            array('i', columns['room_id'][start:stop].astype(np.int32).tobytes()),
+            array('B', columns['no_room'][start:stop].astype(np.uint8).tobytes())
+        )
+
+    def take(self, indices: Sequence[int]) -> 'StudentBatch':
+        """Berilgan qatorlardan (shu tartibda) yangi to'plam - masalan, bo'limlarga ajratishda."""
+        if np is not None:
+            indices = np.asarray(indices, dtype=np.intp)
+            name_offsets, name_bytes = self._take_names(indices)
+            take = self._take_array
+            return StudentBatch(
+                take(self.ids, indices),
+                name_offsets,
+                name_bytes,
+                take(self.birthdays, indices),
+                take(self.sex, indices),
+                take(self.room_ids, indices),
+                take(self.no_room, indices)
+            )
+
+        name_offsets, name_bytes = self._take_names(indices)
+        return StudentBatch(
+            array('q', (self.ids[i] for i in indices)),
+            name_offsets,
+            name_bytes,
+            array('q', (self.birthdays[i] for i in indices)),
+            array('B', (self.sex[i] for i in indices)),
+            array('i', (self.room_ids[i] for i in indices)),
+            array('B', (self.no_room[i] for i in indices))
+        )
+
+    def _birthday_strings(self) -> List[str]:
+        if np is not None:
+            us = np.frombuffer(self.birthdays, dtype=np.int64)
+            return np.datetime_as_string(us.astype('datetime64[us]')).tolist()
+        return [us_to_datetime(us).isoformat() for us in self.birthdays]
+
+    def room_values(self) -> Iterator[Optional[int]]:
+        """room_id qiymatlari, xonasizlar uchun None."""
+        return (None if missing else room for room, missing in zip(self.room_ids, self.no_room))
+
+    def rows(self) -> Iterator[tuple]:
+        return zip(
+            self.ids,
+            self.names(),
+            (us_to_datetime(us) for us in self.birthdays),
+            ('M' if s else 'F' for s in self.sex),
+            self.room_values()
+        )
+
+    def copy_text(self) -> str:
+        return ''.join(
+            f"{student_id}\t{_escape_copy(name)}\t{birthday}\t{'M' if s else 'F'}\t"
+            f"{COPY_NULL if room is None else room}\n"
+            for student_id, name, birthday, s, room in zip(
+                self.ids, self.names(), self._birthday_strings(), self.sex, self.room_values()
+            )
+        )
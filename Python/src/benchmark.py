@@ -0,0 +1,270 @@
+import json
+import os
+import platform
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+from .loader import FileLoader, DataTransformer
+from .formatter import ResultFormatter
+from .metrics import RunMetrics
+from .synthetic import SyntheticDataset
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ixtiyoriy - bo'lmasa memory engine bosqichlari o'tkazib yuboriladi
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# (rooms_path, students_path, work_dir) -> to'liq pipeline metrikalari
+PipelineRunner = Callable[[str, str, str], RunMetrics]
+
+
+class BenchmarkSuite:
+    """Sintetik ma'lumotlarda bir nechta hajm bo'yicha benchmark.
+
+    Rejimlar:
+    - in-process: PostgreSQL siz bosqichlar - parse, parse + transform (StudentBatch),
+      memory engine ga yuklash, hisobotlar va JSON formatlash;
+    - pipeline: BigDataApp.run to'liq (schema qayta yaratiladi!) - pipeline_runner orqali.
+
+    Har bir bosqich uchun RunMetrics yozuvi: devor/CPU vaqti, qator/s, tracemalloc cho'qqisi.
+    """
+
+    # Nom -> (xonalar, talabalar)
+    SCALES = {
+        '10k': (1_000, 10_000),
+        '100k': (10_000, 100_000),
+        '1m': (20_000, 1_000_000),
+        '10m': (100_000, 10_000_000)
+    }
+    MODES = ('in-process', 'pipeline')
+
+    # Hisobotga yoziladigan bosqich maydonlari
+    STAGE_FIELDS = (
+        'wall_seconds', 'cpu_seconds', 'rows', 'rows_per_sec', 'bytes_read', 'bytes_written',
+        'round_trips', 'tracemalloc_peak_bytes', 'peak_rss_bytes',
+        'busy_seconds', 'idle_seconds', 'blocked_seconds'
+    )
+
+    def __init__(self, data_dir: str, work_dir: str, dataset_options: Optional[Dict[str, Any]] = None,
+                 chunk_size: int = FileLoader.DEFAULT_CHUNK_SIZE, trace_memory: bool = True,
+                 pipeline_runner: Optional[PipelineRunner] = None):
+        self.data_dir = data_dir
+        self.work_dir = work_dir
+        self.dataset_options = dataset_options or {}
+        self.chunk_size = chunk_size
+        self.trace_memory = trace_memory
+        self.pipeline_runner = pipeline_runner
+
+    @classmethod
+    def parse_scale(cls, value: str) -> Tuple[str, int, int]:
+        """'1m' kabi nom yoki '<xonalar>x<talabalar>' -> (nom, xonalar, talabalar)."""
+        if value in cls.SCALES:
+            return (value, *cls.SCALES[value])
+        try:
+            rooms, students = (int(part) for part in value.lower().split('x'))
+        except ValueError:
+            raise ValueError(
+                f"Noto'g'ri hajm: {value} - {', '.join(cls.SCALES)} yoki <xonalar>x<talabalar>"
+            ) from None
+        return value, rooms, students
+
+    def dataset(self, rooms: int, students: int) -> SyntheticDataset:
+        return SyntheticDataset(rooms, students, **self.dataset_options)
+
+    @classmethod
+    def stage_summary(cls, metrics: RunMetrics) -> Dict[str, Dict[str, Any]]:
+        return {
+            stage['stage']: {key: stage[key] for key in cls.STAGE_FIELDS if stage.get(key) is not None}
+            for stage in metrics.stages
+        }
+
+    def _run_in_process(self, metrics: RunMetrics, dataset: SyntheticDataset,
+                        rooms_path: str, students_path: str) -> None:
+        with metrics.stage('parse') as stage:
+            stage['bytes_read'] = FileLoader.input_size(students_path)
+            for chunk in FileLoader.iter_json_chunks(students_path, self.chunk_size):
+                stage['rows'] += len(chunk)
+
+        with metrics.stage('parse_transform') as stage:
+            stage['bytes_read'] = FileLoader.input_size(students_path)
+            offset = 0
+            for chunk in FileLoader.iter_json_chunks(students_path, self.chunk_size):
+                batch, rejects = DataTransformer.students_to_batch(chunk, offset)
+                if rejects:
+                    raise ValueError(f"Sintetik ma'lumotlarda noto'g'ri yozuv: {rejects[0]}")
+                stage['rows'] += len(batch)
+                offset += len(chunk)
+
+        if np is None:
+            logger.warning("numpy o'rnatilmagan - memory engine bosqichlari o'tkazib yuborildi")
+            return
+
+        # Import shu yerda: memory engine numpy siz yaratilmaydi
+        from .memory_engine import MemoryReportEngine
+
+        # Hisobot natijalari takrorlanuvchi bo'lishi uchun "bugun" - generatsiya sanasi
+        engine = MemoryReportEngine(chunk_size=self.chunk_size, today=dataset.reference_date)
+        with metrics.stage('memory.load') as stage:
+            stage['bytes_read'] = FileLoader.input_size(rooms_path) + FileLoader.input_size(students_path)
+            loaded = engine.load(rooms_path, students_path)
+            stage['rows'] = loaded['rooms'] + loaded['students']
+
+        with metrics.stage('memory.reports') as stage:
+            results = engine.execute_all()
+            stage['rows'] = sum(len(rows) for rows in results.values())
+
+        output_file = os.path.join(self.work_dir, 'results.json')
+        with metrics.stage('format') as stage:
+            summary = ResultFormatter.write_results(results, 'json', output_file)
+            stage['rows'] = sum(entry['count'] for entry in summary.values())
+            stage['bytes_written'] = os.path.getsize(output_file)
+
+    def run_scale(self, name: str, rooms: int, students: int, modes: List[str]) -> Dict[str, Any]:
+        logger.info("=" * 50)
+        logger.info(f"BENCHMARK: {name} ({rooms} xona, {students} talaba)")
+        logger.info("=" * 50)
+
+        dataset = self.dataset(rooms, students)
+        rooms_path, students_path = dataset.write(self.data_dir)
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        result = {'rooms': rooms, 'students': students, 'dataset': dataset.fingerprint(), 'modes': {}}
+        for mode in modes:
+            if mode == 'in-process':
+                metrics = RunMetrics(trace_memory=self.trace_memory)
+                self._run_in_process(metrics, dataset, rooms_path, students_path)
+            elif mode == 'pipeline':
+                if self.pipeline_runner is None:
+                    raise ValueError("pipeline rejimi uchun pipeline_runner berilmagan")
+                metrics = self.pipeline_runner(rooms_path, students_path, self.work_dir)
+            else:
+                raise ValueError(f"Noma'lum rejim: {mode}")
+            result['modes'][mode] = self.stage_summary(metrics)
+        return result
+
+    def run(self, scales: List[str], modes: List[str]) -> Dict[str, Any]:
+        parsed = [self.parse_scale(scale) for scale in scales]
+        report = {
+            'created_at': datetime.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count()
+            },
+            'options': {
+                **self.dataset(1, 0).spec(),
+                'chunk_size': self.chunk_size,
+                'trace_memory': self.trace_memory
+            },
+            'scales': {}
+        }
+        # Hajmga bog'liq bo'lmagan sozlamalar - bazaviy natija bilan solishtirish uchun
+        for key in ('rooms', 'students'):
+            report['options'].pop(key)
+
+        for name, rooms, students in parsed:
+            report['scales'][name] = self.run_scale(name, rooms, students, modes)
+        return report
+
+    @staticmethod
+    def print_report(report: Dict[str, Any]) -> None:
+        logger.info("=" * 50)
+        logger.info("BENCHMARK NATIJALARI")
+        logger.info("=" * 50)
+        for name, scale in report['scales'].items():
+            for mode, stages in scale['modes'].items():
+                logger.info(f"{name} / {mode}:")
+                for stage, values in stages.items():
+                    if 'wall_seconds' not in values:
+                        continue
+                    memory = values.get('tracemalloc_peak_bytes')
+                    memory_text = f", xotira cho'qqisi {memory / (1 << 20):.1f} MB" if memory is not None else ''
+                    logger.info(
+                        f"  {stage}: {values['wall_seconds']:.3f} s, "
+                        f"{values['rows_per_sec']:.0f} qator/s{memory_text}"
+                    )
+
+    @staticmethod
+    def save(report: Dict[str, Any], path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"✓ Benchmark natijalari yozildi: {path}")
+
+    @staticmethod
+    def load(path: str) -> Dict[str, Any]:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+class BaselineComparator:
+    """Benchmark natijalarini saqlangan bazaviy natija bilan solishtirish.
+
+    Regressiya: qator/s (qatorsiz bosqichlarda devor vaqti) yoki tracemalloc cho'qqisi
+    ``tolerance`` dan ko'proq yomonlashgan. Juda qisqa bosqichlar (``min_seconds`` dan kam)
+    va kichik xotira qiymatlari (``min_memory`` dan kam) shovqin sifatida e'tiborga olinmaydi.
+    """
+
+    def __init__(self, tolerance: float = 0.2, min_seconds: float = 0.05, min_memory: int = 1 << 20):
+        if tolerance < 0:
+            raise ValueError("tolerance manfiy bo'lmasligi kerak")
+        self.tolerance = tolerance
+        self.min_seconds = min_seconds
+        self.min_memory = min_memory
+
+    def _check_stage(self, key: str, current: Dict[str, Any], base: Dict[str, Any]) -> List[Dict[str, Any]]:
+        regressions = []
+        if base.get('wall_seconds', 0) >= self.min_seconds and 'wall_seconds' in current:
+            if base.get('rows') and current.get('rows'):
+                metric, before, after = 'rows_per_sec', base['rows_per_sec'], current['rows_per_sec']
+                worse = after < before * (1 - self.tolerance)
+            else:
+                metric, before, after = 'wall_seconds', base['wall_seconds'], current['wall_seconds']
+                worse = after > before * (1 + self.tolerance)
+            if worse:
+                regressions.append({'stage': key, 'metric': metric, 'baseline': before, 'current': after})
+
+        before, after = base.get('tracemalloc_peak_bytes'), current.get('tracemalloc_peak_bytes')
+        if before is not None and after is not None and max(before, after) >= self.min_memory \
+                and after > before * (1 + self.tolerance):
+            regressions.append({
+                'stage': key, 'metric': 'tracemalloc_peak_bytes', 'baseline': before, 'current': after
+            })
+        return regressions
+
+    def compare(self, report: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if report.get('options') != baseline.get('options'):
+            logger.warning("Bazaviy natija boshqa generator/benchmark sozlamalari bilan olingan - "
+                           "solishtirish taxminiy")
+        if report.get('environment') != baseline.get('environment'):
+            logger.warning("Bazaviy natija boshqa muhitda olingan (python/platforma/CPU)")
+
+        regressions = []
+        for name, scale in report['scales'].items():
+            base_scale = baseline.get('scales', {}).get(name)
+            if base_scale is None:
+                logger.info(f"{name}: bazaviy natijada yo'q - solishtirilmadi")
+                continue
+            if base_scale.get('dataset') != scale.get('dataset'):
+                logger.warning(f"{name}: ma'lumotlar to'plami bazaviy natijadagidan farq qiladi")
+            for mode, stages in scale['modes'].items():
+                base_stages = base_scale.get('modes', {}).get(mode, {})
+                for stage, values in stages.items():
+                    if stage in base_stages:
+                        regressions.extend(self._check_stage(f"{name}/{mode}/{stage}", values, base_stages[stage]))
+        return regressions
+
+    @staticmethod
+    def print_regressions(regressions: List[Dict[str, Any]]) -> None:
+        if not regressions:
+            logger.info("✓ Bazaviy natijaga nisbatan regressiya yo'q")
+            return
+        for regression in regressions:
+            before, after = regression['baseline'], regression['current']
+            change = (after - before) / before * 100 if before else 0.0
+            logger.warning(
+                f"✗ Regressiya: {regression['stage']} {regression['metric']}: "
+                f"{before:.3f} -> {after:.3f} ({change:+.1f}%)"
+            )
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+import logging
+from .database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class LoadCheckpoint:
+    """Bo'laklab commit qilingan yuklashning holati: har bir jadval, fayl va fayl xeshi uchun
+    oxirgi commit qilingan bo'lak oxiri (kirishdagi yozuvlar soni).
+
+    Checkpoint bo'lak ma'lumotlari bilan bitta tranzaksiyada yoziladi, shuning uchun
+    uzilishdan keyin --resume aynan commit qilingan joydan davom etadi.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self._table_ready = False
+
+    def ensure_table(self) -> None:
+        if self._table_ready:
+            return
+        self.db_manager.execute_query("""
+            CREATE TABLE IF NOT EXISTS load_checkpoints (
+                table_name TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                chunk_size INTEGER NOT NULL,
+                records_done BIGINT NOT NULL,
+                rows_loaded BIGINT NOT NULL,
+                rejected BIGINT NOT NULL,
+                completed BOOLEAN NOT NULL DEFAULT false,
+                updated_at TIMESTAMP NOT NULL DEFAULT now(),
+                PRIMARY KEY (table_name, file_path)
+            )
+        """)
+        self._table_ready = True
+
+    def get(self, table: str, file_path: str, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Shu fayl (va xesh) uchun checkpoint; fayl o'zgargan bo'lsa None."""
+        self.ensure_table()
+        rows = self.db_manager.fetch_all(
+            "SELECT chunk_size, records_done, rows_loaded, rejected, completed "
+            "FROM load_checkpoints WHERE table_name = %s AND file_path = %s AND file_hash = %s",
+            (table, file_path, file_hash)
+        )
+        if not rows:
+            return None
+        chunk_size, records_done, rows_loaded, rejected, completed = rows[0]
+        return {
+            'chunk_size': chunk_size,
+            'records_done': records_done,
+            'rows_loaded': rows_loaded,
+            'rejected': rejected,
+            'completed': completed
+        }
+
+    def save(self, table: str, file_path: str, file_hash: str, chunk_size: int, records_done: int,
+             rows_loaded: int, rejected: int, completed: bool = False) -> None:
+        """Checkpointni yozish - commit chaqiruvchida (bo'lak ma'lumotlari bilan birga)."""
+        self.ensure_table()
+        self.db_manager.execute_query("""
+            INSERT INTO load_checkpoints
+                (table_name, file_path, file_hash, chunk_size, records_done, rows_loaded, rejected, completed)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (table_name, file_path) DO UPDATE SET
+                file_hash = EXCLUDED.file_hash,
+                chunk_size = EXCLUDED.chunk_size,
+                records_done = EXCLUDED.records_done,
+                rows_loaded = EXCLUDED.rows_loaded,
+                rejected = EXCLUDED.rejected,
+                completed = EXCLUDED.completed,
+                updated_at = now()
+        """, (table, file_path, file_hash, chunk_size, records_done, rows_loaded, rejected, completed),
+            commit=False)
+
+
+class DeadLetter:
+    """Noto'g'ri yozuvlarni yuklashni to'xtatmasdan NDJSON faylga yozish, xatolar byudjeti bilan.
+
+    Har bir qator: jadval, kirishdagi indeks, id, maydon, sabab va asl yozuv. Noto'g'ri
+    yozuvlar soni ``max_rejects`` dan oshsa yuklash to'xtatiladi (None - cheklanmagan).
+    Fayl yo'li berilmasa yozuvlar faqat sanaladi.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_rejects: Optional[int] = None):
+        if max_rejects is not None and max_rejects < 0:
+            raise ValueError("max_rejects manfiy bo'lmasligi kerak")
+        self.path = path
+        self.max_rejects = max_rejects
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def start(self, kind: str, table: str, rejected: int = 0, records_done: int = 0) -> None:
+        """Jadval yuklashi boshida; resume da oldingi noto'g'ri yozuvlar byudjetga kiradi.
+
+        Fayl checkpointgacha qisqartiriladi: commit qilinmagan bo'laklar qayta parse qilinadi,
+        ularning yozuvlari (indeks >= records_done) ikki marta yozilmasligi kerak.
+        """
+        with self._lock:
+            self.counts[kind] = rejected
+            self._rewind(table, records_done)
+
+    def _rewind(self, table: str, records_done: int) -> None:
+        if self.path is None or not os.path.exists(self.path):
+            return
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        kept = []
+        removed = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get('table') == table and entry.get('index', 0) >= records_done:
+                    removed += 1
+                else:
+                    kept.append(line)
+        if not removed:
+            return
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+        os.replace(temp_path, self.path)
+        logger.info(f"{self.path}: {table} uchun {removed} ta eski yozuv olib tashlandi (qayta yoziladi)")
+
+    def add(self, kind: str, table: str, rejects: List[Dict[str, Any]]) -> None:
+        if not rejects:
+            return
+        with self._lock:
+            if self.path is not None:
+                if self._file is None:
+                    # Resume da oldingi yozuvlar saqlanadi
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                for reject in rejects:
+                    self._file.write(json.dumps({'table': table, **reject}, ensure_ascii=False, default=str))
+                    self._file.write('\n')
+                self._file.flush()
+
+            count = self.counts.get(kind, 0) + len(rejects)
+            self.counts[kind] = count
+            if self.max_rejects is not None and count > self.max_rejects:
+                first = rejects[0]
+                logger.error(f"✗ {kind} #{first['index']} da '{first['field']}' {first['reason']}")
+                raise ValueError(
+                    f"{kind}: noto'g'ri yozuvlar soni {count} ta - xatolar byudjeti ({self.max_rejects}) oshib ketdi"
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def print_statistics(self) -> None:
+        for kind, count in self.counts.items():
+            if count:
+                target = f" -> {self.path}" if self.path else ''
+                logger.warning(f"{kind}: {count} ta noto'g'ri yozuv o'tkazib yuborildi{target}")
@@ -0,0 +1,141 @@
+import bisect
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterator, List, Tuple
+import logging
+from .loader import FileLoader, DataTransformer
+from .batches import StudentBatch
+from .manifest import LoadManifest
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ixtiyoriy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class ColumnCache:
+    """students faylining parse qilingan ustunlari - diskda .npy fayllar, keyingi safar mmap.
+
+    Kesh papkasi manba faylning sha256 xeshi bilan nomlanadi, shuning uchun fayl o'zgarsa
+    yangi kesh quriladi. Har bir ustun alohida .npy (id int64, room_id int32, no_room uint8 -
+    1 bo'lsa room_id NULL va room_id da 0, birthday datetime64[us], male uint8), ismlar esa
+    satrlar uyumida: name_offsets (n + 1 ta int64) va name_bytes (UTF-8 baytlar). Qatorlar
+    fayldagi tartibda.
+
+    Kesh students_to_batch bilan quriladi (oddiy yuklash bilan bir xil tekshiruv): noto'g'ri
+    yozuvlar rejects.json da saqlanadi, 'index' ustuni esa har bir qatorning kirishdagi
+    o'rni - keshdan o'qilganda bo'laklar va rejectlar fayldan o'qishdagidek qaytariladi.
+    """
+
+    VERSION = 3
+    ARRAYS = ('id', 'room_id', 'no_room', 'birthday', 'male', 'name_offsets', 'name_bytes', 'index')
+
+    def __init__(self, cache_dir: str = '.column_cache', chunk_size: int = FileLoader.DEFAULT_CHUNK_SIZE):
+        if np is None:
+            raise ImportError("ustunli kesh uchun numpy o'rnatilgan bo'lishi kerak")
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
+
+    def _entry_dir(self, file_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"students-{file_hash}")
+
+    def _is_valid(self, entry_dir: str) -> bool:
+        try:
+            with open(os.path.join(entry_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        return meta.get('version') == self.VERSION and all(
+            os.path.exists(os.path.join(entry_dir, name))
+            for name in [f"{name}.npy" for name in self.ARRAYS] + ['rejects.json']
+        )
+
+    def build_students(self, file_path: str, entry_dir: str) -> int:
+        ids, rooms, no_room, birthdays, male, lengths, names, positions = [], [], [], [], [], [], [], []
+        rejects: List[Dict[str, Any]] = []
+        offset = 0
+        for chunk in FileLoader.iter_json_chunks(file_path, self.chunk_size):
+            batch, chunk_rejects = DataTransformer.students_to_batch(chunk, offset)
+            rejected = {r['index'] for r in chunk_rejects}
+            rejects.extend(chunk_rejects)
+            ids.append(np.frombuffer(batch.ids, dtype=np.int64))
+            rooms.append(np.frombuffer(batch.room_ids, dtype=np.int32))
+            no_room.append(np.frombuffer(batch.no_room, dtype=np.uint8))
+            birthdays.append(np.frombuffer(batch.birthdays, dtype=np.int64).view('datetime64[us]'))
+            male.append(np.frombuffer(batch.sex, dtype=np.uint8))
+            lengths.append(np.diff(np.frombuffer(batch.name_offsets, dtype=np.int64)))
+            names.append(batch.name_bytes)
+            positions.append(np.fromiter(
+                (i for i in range(offset, offset + len(chunk)) if i not in rejected),
+                dtype=np.int64, count=len(batch)
+            ))
+            offset += len(chunk)
+
+        def joined(parts: List['np.ndarray'], dtype: str) -> 'np.ndarray':
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+        arrays = {
+            'id': joined(ids, 'int64'),
+            'room_id': joined(rooms, 'int32'),
+            'no_room': joined(no_room, 'uint8'),
+            'birthday': joined(birthdays, 'datetime64[us]'),
+            'male': joined(male, 'uint8'),
+            'name_offsets': np.concatenate(([0], np.cumsum(joined(lengths, 'int64')))).astype(np.int64),
+            'name_bytes': np.frombuffer(b''.join(names), dtype=np.uint8),
+            'index': joined(positions, 'int64')
+        }
+
+        # Yarim yozilgan kesh ishlatilmasligi uchun vaqtinchalik papkaga yozib, keyin nomini o'zgartiramiz
+        tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        with open(os.path.join(tmp_dir, 'rejects.json'), 'w', encoding='utf-8') as f:
+            json.dump(rejects, f, ensure_ascii=False, default=str)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'source': os.path.abspath(file_path),
+                       'rows': len(arrays['id']), 'rejects': len(rejects)}, f)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        return len(arrays['id'])
+
+    def load_students(self, file_path: str) -> Tuple[Dict[str, 'np.ndarray'], List[Dict[str, Any]]]:
+        """Ustunlar (mmap bilan) va noto'g'ri yozuvlar; kesh bo'lmasa yoki eskirgan bo'lsa avval qurish."""
+        file_hash, _ = LoadManifest.file_hash(file_path)
+        entry_dir = self._entry_dir(file_hash)
+
+        if self._is_valid(entry_dir):
+            logger.info(f"✓ {file_path}: ustunli kesh topildi (mmap)")
+        else:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            rows = self.build_students(file_path, entry_dir)
+            logger.info(f"✓ {file_path}: ustunli kesh qurildi ({rows} ta qator)")
+
+        columns = {
+            name: np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode='r')
+            for name in self.ARRAYS
+        }
+        with open(os.path.join(entry_dir, 'rejects.json'), 'r', encoding='utf-8') as f:
+            rejects = json.load(f)
+        return columns, rejects
+
+    @staticmethod
+    def iter_student_chunks(columns: Dict[str, 'np.ndarray'], rejects: List[Dict[str, Any]], chunk_size: int,
+                            start: int = 0) -> Iterator[Tuple[StudentBatch, List[Dict[str, Any]], int]]:
+        """Loaderlar uchun (StudentBatch, rejectlar, bo'lak oxiri) - JSON parse va qatorma-qator obyektlarsiz.
+
+        Bo'laklar kirish yozuvlari bo'yicha (``start`` - o'tkaziladigan yozuvlar soni), fayldan
+        o'qishdagi bilan bir xil chegaralarda.
+        """
+        positions = columns['index']
+        reject_positions = [r['index'] for r in rejects]
+        total = len(positions) + len(rejects)
+        for begin in range(start, total, chunk_size):
+            end = min(begin + chunk_size, total)
+            first, last = np.searchsorted(positions, [begin, end])
+            chunk_rejects = rejects[bisect.bisect_left(reject_positions, begin):
+                                    bisect.bisect_left(reject_positions, end)]
+            yield StudentBatch.from_columns(columns, int(first), int(last)), chunk_rejects, end
@@ -1,66 +1,551 @@
-from typing import Dict
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import logging
+import psycopg2.errors
 from .database import DatabaseManager
 from .loader import FileLoader, DataTransformer
+from .manifest import LoadManifest
+from .indexes import IndexManager
+from .column_cache import ColumnCache
+from .parallel_parser import ParallelParser
+from .pipeline import LoadPipeline
+from .checkpoint import LoadCheckpoint, DeadLetter
+from .batches import RecordBatch, RoomBatch, StudentBatch
+from .partitions import StudentPartitions
+
+# (batch, rejectlar, bo'lak oxiri - kirishdagi yozuvlar soni)
+ChunkResult = Tuple[RecordBatch, List[Dict[str, Any]], int]
 
 logger = logging.getLogger(__name__)
 
 
 class DataLoader:
+    ROOM_COLUMNS = ('id', 'name')
+    STUDENT_COLUMNS = ('id', 'name', 'birthday', 'sex', 'room_id')
+    DEFAULT_CHUNK_SIZE = FileLoader.DEFAULT_CHUNK_SIZE
+    # read -> transform -> write navbatlari hajmi; 0 - bosqichlar bitta oqimda ketma-ket
+    DEFAULT_PIPELINE_DEPTH = 4
+    
+    ROOM_UPSERT = """
+        INSERT INTO rooms (id, name)
+        VALUES (%s, %s)
+        ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name
+    """
+    
+    STUDENT_UPSERT = """
+        INSERT INTO students (id, name, birthday, sex, room_id)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (id) DO UPDATE SET 
+            name = EXCLUDED.name,
+            birthday = EXCLUDED.birthday,
+            sex = EXCLUDED.sex,
+            room_id = EXCLUDED.room_id
+    """
+    
+    # auto - bo'sh jadvalga COPY, aks holda qatorma-qator upsert
+    # upsert - har doim qatorma-qator upsert
+    # merge - bo'sh bo'lmagan jadvalga staging jadval orqali to'plamli upsert
+    # Barcha strategiyalarda faylda takroriy id bo'lsa oxirgi yozuv qoladi: COPY takroriy id da
+    # bekor qilinadi va yuklash merge bilan qaytariladi
+    STRATEGIES = ('auto', 'upsert', 'merge')
+    
+    # COPY ni merge ga almashtiradigan xatolar (takroriy id)
+    DUPLICATE_ERRORS = (psycopg2.errors.UniqueViolation,)
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 strategy: str = 'auto', manifest: Optional[LoadManifest] = None,
+                 force_reload: bool = False, index_manager: Optional[IndexManager] = None,
+                 column_cache: Optional[ColumnCache] = None, parse_workers: int = 1,
+                 pipeline_depth: int = DEFAULT_PIPELINE_DEPTH,
+                 checkpoint: Optional[LoadCheckpoint] = None, dead_letter: Optional[DeadLetter] = None):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Noto'g'ri yuklash strategiyasi: {strategy}")
         self.db_manager = db_manager
         self.file_loader = FileLoader()
         self.transformer = DataTransformer()
+        self.chunk_size = chunk_size
+        self.strategy = strategy
+        self.manifest = manifest
+        self.force_reload = force_reload
+        self.index_manager = index_manager
+        self.column_cache = column_cache
+        # Shardlar / bayt oraliqlari jarayonlar pulida parse qilinadi
+        self.parser = ParallelParser(parse_workers, chunk_size) if parse_workers > 1 else None
+        self.pipeline_depth = pipeline_depth
+        self.pipelines: Dict[str, LoadPipeline] = {}
+        # Bo'laklab commit va --resume (checkpoint berilgan bo'lsa)
+        self.checkpoint = checkpoint
+        # Noto'g'ri yozuvlar yuklashni to'xtatmaydi - dead-letter faylga, byudjet doirasida
+        self.dead_letter = dead_letter
+        self.merge_stats: Dict[str, Dict[str, int]] = {}
+        # students hash bo'limlari (load_students boshida aniqlanadi; bo'sh - oddiy jadval)
+        self.partitions: List[str] = []
+        self.skipped_tables: List[str] = []
+        self._manifest_runs: Dict[str, Dict[str, Any]] = {}
+        self._checkpoint_runs: Dict[str, Dict[str, Any]] = {}
     
-    def load_rooms(self, file_path: str) -> int:
-        logger.info("=" * 50)
-        logger.info("ROOMS MA'LUMOTLARINI YUKLASH BOSHLANDI")
-        logger.info("=" * 50)
+    def _check_rejects(self, kind: str, rejects: List[Dict[str, Any]]) -> None:
+        if not rejects:
+            return
+        if self.dead_letter is not None:
+            self.dead_letter.add(kind, kind.lower(), rejects)
+            return
+        first = rejects[0]
+        logger.error(f"✗ {kind} #{first['index']} da '{first['field']}' {first['reason']}")
+        raise ValueError(f"{kind} ma'lumotlari noto'g'ri formatda")
+    
+    def _restart_rejects(self, kind: str, table: str) -> None:
+        # Bekor qilingan o'tishdagi noto'g'ri yozuvlar qayta o'qishda yana qo'shiladi
+        if self.dead_letter is not None:
+            self.dead_letter.start(kind, table)
+    
+    @staticmethod
+    def _close(*sources: Any) -> None:
+        # Tashlab ketilgan generatorlar (pipeline oqimlari, jarayonlar puli) shu yerda yopiladi
+        for source in sources:
+            close = getattr(source, 'close', None)
+            if close is not None:
+                close()
+    
+    def _begin_manifest(self, table: str, file_path: str) -> bool:
+        """Manifest bilan solishtirish; fayl o'zgarmagan bo'lsa False (yuklash shart emas)."""
+        if self.manifest is None:
+            return True
+        
+        file_hash, file_size = LoadManifest.file_hash(file_path)
+        previous = self.manifest.get_file(table)
+        # Jadval tozalangan yoki bo'lak o'lchami o'zgargan bo'lsa manifestga ishonib bo'lmaydi
+        usable = (
+            previous is not None
+            and not self.force_reload
+            and previous['chunk_size'] == self.chunk_size
+            and not self.db_manager.is_table_empty(table)
+        )
         
-        rooms_data = self.file_loader.load_json(file_path)
+        if usable and previous['file_hash'] == file_hash:
+            logger.info(f"✓ {file_path} o'zgarmagan - {table} yuklash o'tkazib yuborildi")
+            self.skipped_tables.append(table)
+            return False
         
-        if not self.file_loader.validate_rooms(rooms_data):
-            raise ValueError("Rooms ma'lumotlari noto'g'ri formatda")
+        self._manifest_runs[table] = {
+            'file_hash': file_hash,
+            'file_size': file_size,
+            'known': self.manifest.get_chunk_hashes(table) if usable else {},
+            'seen': {}
+        }
+        return True
+    
+    def _finish_manifest(self, table: str, file_path: str) -> None:
+        run = self._manifest_runs.pop(table, None)
+        if run is not None:
+            self.manifest.save(table, file_path, run['file_hash'], run['file_size'],
+                               self.chunk_size, run['seen'])
+    
+    def _prepare_indexes(self, file_path: str) -> None:
+        """Katta students yuklashidan oldin indekslarni o'chirish (index_manager berilgan bo'lsa)."""
+        if self.index_manager is None:
+            return
         
-        rooms_tuples = self.transformer.transform_rooms(rooms_data)
+        run = self._manifest_runs.get('students')
+        if (run and run['known']) or (self.strategy == 'merge' and not self.db_manager.is_table_empty('students')):
+            # Manifest yoki merge orqali delta yuklash - indekslar joyida qoladi
+            logger.info("Delta yuklash - indekslar joyida qoladi")
+            return
+        
+        self.index_manager.prepare_for_load(self.file_loader.estimate_record_count(file_path))
+    
+    def _finish_indexes(self) -> None:
+        if self.index_manager is not None:
+            self.index_manager.finish_load()
+    
+    def _iter_chunks(self, file_path: str, table: str, skip: int = 0) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """(offset, bo'lak) juftliklari; manifest bo'lsa o'zgarmagan bo'laklar tashlab ketiladi.
         
-        insert_query = """
-            INSERT INTO rooms (id, name)
-            VALUES (%s, %s)
-            ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name
+        skip - resume da allaqachon commit qilingan yozuvlar soni (parse qilinmasdan o'tkaziladi).
         """
+        run = self._manifest_runs.get(table)
+        offset = 0
+        
+        if run is None and not skip:
+            for chunk in self.file_loader.iter_json_chunks(file_path, self.chunk_size):
+                yield offset, chunk
+                offset += len(chunk)
+            return
+        
+        if run is None:
+            records = self.file_loader.iter_json(file_path, raw=True)
+            offset = sum(1 for _ in islice(records, skip))
+            while True:
+                raw_chunk = list(islice(records, self.chunk_size))
+                if not raw_chunk:
+                    return
+                yield offset, self.file_loader.parse_raw(raw_chunk)
+                offset += len(raw_chunk)
         
-        self.db_manager.execute_batch(insert_query, rooms_tuples)
+        skipped = 0
+        for chunk_no, raw_chunk in enumerate(self.file_loader.iter_raw_chunks(file_path, self.chunk_size)):
+            digest = LoadManifest.chunk_hash(text for text, _ in raw_chunk)
+            run['seen'][chunk_no] = (digest, len(raw_chunk))
+            end = offset + len(raw_chunk)
+            if run['known'].get(chunk_no) == digest:
+                skipped += 1
+            elif end > skip:
+                start = max(skip - offset, 0)
+                yield offset + start, self.file_loader.parse_raw(raw_chunk[start:])
+            offset = end
         
-        logger.info(f"✓ {len(rooms_tuples)} ta xona yuklandi")
-        return len(rooms_tuples)
+        if skipped:
+            logger.info(f"✓ {table}: {skipped} ta o'zgarmagan bo'lak o'tkazib yuborildi")
     
-    def load_students(self, file_path: str) -> int:
+    def _chunk_batch(self, table: str, item: Tuple[int, List[Dict[str, Any]]]) -> ChunkResult:
+        offset, chunk = item
+        to_batch = self.transformer.rooms_to_batch if table == 'rooms' else self.transformer.students_to_batch
+        batch, rejects = to_batch(chunk, offset)
+        return batch, rejects, offset + len(chunk)
+    
+    def _iter_cached_students(self, file_path: str, skip: int = 0) -> Iterator[ChunkResult]:
+        # Ustunli keshdan - JSON parse siz; kesh qurilganda topilgan rejectlar o'z bo'lagida qaytariladi
+        columns, rejects = self.column_cache.load_students(file_path)
+        yield from ColumnCache.iter_student_chunks(columns, rejects, self.chunk_size, start=skip)
+    
+    def _pipelined(self, table: str, source: Iterator[Any],
+                   transform: Optional[Callable[[Any], ChunkResult]]) -> Iterator[ChunkResult]:
+        """read -> transform -> write bosqichlarini navbatlar orqali parallel ishlatish."""
+        if self.pipeline_depth < 1:
+            return map(transform, source) if transform else source
+        
+        pipeline = LoadPipeline(table, self.pipeline_depth)
+        self.pipelines[table] = pipeline
+        stages = [('transform', transform)] if transform else []
+        return pipeline.run(source, stages)
+    
+    def _iter_chunk_results(self, table: str, file_path: str, skip: int = 0) -> Iterator[ChunkResult]:
+        """Jadval bo'laklari manbai: ustunli kesh, jarayonlar puli yoki ketma-ket o'qish."""
+        manifest_run = table in self._manifest_runs
+        if table == 'students' and self.column_cache is not None and not manifest_run:
+            return self._pipelined(table, self._iter_cached_students(file_path, skip), None)
+        # Manifest bo'laklari butun kirish bo'yicha ketma-ket xeshlanadi, resume esa yozuvlarni
+        # o'tkazib yuborishi kerak - ikkalasi ham faqat bitta jarayonda
+        if self.parser is not None and not manifest_run and not skip:
+            return self._pipelined(table, self.parser.iter_results(table, file_path), None)
+        return self._pipelined(table, self._iter_chunks(file_path, table, skip), partial(self._chunk_batch, table))
+    
+    def _accepted(self, kind: str, results: Iterator[ChunkResult]) -> Iterator[RecordBatch]:
+        for batch, rejects, _ in results:
+            self._check_rejects(kind, rejects)
+            yield batch
+    
+    def iter_room_batches(self, file_path: str) -> Iterator[RoomBatch]:
+        return self._accepted('Rooms', self._iter_chunk_results('rooms', file_path))
+    
+    def iter_student_batches(self, file_path: str) -> Iterator[StudentBatch]:
+        return self._accepted('Students', self._iter_chunk_results('students', file_path))
+    
+    def _begin_checkpoint(self, table: str, kind: str, file_path: str) -> Optional[int]:
+        """Resume uchun o'tkaziladigan yozuvlar soni; jadval shu fayldan to'liq yuklangan bo'lsa None."""
+        if self.checkpoint is None:
+            if self.dead_letter is not None:
+                self.dead_letter.start(kind, table)
+            return 0
+        
+        manifest_run = self._manifest_runs.get(table)
+        file_hash = manifest_run['file_hash'] if manifest_run else LoadManifest.file_hash(file_path)[0]
+        state = self.checkpoint.get(table, file_path, file_hash)
+        # Jadval tozalangan bo'lsa checkpointga ishonib bo'lmaydi
+        usable = state is not None and not self.force_reload and not self.db_manager.is_table_empty(table)
+        
+        run = {'file_hash': file_hash, 'records_done': 0, 'rows_loaded': 0, 'rejected': 0}
+        if usable and state['completed']:
+            logger.info(f"✓ {file_path} checkpoint bo'yicha to'liq yuklangan - {table} o'tkazib yuborildi")
+            self.skipped_tables.append(table)
+            return None
+        if usable:
+            run.update(records_done=state['records_done'], rows_loaded=state['rows_loaded'],
+                       rejected=state['rejected'])
+            logger.info(
+                f"{table}: checkpointdan davom etiladi - {state['records_done']} ta yozuv "
+                f"({state['rows_loaded']} ta qator) avval commit qilingan"
+            )
+        
+        self._checkpoint_runs[table] = run
+        if self.dead_letter is not None:
+            self.dead_letter.start(kind, table, run['rejected'], run['records_done'])
+        return run['records_done']
+    
+    def _finish_checkpoint(self, table: str, file_path: str) -> None:
+        run = self._checkpoint_runs.pop(table, None)
+        if run is None:
+            return
+        try:
+            self.checkpoint.save(table, file_path, run['file_hash'], self.chunk_size, run['records_done'],
+                                 run['rows_loaded'], run['rejected'], completed=True)
+            self.db_manager.commit()
+        except Exception:
+            self.db_manager.rollback()
+            raise
+    
+    def _is_partitioned(self, table: str) -> bool:
+        # Bo'limlangan students da id bo'yicha unikal indeks yo'q - ON CONFLICT (id) ishlamaydi
+        return table == 'students' and bool(self.partitions)
+    
+    def _has_duplicate_ids(self, table: str) -> bool:
+        # Bo'limlangan students da unikal id yo'q - COPY takroriy id ni rad etmaydi
+        if not self._is_partitioned(table):
+            return False
+        rows = self.db_manager.fetch_all(f"SELECT EXISTS (SELECT 1 FROM {table} GROUP BY id HAVING COUNT(*) > 1)")
+        return bool(rows[0][0])
+    
+    def _merge_partitioned(self, table: str, staging: str, columns: tuple) -> Tuple[int, int, int]:
+        """ON CONFLICT siz merge: o'zgargan qatorlar o'chiriladi, yangi/o'zgarganlari qo'shiladi.
+        
+        Xonasi o'zgargan talaba boshqa bo'limga o'tadi - o'chirib qo'shish buni ham qamraydi.
+        """
+        column_list = ', '.join(columns)
+        changed = ', '.join(f"t.{c}" for c in columns if c != 'id')
+        incoming = ', '.join(f"s.{c}" for c in columns if c != 'id')
+        db = self.db_manager
+        
+        # Faylda bir id bir necha marta bo'lsa, oxirgisi qoladi
+        db.execute_query(f"""
+            DELETE FROM {staging} a USING {staging} b
+            WHERE a.id = b.id AND a.staging_seq < b.staging_seq
+        """, commit=False)
+        updated = db.fetch_all(f"""
+            WITH removed AS (
+                DELETE FROM {table} t USING {staging} s
+                WHERE t.id = s.id AND ({changed}) IS DISTINCT FROM ({incoming})
+                RETURNING 1
+            )
+            SELECT COUNT(*) FROM removed
+        """)[0][0]
+        added, total = db.fetch_all(f"""
+            WITH added AS (
+                INSERT INTO {table} ({column_list})
+                SELECT {column_list} FROM {staging} s
+                WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE t.id = s.id)
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM added), (SELECT COUNT(*) FROM {staging})
+        """)[0]
+        return total, added - updated, updated
+    
+    def _merge_batches(self, table: str, columns: tuple, batches: Iterator[RecordBatch],
+                       commit: bool = True) -> int:
+        """Vaqtinchalik staging jadvalga COPY, keyin faqat o'zgargan qatorlarni yangilovchi bitta upsert.
+        
+        Staging - sessiyaga xos TEMP jadval (ON COMMIT DROP): parallel merge yuklashlar bir-birining
+        qatorlarini ko'rmaydi. commit=False - checkpoint rejimida bo'lak bo'yicha: commit
+        chaqiruvchida, statistika yig'iladi.
+        """
+        staging = f"{table}_staging"
+        column_list = ', '.join(columns)
+        values = ', '.join(f"s.{c}" for c in columns)
+        updates = ',\n'.join(f"{c} = EXCLUDED.{c}" for c in columns if c != 'id')
+        changed = ', '.join(f"t.{c}" for c in columns if c != 'id')
+        incoming = ', '.join(f"EXCLUDED.{c}" for c in columns if c != 'id')
+        
+        merge_query = f"""
+            WITH latest AS (
+                -- Faylda bir id bir necha marta bo'lsa, oxirgisi olinadi
+                SELECT DISTINCT ON (s.id) {values}
+                FROM {staging} s
+                ORDER BY s.id, s.staging_seq DESC
+            ),
+            merged AS (
+                INSERT INTO {table} AS t ({column_list})
+                SELECT * FROM latest s
+                ON CONFLICT (id) DO UPDATE SET
+                    {updates}
+                WHERE ({changed}) IS DISTINCT FROM ({incoming})
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                (SELECT COUNT(*) FROM latest),
+                COUNT(*) FILTER (WHERE inserted),
+                COUNT(*) FILTER (WHERE NOT inserted)
+            FROM merged
+        """
+        
+        db = self.db_manager
+        try:
+            # Chaqiruvchi tranzaksiyasi ichida (commit=False) - bir tranzaksiyada qayta chaqirilsa tozalanadi
+            db.execute_query(f"""
+                CREATE TEMP TABLE IF NOT EXISTS {staging} (
+                    LIKE {table} INCLUDING DEFAULTS,
+                    staging_seq BIGINT GENERATED ALWAYS AS IDENTITY
+                ) ON COMMIT DROP
+            """, commit=False)
+            db.execute_query(f"TRUNCATE {staging}", commit=False)
+            db.bulk_copy(staging, columns, batches, commit=False)
+            if self._is_partitioned(table):
+                total, inserted, updated = self._merge_partitioned(table, staging, columns)
+            else:
+                total, inserted, updated = db.fetch_all(merge_query)[0]
+            if commit:
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        stats = {
+            'total': total,
+            'inserted': inserted,
+            'updated': updated,
+            'unchanged': total - inserted - updated
+        }
+        if not commit:
+            previous = self.merge_stats.get(table)
+            if previous is not None:
+                stats = {key: previous[key] + value for key, value in stats.items()}
+            self.merge_stats[table] = stats
+            return total
+        
+        self.merge_stats[table] = stats
+        logger.info(
+            f"✓ {table} merge: {inserted} ta qo'shildi, {updated} ta yangilandi, "
+            f"{total - inserted - updated} ta o'zgarmagan"
+        )
+        return total
+    
+    def _copy_chunk(self, table: str, columns: tuple, batch: RecordBatch) -> bool:
+        """Bo'lakni COPY (commit chaqiruvchida); takroriy id bo'lsa tranzaksiya bekor qilinib False."""
+        try:
+            self.db_manager.bulk_copy(table, columns, batch, commit=False)
+            return True
+        except self.DUPLICATE_ERRORS:
+            logger.warning(f"{table}: takroriy id - bo'lak va qolgan bo'laklar merge bilan yuklanadi "
+                           f"(oxirgi yozuv qoladi)")
+            return False
+    
+    def _load_batches(self, table: str, columns: tuple, insert_query: str,
+                      batches: Iterator[RecordBatch]) -> int:
+        if self.strategy == 'merge' or self._is_partitioned(table):
+            return self._merge_batches(table, columns, batches)
+        
+        count = 0
+        for batch in batches:
+            self.db_manager.execute_batch(insert_query, batch)
+            count += len(batch)
+        return count
+    
+    def _load_checkpointed(self, table: str, kind: str, columns: tuple, insert_query: str,
+                           file_path: str, results: Iterator[ChunkResult]) -> int:
+        """Har bir bo'lak checkpoint bilan birga alohida tranzaksiyada commit qilinadi."""
+        db = self.db_manager
+        run = self._checkpoint_runs[table]
+        # Bo'limlangan jadvalda bo'lak COPY si oldingi bo'laklardagi takroriy id ni sezmaydi - doim merge
+        use_copy = self.strategy != 'upsert' and not self._is_partitioned(table) and db.is_table_empty(table)
+        merge = (self.strategy == 'merge' or self._is_partitioned(table)) and not use_copy
+        if merge:
+            self.merge_stats.pop(table, None)
+        
+        count = 0
+        for batch, rejects, end in results:
+            self._check_rejects(kind, rejects)
+            try:
+                copied = False
+                if len(batch) and use_copy:
+                    copied = self._copy_chunk(table, columns, batch)
+                    if not copied:
+                        # Oldingi bo'laklar commit qilingan - shu bo'lakdan boshlab merge
+                        use_copy, merge = False, True
+                        self.merge_stats.pop(table, None)
+                if len(batch) and not copied:
+                    if merge:
+                        self._merge_batches(table, columns, [batch], commit=False)
+                    else:
+                        db.execute_batch(insert_query, batch, commit=False)
+                self.checkpoint.save(table, file_path, run['file_hash'], self.chunk_size, end,
+                                     run['rows_loaded'] + len(batch), run['rejected'] + len(rejects))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            run['records_done'] = end
+            run['rows_loaded'] += len(batch)
+            run['rejected'] += len(rejects)
+            count += len(batch)
+        
+        if merge and table in self.merge_stats:
+            stats = self.merge_stats[table]
+            logger.info(
+                f"✓ {table} merge: {stats['inserted']} ta qo'shildi, {stats['updated']} ta yangilandi, "
+                f"{stats['unchanged']} ta o'zgarmagan"
+            )
+        return count
+    
+    def _load_table(self, table: str, kind: str, columns: tuple, insert_query: str,
+                    file_path: str, skip: int) -> int:
+        results = self._iter_chunk_results(table, file_path, skip)
+        if table in self._checkpoint_runs:
+            return self._load_checkpointed(table, kind, columns, insert_query, file_path, results)
+        if self.strategy == 'upsert' or not self.db_manager.is_table_empty(table):
+            return self._load_batches(table, columns, insert_query, self._accepted(kind, results))
+        
+        # Bo'sh jadvalga COPY orqali tezroq yuklaymiz
+        batches = self._accepted(kind, results)
+        try:
+            count = self.db_manager.bulk_copy(table, columns, batches, commit=False)
+            if not self._has_duplicate_ids(table):
+                self.db_manager.commit()
+                return count
+            self.db_manager.rollback()
+        except self.DUPLICATE_ERRORS:
+            self._close(batches, results)
+        
+        # COPY bitta tranzaksiyada bekor qilingan - fayl qayta o'qilib merge (oxirgi yozuv qoladi)
+        logger.warning(f"{table}: faylda takroriy id - COPY bekor qilindi, merge bilan qayta yuklanadi")
+        self._restart_rejects(kind, table)
+        results = self._iter_chunk_results(table, file_path, skip)
+        return self._merge_batches(table, columns, self._accepted(kind, results))
+    
+    def load_rooms(self, file_path: str) -> int:
         logger.info("=" * 50)
-        logger.info("STUDENTS MA'LUMOTLARINI YUKLASH BOSHLANDI")
+        logger.info("ROOMS MA'LUMOTLARINI YUKLASH BOSHLANDI")
         logger.info("=" * 50)
-        students_data = self.file_loader.load_json(file_path)
         
-        if not self.file_loader.validate_students(students_data):
-            raise ValueError("Students ma'lumotlari noto'g'ri formatda")
+        if not self._begin_manifest('rooms', file_path):
+            return 0
+        skip = self._begin_checkpoint('rooms', 'Rooms', file_path)
+        if skip is None:
+            return 0
         
-        students_tuples = self.transformer.transform_students(students_data)
+        try:
+            count = self._load_table('rooms', 'Rooms', self.ROOM_COLUMNS, self.ROOM_UPSERT, file_path, skip)
+        finally:
+            # Xatolikda ham - oldingi bo'laklar commit qilingan bo'lishi mumkin
+            self.db_manager.generation.bump()
+        self._finish_checkpoint('rooms', file_path)
+        self._finish_manifest('rooms', file_path)
         
-        insert_query = """
-            INSERT INTO students (id, name, birthday, sex, room_id)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (id) DO UPDATE SET 
-                name = EXCLUDED.name,
-                birthday = EXCLUDED.birthday,
-                sex = EXCLUDED.sex,
-                room_id = EXCLUDED.room_id
-        """
+        logger.info(f"✓ {count} ta xona yuklandi")
+        return count
+    
+    def load_students(self, file_path: str) -> int:
+        logger.info("=" * 50)
+        logger.info("STUDENTS MA'LUMOTLARINI YUKLASH BOSHLANDI")
+        logger.info("=" * 50)
         
-        self.db_manager.execute_batch(insert_query, students_tuples)
+        if not self._begin_manifest('students', file_path):
+            return 0
+        skip = self._begin_checkpoint('students', 'Students', file_path)
+        if skip is None:
+            return 0
         
-        logger.info(f"✓ {len(students_tuples)} ta talaba yuklandi")
-        return len(students_tuples)
+        self.partitions = StudentPartitions(self.db_manager).partitions()
+        self._prepare_indexes(file_path)
+        try:
+            count = self._load_table('students', 'Students', self.STUDENT_COLUMNS, self.STUDENT_UPSERT,
+                                     file_path, skip)
+        finally:
+            self._finish_indexes()
+            self.db_manager.generation.bump()
+        self._finish_checkpoint('students', file_path)
+        self._finish_manifest('students', file_path)
+        
+        logger.info(f"✓ {count} ta talaba yuklandi")
+        return count
     
     def load_all(self, rooms_path: str, students_path: str) -> Dict[str, int]:
         logger.info("=" * 50)
@@ -69,14 +554,19 @@ class DataLoader:
         
         stats = {}
         
-        stats['rooms'] = self.load_rooms(rooms_path)
-        
-        # Keyin students ni yuklaymiz
-        stats['students'] = self.load_students(students_path)
+        try:
+            stats['rooms'] = self.load_rooms(rooms_path)
+            
+            # Keyin students ni yuklaymiz
+            stats['students'] = self.load_students(students_path)
+        finally:
+            if self.dead_letter is not None:
+                self.dead_letter.close()
+                self.dead_letter.print_statistics()
         
         logger.info("=" * 50)
         logger.info("YUKLASH YAKUNLANDI")
         logger.info(f"Jami yuklandi: {stats['rooms']} ta xona, {stats['students']} ta talaba")
         logger.info("=" * 50)
         
-        return stats
\ No newline at end of file
+        return stats
@@ -1,49 +1,242 @@
+import io
+import itertools
+import threading
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
 from psycopg2.extras import execute_batch
-from typing import List
+from psycopg2.pool import ThreadedConnectionPool
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
 import logging
+from .result_cache import DataGeneration
+from .batches import RecordBatch
+from .metrics import RoundTripCounter
 
 # Logging sozlash
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class _CopyStream(io.RawIOBase):
+    """Qatorlarni (yoki RecordBatch to'plamlarini) COPY text formatiga bo'laklab kodlab beruvchi oqim."""
+
+    def __init__(self, rows: Iterable[tuple]):
+        super().__init__()
+        self._rows: Iterator[tuple] = iter(rows)
+        self._buffer = bytearray()
+        self.row_count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    @staticmethod
+    def _encode_value(value) -> str:
+        if value is None:
+            return '\\N'
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        text = str(value)
+        # COPY text formatidagi maxsus belgilar
+        return (text.replace('\\', '\\\\')
+                    .replace('\t', '\\t')
+                    .replace('\n', '\\n')
+                    .replace('\r', '\\r'))
+
+    def _fill(self, size: int) -> None:
+        while len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            if isinstance(row, RecordBatch):
+                # Ustunli to'plam o'zi butun bo'lakni COPY matniga kodlaydi
+                self._buffer += row.copy_text().encode('utf-8')
+                self.row_count += len(row)
+                continue
+            line = '\t'.join(self._encode_value(v) for v in row) + '\n'
+            self._buffer += line.encode('utf-8')
+            self.row_count += 1
+
+    def readinto(self, b) -> int:
+        self._fill(len(b))
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        del self._buffer[:n]
+        return n
+
+
 class DatabaseManager:
-    def __init__(self, host: str, database: str, user: str, password: str, port: int = 5432):
+    COPY_BUFFER_SIZE = 1 << 16
+    BATCH_PAGE_SIZE = 1000
+    # Server tomonidagi kursordan bir marta olinadigan qatorlar soni
+    DEFAULT_ITERSIZE = 2000
+    _cursor_ids = itertools.count(1)
+
+    def __init__(self, host: str, database: str, user: str, password: str, port: int = 5432,
+                 pool_min: int = 0, pool_max: int = 0, generation: Optional[DataGeneration] = None,
+                 itersize: int = DEFAULT_ITERSIZE, round_trips: Optional[RoundTripCounter] = None,
+                 session_profiles: Optional[Dict[str, Dict[str, str]]] = None,
+                 session_stage: Optional[str] = None):
         self.host = host
         self.database = database
         self.user = user
         self.password = password
         self.port = port
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+        self.itersize = itersize
+        # Ma'lumotlar avlodi - natijalar keshi kaliti uchun (klonlar bilan umumiy)
+        self.generation = generation if generation is not None else DataGeneration()
+        # Serverga so'rovlar soni (metrikalar uchun, klonlar bilan umumiy)
+        self.round_trips = round_trips if round_trips is not None else RoundTripCounter()
+        # Bosqich -> sessiya sozlamalari; session_stage - hozir amaldagi profil
+        self.session_profiles = session_profiles or {}
+        self.session_stage = session_stage
+        # Bosqich -> serverdan o'qilgan amaldagi qiymatlar (run hisoboti uchun)
+        self.session_log: Dict[str, Dict[str, str]] = {}
         self.connection = None
         self.cursor = None
+        self.pool = None
+        self._pool_slots = None
+    
+    def _connect_params(self) -> dict:
+        return {
+            'host': self.host,
+            'database': self.database,
+            'user': self.user,
+            'password': self.password,
+            'port': self.port
+        }
     
     def connect(self) -> None:
         try:
-            self.connection = psycopg2.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                port=self.port
-            )
+            self.connection = psycopg2.connect(**self._connect_params())
             self.cursor = self.connection.cursor()
             logger.info(f"✓ Database ga muvaffaqiyatli ulanildi: {self.database}")
+            if self.session_stage in self.session_profiles:
+                self.apply_session()
+            
+            if self.pool_max > 0:
+                self.pool = ThreadedConnectionPool(self.pool_min, self.pool_max, **self._connect_params())
+                # Pool tugaganda xatolik o'rniga kutish uchun
+                self._pool_slots = threading.BoundedSemaphore(self.pool_max)
+                logger.info(f"✓ Ulanishlar pooli yaratildi: {self.pool_min}..{self.pool_max}")
         except psycopg2.Error as e:
             logger.error(f"✗ Database ga ulanishda xatolik: {e}")
             raise
     
     def disconnect(self) -> None:
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
         if self.cursor:
             self.cursor.close()
         if self.connection:
             self.connection.close()
             logger.info("✓ Database dan uzilindi")
     
-    def execute_query(self, query: str, params: tuple = None) -> None:
+    def clone(self) -> 'DatabaseManager':
+        """Xuddi shu parametrlar bilan yangi (ulanmagan, poolsiz) manager."""
+        return DatabaseManager(self.host, self.database, self.user, self.password, self.port,
+                               generation=self.generation, itersize=self.itersize,
+                               round_trips=self.round_trips, session_profiles=self.session_profiles,
+                               session_stage=self.session_stage)
+    
+    @contextmanager
+    def pooled(self) -> Iterator['DatabaseManager']:
+        """Alohida ulanishga bog'langan manager olish (thread-safe).
+        
+        Pool bo'lsa ulanish pooldan olinadi va qaytariladi, aks holda yangi ulanish ochiladi.
+        """
+        db = self.clone()
+        
+        if self.pool is None:
+            db.connect()
+            try:
+                yield db
+            finally:
+                db.disconnect()
+            return
+        
+        self._pool_slots.acquire()
+        try:
+            connection = self.pool.getconn()
+            try:
+                db.connection = connection
+                db.cursor = connection.cursor()
+                if db.session_profiles:
+                    # Pooldagi ulanishda oldingi bosqich sozlamalari qolgan bo'lishi mumkin
+                    db.apply_session()
+                yield db
+            finally:
+                db.cursor.close()
+                if connection.closed:
+                    self.pool.putconn(connection, close=True)
+                else:
+                    # Tugallanmagan tranzaksiya poolga qaytmasligi kerak
+                    connection.rollback()
+                    self.pool.putconn(connection)
+        finally:
+            self._pool_slots.release()
+    
+    def apply_session(self) -> None:
+        """Joriy bosqich profilini shu ulanishga qo'llash (oldingi sozlamalar RESET ALL bilan).
+        
+        Ulanishda chaqiruvchining ochiq tranzaksiyasi bo'lsa commit qilinmaydi (aks holda u ikkiga
+        bo'linardi) - sozlamalar o'sha tranzaksiya bilan birga commit yoki rollback bo'ladi.
+        """
+        settings = self.session_profiles.get(self.session_stage, {})
+        query = 'RESET ALL' + ''.join('; SELECT set_config(%s, %s, false)' for _ in settings)
+        params = tuple(itertools.chain.from_iterable(settings.items()))
+        idle = self.connection.status == psycopg2.extensions.STATUS_READY
+        self.execute_query(query, params or None, commit=idle)
+    
+    def _record_session(self, stage: str) -> None:
+        names = list(self.session_profiles[stage])
+        rows = self.fetch_all("SELECT name, current_setting(name) FROM unnest(%s::text[]) AS name", (names,))
+        self.session_log[stage] = dict(rows)
+        logger.info(f"✓ '{stage}' sessiya profili: " + ', '.join(f"{name}={value}" for name, value in rows))
+    
+    @contextmanager
+    def session(self, stage: str) -> Iterator[None]:
+        """Bosqich sessiya profili: shu ulanishda va shu vaqtda pooldan olinadigan ulanishlarda.
+        
+        Profil sozlanmagan yoki allaqachon amalda bo'lsa hech narsa qilinmaydi.
+        """
+        if stage not in self.session_profiles or stage == self.session_stage:
+            yield
+            return
+        
+        previous = self.session_stage
+        self.session_stage = stage
+        if self.connection is not None:
+            self.apply_session()
+            self._record_session(stage)
+        try:
+            yield
+        finally:
+            self.session_stage = previous
+            if self.connection is not None and not self.connection.closed:
+                try:
+                    self.apply_session()
+                except psycopg2.Error as e:
+                    # Bosqich xatosini yashirmaslik uchun
+                    logger.warning(f"Sessiya sozlamalarini qaytarib bo'lmadi: {e}")
+    
+    def commit(self) -> None:
+        self.round_trips.add()
+        self.connection.commit()
+    
+    def rollback(self) -> None:
+        self.round_trips.add()
+        self.connection.rollback()
+    
+    def execute_query(self, query: str, params: tuple = None, commit: bool = True) -> None:
         try:
+            self.round_trips.add()
             self.cursor.execute(query, params)
-            self.connection.commit()
+            if commit:
+                self.commit()
         except psycopg2.Error as e:
             self.connection.rollback()
             logger.error(f"✗ So'rov bajarishda xatolik: {e}")
@@ -51,22 +244,68 @@ class DatabaseManager:
     
     def fetch_all(self, query: str, params: tuple = None) -> List[tuple]:
         try:
+            self.round_trips.add()
             self.cursor.execute(query, params)
             return self.cursor.fetchall()
         except psycopg2.Error as e:
             logger.error(f"✗ Ma'lumot olishda xatolik: {e}")
             raise
     
-    def execute_batch(self, query: str, data: List[tuple]) -> None:
+    def fetch_iter(self, query: str, params: tuple = None, itersize: Optional[int] = None) -> Iterator[tuple]:
+        """Natijani nomli (server tomonidagi) kursor orqali bo'laklab o'qish.
+        
+        Xotirada bir vaqtda faqat ``itersize`` ta qator turadi. Kursor ochiq tranzaksiya
+        ichida yashaydi - iteratsiya tugamaguncha shu ulanishda boshqa so'rov bajarilmasin.
+        """
+        name = f"fetch_iter_{next(self._cursor_ids)}"
         try:
-            execute_batch(self.cursor, query, data, page_size=1000)
-            self.connection.commit()
+            with self.connection.cursor(name=name) as cursor:
+                cursor.itersize = itersize or self.itersize
+                self.round_trips.add()
+                cursor.execute(query, params)
+                # DECLARE dan keyin har bir itersize bo'lak - alohida FETCH
+                for index, row in enumerate(cursor):
+                    if index % cursor.itersize == 0:
+                        self.round_trips.add()
+                    yield row
+        except psycopg2.Error as e:
+            logger.error(f"✗ Ma'lumot olishda xatolik: {e}")
+            raise
+    
+    def execute_batch(self, query: str, data: Union[List[tuple], RecordBatch], commit: bool = True) -> None:
+        try:
+            execute_batch(self.cursor, query, data, page_size=self.BATCH_PAGE_SIZE)
+            self.round_trips.add(-(-len(data) // self.BATCH_PAGE_SIZE))
+            if commit:
+                self.commit()
             logger.info(f"✓ {len(data)} ta yozuv yuklandi")
         except psycopg2.Error as e:
             self.connection.rollback()
             logger.error(f"✗ Batch yuklashda xatolik: {e}")
             raise
     
+    def bulk_copy(self, table: str, columns: Sequence[str], rows: Union[Iterable[tuple], Iterable[RecordBatch]],
+                  commit: bool = True) -> int:
+        if isinstance(rows, RecordBatch):
+            rows = [rows]
+        stream = _CopyStream(rows)
+        copy_sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        try:
+            self.round_trips.add()
+            self.cursor.copy_expert(copy_sql, stream, size=self.COPY_BUFFER_SIZE)
+            if commit:
+                self.commit()
+            logger.info(f"✓ COPY orqali {stream.row_count} ta yozuv yuklandi: {table}")
+            return stream.row_count
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            logger.error(f"✗ COPY yuklashda xatolik: {e}")
+            raise
+    
+    def is_table_empty(self, table: str) -> bool:
+        rows = self.fetch_all(f"SELECT NOT EXISTS (SELECT 1 FROM {table})")
+        return bool(rows[0][0])
+    
     def create_schema(self, schema_file: str) -> None:
         try:
             with open(schema_file, 'r', encoding='utf-8') as f:
@@ -86,7 +325,12 @@ class DatabaseManager:
     def clear_tables(self) -> None:
         try:
             self.cursor.execute("TRUNCATE TABLE students, rooms CASCADE")
+            # Yuklash manifesti ham tozalanadi, aks holda keyingi yuklash o'tkazib yuborilardi
+            self.cursor.execute("SELECT to_regclass('load_manifest') IS NOT NULL")
+            if self.cursor.fetchone()[0]:
+                self.cursor.execute("TRUNCATE TABLE load_manifest, load_manifest_chunks")
             self.connection.commit()
+            self.generation.bump()
             logger.info("✓ Jadvallar tozalandi")
         except psycopg2.Error as e:
             self.connection.rollback()
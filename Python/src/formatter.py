@@ -1,7 +1,11 @@
+import csv
+import gzip
 import json
+import os
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
-from typing import Dict, List, Any
+from xml.sax.saxutils import escape, quoteattr
+from typing import Any, Dict, IO, Iterable, List, Optional, Sequence
 import logging
 
 logger = logging.getLogger(__name__)
@@ -42,6 +46,141 @@ class ResultFormatter:
             logger.error(f"✗ XML ga o'tkazishda xatolik: {e}")
             raise
     
+    # Oqimli yozuvchilar: natijalar qatorma-qator faylga yoziladi, to'liq matn xotirada
+    # yig'ilmaydi. JSON va XML hujjat tuzilishi to_json/to_xml bilan bir xil.
+    FORMATS = ('json', 'xml', 'ndjson', 'csv')
+    
+    @staticmethod
+    def open_output(file_path: str, compress: bool = False) -> IO[str]:
+        if compress:
+            return gzip.open(file_path, 'wt', encoding='utf-8', newline='')
+        return open(file_path, 'w', encoding='utf-8', newline='')
+    
+    @staticmethod
+    def _track(summary: Dict[str, Dict[str, Any]], query_name: str,
+               rows: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        entry = summary[query_name] = {'count': 0, 'first': None}
+        for item in rows:
+            if entry['count'] == 0:
+                entry['first'] = item
+            entry['count'] += 1
+            yield item
+    
+    @staticmethod
+    def write_json(data: Dict[str, Iterable[Dict[str, Any]]], f: IO[str]) -> Dict[str, Dict[str, Any]]:
+        summary: Dict[str, Dict[str, Any]] = {}
+        f.write('{')
+        for q, (query_name, query_results) in enumerate(data.items()):
+            f.write(',\n' if q else '\n')
+            f.write(f'  {json.dumps(query_name, ensure_ascii=False)}: [')
+            count = 0
+            for item in ResultFormatter._track(summary, query_name, query_results):
+                f.write(',\n' if count else '\n')
+                item_json = json.dumps(item, indent=2, ensure_ascii=False)
+                f.write('\n'.join('    ' + line for line in item_json.split('\n')))
+                count += 1
+            f.write('\n  ]' if count else ']')
+        f.write('\n}' if data else '}')
+        return summary
+    
+    @staticmethod
+    def write_xml(data: Dict[str, Iterable[Dict[str, Any]]], f: IO[str]) -> Dict[str, Dict[str, Any]]:
+        summary: Dict[str, Dict[str, Any]] = {}
+        # minidom.toprettyxml bilan bir xil: matndagi qo'shtirnoq ham ekranlanadi
+        entities = {'"': '&quot;'}
+        f.write('<?xml version="1.0" ?>\n')
+        if not data:
+            f.write('<results/>\n')
+            return summary
+        f.write('<results>\n')
+        for query_name, query_results in data.items():
+            f.write(f'  <query name={quoteattr(str(query_name))}')
+            count = 0
+            for item in ResultFormatter._track(summary, query_name, query_results):
+                f.write('>\n' if count == 0 else '')
+                count += 1
+                if not item:
+                    f.write('    <item/>\n')
+                    continue
+                f.write('    <item>\n')
+                for key, value in item.items():
+                    text = str(value)
+                    if text:
+                        f.write(f'      <{key}>{escape(text, entities)}</{key}>\n')
+                    else:
+                        f.write(f'      <{key}/>\n')
+                f.write('    </item>\n')
+            f.write('  </query>\n' if count else '/>\n')
+        f.write('</results>\n')
+        return summary
+    
+    @staticmethod
+    def write_ndjson(data: Dict[str, Iterable[Dict[str, Any]]], f: IO[str]) -> Dict[str, Dict[str, Any]]:
+        """Har bir qator alohida JSON satr: {"query": nom, ...maydonlar}."""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for query_name, query_results in data.items():
+            for item in ResultFormatter._track(summary, query_name, query_results):
+                f.write(json.dumps({'query': query_name, **item}, ensure_ascii=False))
+                f.write('\n')
+        return summary
+    
+    @staticmethod
+    def csv_path(file_path: str, query_name: str) -> str:
+        # results.csv -> results.room_student_count.csv (gz bo'lsa results.room_student_count.csv.gz)
+        base, ext = file_path, ''
+        if base.endswith('.gz'):
+            base, ext = base[:-3], '.gz'
+        base, csv_ext = os.path.splitext(base)
+        return f"{base}.{query_name}{csv_ext or '.csv'}{ext}"
+    
+    @staticmethod
+    def write_csv(rows: Iterable[Dict[str, Any]], f: IO[str], fieldnames: Optional[Sequence[str]] = None) -> None:
+        """Bitta hisobot - sarlavha ``fieldnames`` dan, berilmasa birinchi qator kalitlaridan olinadi.
+
+        ``fieldnames`` berilsa bo'sh hisobot ham sarlavha qatori bilan yoziladi.
+        """
+        writer = None
+        if fieldnames is not None:
+            writer = csv.DictWriter(f, fieldnames=list(fieldnames))
+            writer.writeheader()
+        for item in rows:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(item.keys()))
+                writer.writeheader()
+            writer.writerow(item)
+    
+    @staticmethod
+    def write_results(data: Dict[str, Iterable[Dict[str, Any]]], output_format: str, file_path: str,
+                      compress: bool = False,
+                      columns: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Natijalarni oqim bilan yozish; har bir hisobot uchun soni va birinchi qatorini qaytaradi.
+        
+        CSV da har bir hisobot alohida faylga yoziladi (ustunlari har xil); ``columns`` -
+        hisobot nomi -> ustunlar, bo'sh hisobot sarlavhasi uchun.
+        """
+        output_format = output_format.lower()
+        if output_format not in ResultFormatter.FORMATS:
+            raise ValueError(f"Noto'g'ri format: {output_format}. {', '.join(ResultFormatter.FORMATS)} bo'lishi kerak.")
+        
+        try:
+            if output_format == 'csv':
+                summary: Dict[str, Dict[str, Any]] = {}
+                for query_name, query_results in data.items():
+                    path = ResultFormatter.csv_path(file_path, query_name)
+                    with ResultFormatter.open_output(path, compress) as f:
+                        ResultFormatter.write_csv(ResultFormatter._track(summary, query_name, query_results), f,
+                                                  (columns or {}).get(query_name))
+            else:
+                writer = getattr(ResultFormatter, f"write_{output_format}")
+                with ResultFormatter.open_output(file_path, compress) as f:
+                    summary = writer(data, f)
+            
+            logger.info(f"✓ Natija {output_format.upper()} formatida oqim bilan saqlandi: {file_path}")
+            return summary
+        except Exception as e:
+            logger.error(f"✗ Faylga saqlashda xatolik: {e}")
+            raise
+    
     @staticmethod
     def save_to_file(content: str, file_path: str) -> None:
         try:
@@ -66,4 +205,19 @@ class ResultFormatter:
             if results:
                 print(f"  Birinchi natija: {results[0]}")
         
-        print("\n" + "=" * 60)
\ No newline at end of file
+        print("\n" + "=" * 60)
+    
+    @staticmethod
+    def print_stream_summary(summary: Dict[str, Dict[str, Any]]) -> None:
+        print("\n" + "=" * 60)
+        print("NATIJALAR XULOSASI")
+        print("=" * 60)
+        
+        for query_name, entry in summary.items():
+            print(f"\n{query_name.upper()}:")
+            print(f"  Natijalar soni: {entry['count']}")
+            
+            if entry['first'] is not None:
+                print(f"  Birinchi natija: {entry['first']}")
+        
+        print("\n" + "=" * 60)
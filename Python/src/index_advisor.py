@@ -0,0 +1,262 @@
+import time
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+from .database import DatabaseManager
+from .indexes import IndexManager
+from .partitions import StudentPartitions
+from .queries import QueryExecutor
+from .room_stats import RoomStatsManager
+
+logger = logging.getLogger(__name__)
+
+
+class IndexAdvisor:
+    """students indekslari to'plamini EXPLAIN va pg_stat_user_indexes asosida baholash.
+
+    Joriy to'plam bilan nomzod to'plam (IndexManager.INDEX_SETS) bitta tranzaksiya ichida
+    solishtiriladi: indekslar qayta quriladi (qurish vaqti), indekslar turgan jadvalga
+    WRITE_SAMPLE ta qator qo'shiladi (yozish, ya'ni yuklash narxi), hisobotlar EXPLAIN ANALYZE
+    bilan bajariladi (so'rov narxi), keyin hammasi ROLLBACK qilinadi.
+    Baholash vaqtida students jadvali eksklyuziv bloklanadi.
+    """
+
+    # Nomzod to'plam hisobotlarni shu koeffitsientdan ko'p sekinlashtirmasa tavsiya qilinadi
+    QUERY_TOLERANCE = 1.2
+    # Yozish narxi shuncha mavjud qatorni yangi id lar bilan qo'shib o'lchanadi
+    WRITE_SAMPLE = 10_000
+
+    def __init__(self, db_manager: DatabaseManager, candidate_set: str = 'minimal'):
+        self.db_manager = db_manager
+        self.candidate_set = candidate_set
+        self.candidate_indexes = IndexManager.INDEX_SETS[candidate_set]
+
+    @staticmethod
+    def _walk(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        yield node
+        for child in node.get('Plans', []):
+            yield from IndexAdvisor._walk(child)
+
+    @staticmethod
+    def explain(db: DatabaseManager, query: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        rows = db.fetch_all(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", params)
+        plan = rows[0][0][0]
+        nodes = list(IndexAdvisor._walk(plan['Plan']))
+        return {
+            'execution_ms': plan['Execution Time'],
+            'shared_hit_blocks': plan['Plan'].get('Shared Hit Blocks', 0),
+            'shared_read_blocks': plan['Plan'].get('Shared Read Blocks', 0),
+            'indexes': sorted({n['Index Name'] for n in nodes if 'Index Name' in n}),
+            'scan_types': sorted({n['Node Type'] for n in nodes if 'Scan' in n['Node Type']}),
+            'heap_fetches': sum(n.get('Heap Fetches', 0) for n in nodes)
+        }
+
+    def explain_reports(self, db: DatabaseManager) -> Dict[str, Dict[str, Any]]:
+        # Bo'limlangan jadvalda hisobotlar PARTITIONED_QUERIES dan bajariladi
+        executor = QueryExecutor(db)
+        return {name: self.explain(db, *executor.report_query(name)) for name in QueryExecutor.QUERIES}
+
+    def current_indexes(self, db: DatabaseManager) -> List[Dict[str, Any]]:
+        """students dagi ikkilamchi indekslar: ta'rifi, ustunlari, hajmi va ishlatilish soni.
+
+        Unikal, cheklovga bog'langan indekslar va bo'limlangan jadvaldagi id indeksi
+        (StudentPartitions.ID_INDEX) tuzilmaga tegishli - baholanmaydi va o'chirilmaydi.
+        """
+        query = """
+            SELECT
+                i.indexrelid::regclass::text,
+                pg_get_indexdef(i.indexrelid),
+                ARRAY(
+                    SELECT a.attname
+                    FROM unnest(i.indkey[0:i.indnkeyatts - 1]) WITH ORDINALITY AS k(attnum, ord)
+                    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                    ORDER BY k.ord
+                ),
+                COALESCE(
+                    (SELECT SUM(pg_relation_size(t.relid)) FROM pg_partition_tree(i.indexrelid) t),
+                    pg_relation_size(i.indexrelid)
+                )::bigint,
+                COALESCE(st.idx_scan, 0)
+            FROM pg_index i
+            LEFT JOIN pg_stat_user_indexes st ON st.indexrelid = i.indexrelid
+            WHERE i.indrelid = 'students'::regclass
+              AND NOT i.indisunique
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+              AND i.indexrelid IS DISTINCT FROM to_regclass(%s)
+            ORDER BY 1
+        """
+        return [
+            # Bo'limlangan indeks ta'rifidagi ON ONLY bo'limlarda indeks qurmaydi
+            {'name': r[0], 'definition': r[1].replace(' ON ONLY ', ' ON ', 1), 'columns': list(r[2]),
+             'size_bytes': r[3], 'idx_scan': r[4]}
+            for r in db.fetch_all(query, (StudentPartitions.ID_INDEX,))
+        ]
+
+    def _distinct_counts(self, db: DatabaseManager) -> Dict[str, float]:
+        rows = db.fetch_all(
+            "SELECT attname, n_distinct FROM pg_stats WHERE schemaname = 'public' AND tablename = 'students'"
+        )
+        return {r[0]: r[1] for r in rows}
+
+    def diagnose(self, indexes: List[Dict[str, Any]], plans: Dict[str, Dict[str, Any]],
+                 distinct: Dict[str, float]) -> Dict[str, List[str]]:
+        used = {name for plan in plans.values() for name in plan['indexes']}
+        findings: Dict[str, List[str]] = {}
+
+        for idx in indexes:
+            reasons = []
+            if idx['name'] not in used:
+                reasons.append("hech bir hisobot rejasida ishlatilmaydi")
+            if idx['idx_scan'] == 0:
+                reasons.append("pg_stat_user_indexes: idx_scan = 0")
+            for other in indexes:
+                if other is not idx and len(other['columns']) > len(idx['columns']) \
+                        and other['columns'][:len(idx['columns'])] == idx['columns']:
+                    reasons.append(f"{other['name']} ning prefiksi (ortiqcha)")
+                    break
+            leading = distinct.get(idx['columns'][0]) if idx['columns'] else None
+            if leading is not None and 0 < leading <= 2:
+                reasons.append(f"'{idx['columns'][0]}' ustunida faqat {int(leading)} ta qiymat")
+            findings[idx['name']] = reasons
+
+        return findings
+
+    @staticmethod
+    def _build(db: DatabaseManager, name: str, definition: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        db.execute_query(definition, commit=False)
+        seconds = time.perf_counter() - started
+        # Bo'limlangan indeksning o'zi bo'sh - hajmi bo'limlaridagi indekslar yig'indisi
+        size = db.fetch_all(
+            "SELECT COALESCE((SELECT SUM(pg_relation_size(relid)) FROM pg_partition_tree(%s::regclass)), "
+            "pg_relation_size(%s::regclass))::bigint",
+            (name, name)
+        )[0][0]
+        return {'name': name, 'seconds': seconds, 'size_bytes': size}
+
+    def _write_cost(self, db: DatabaseManager) -> Dict[str, Any]:
+        """Joriy indekslar turgan jadvalga WRITE_SAMPLE ta qator qo'shish vaqti; qatorlar savepoint ga qaytariladi."""
+        db.execute_query("SAVEPOINT index_write_cost", commit=False)
+        # room_stats triggeri ikkala to'plamda bir xil narx - o'lchovga kirmasin
+        db.execute_query(f"SET LOCAL {RoomStatsManager.DEFERRED_SETTING} = 'on'", commit=False)
+        started = time.perf_counter()
+        db.execute_query(f"""
+            INSERT INTO students ({StudentPartitions.COLUMN_NAMES})
+            SELECT m.max_id + ROW_NUMBER() OVER (), s.name, s.birthday, s.sex, s.room_id
+            FROM (SELECT * FROM students LIMIT %s) s, (SELECT MAX(id) AS max_id FROM students) m
+        """, (self.WRITE_SAMPLE,), commit=False)
+        seconds = time.perf_counter() - started
+        rows = db.cursor.rowcount
+        db.execute_query("ROLLBACK TO SAVEPOINT index_write_cost", commit=False)
+        return {'rows': rows, 'seconds': seconds}
+
+    def evaluate(self) -> Dict[str, Any]:
+        with self.db_manager.pooled() as db:
+            # Index-only scan uchun visibility map yangilanishi kerak
+            db.connection.autocommit = True
+            db.execute_query("VACUUM (ANALYZE) students")
+            db.connection.autocommit = False
+
+            current = self.current_indexes(db)
+            before = self.explain_reports(db)
+            findings = self.diagnose(current, before, self._distinct_counts(db))
+
+            try:
+                # Joriy to'plamni qayta qurib qurish vaqti va yozish narxini o'lchash
+                for idx in current:
+                    db.execute_query(f"DROP INDEX {idx['name']}", commit=False)
+                current_build = [self._build(db, idx['name'], idx['definition']) for idx in current]
+                current_write = self._write_cost(db)
+
+                for idx in current:
+                    db.execute_query(f"DROP INDEX {idx['name']}", commit=False)
+                candidate_build = [self._build(db, idx['name'], idx['sql']) for idx in self.candidate_indexes]
+                candidate_write = self._write_cost(db)
+
+                db.execute_query("ANALYZE students", commit=False)
+                after = self.explain_reports(db)
+            finally:
+                db.rollback()
+
+        return {
+            'current': current,
+            'findings': findings,
+            'before': before,
+            'after': after,
+            'current_build': current_build,
+            'candidate_build': candidate_build,
+            'current_write': current_write,
+            'candidate_write': candidate_write
+        }
+
+    def advise(self, apply: bool = False) -> Dict[str, Any]:
+        logger.info("=" * 50)
+        logger.info("INDEKS MASLAHATCHISI ISHGA TUSHDI")
+        logger.info("=" * 50)
+
+        result = self.evaluate()
+        before_ms = sum(p['execution_ms'] for p in result['before'].values())
+        after_ms = sum(p['execution_ms'] for p in result['after'].values())
+        current_build_s = sum(b['seconds'] for b in result['current_build'])
+        candidate_build_s = sum(b['seconds'] for b in result['candidate_build'])
+        current_bytes = sum(b['size_bytes'] for b in result['current_build'])
+        candidate_bytes = sum(b['size_bytes'] for b in result['candidate_build'])
+
+        result['summary'] = {
+            'report_ms_before': before_ms,
+            'report_ms_after': after_ms,
+            'build_seconds_before': current_build_s,
+            'build_seconds_after': candidate_build_s,
+            'write_rows': result['current_write']['rows'],
+            'write_seconds_before': result['current_write']['seconds'],
+            'write_seconds_after': result['candidate_write']['seconds'],
+            'index_bytes_before': current_bytes,
+            'index_bytes_after': candidate_bytes,
+            'recommended': after_ms <= before_ms * self.QUERY_TOLERANCE
+        }
+        self.print_report(result)
+
+        if apply and result['summary']['recommended']:
+            self.apply()
+        elif apply:
+            logger.warning("Nomzod to'plam hisobotlarni sezilarli sekinlashtiradi - qo'llanilmadi")
+
+        return result
+
+    def apply(self) -> None:
+        candidate_names = {idx['name'] for idx in self.candidate_indexes}
+        for idx in self.current_indexes(self.db_manager):
+            if idx['name'] not in candidate_names:
+                self.db_manager.execute_query(f"DROP INDEX IF EXISTS {idx['name']}")
+                logger.info(f"✓ {idx['name']} o'chirildi")
+        IndexManager(self.db_manager, index_set=self.candidate_set).create_indexes()
+        logger.info(f"✓ '{self.candidate_set}' indeks to'plami qo'llanildi "
+                    f"(keyingi ishga tushirishlarda --index-set {self.candidate_set})")
+
+    def print_report(self, result: Dict[str, Any]) -> None:
+        print("\n" + "=" * 60)
+        print("INDEKS MASLAHATCHISI")
+        print("=" * 60)
+
+        print("\nJoriy indekslar:")
+        for idx in result['current']:
+            reasons = result['findings'].get(idx['name']) or ["hisobotlarda ishlatiladi"]
+            print(f"  {idx['name']} ({idx['size_bytes']} bayt, idx_scan={idx['idx_scan']})")
+            for reason in reasons:
+                print(f"    - {reason}")
+
+        print(f"\nHisobotlar (joriy -> '{self.candidate_set}'):")
+        for name in result['before']:
+            before, after = result['before'][name], result['after'][name]
+            print(f"  {name}: {before['execution_ms']:.1f} ms -> {after['execution_ms']:.1f} ms, "
+                  f"{', '.join(after['scan_types'])}, heap fetches={after['heap_fetches']}")
+
+        summary = result['summary']
+        print(f"\nIndeks qurish vaqti: {summary['build_seconds_before']:.2f} s -> "
+              f"{summary['build_seconds_after']:.2f} s")
+        print(f"Yozish narxi ({summary['write_rows']} ta qator qo'shish): "
+              f"{summary['write_seconds_before']:.3f} s -> {summary['write_seconds_after']:.3f} s")
+        print(f"Indekslar hajmi: {summary['index_bytes_before']} -> {summary['index_bytes_after']} bayt")
+        print(f"Hisobotlar jami: {summary['report_ms_before']:.1f} ms -> {summary['report_ms_after']:.1f} ms")
+        verdict = f"'{self.candidate_set}' to'plamiga o'tish" if summary['recommended'] else "joriy to'plamni saqlash"
+        print(f"Tavsiya: {verdict}")
+        print("\n" + "=" * 60)
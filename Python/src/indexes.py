@@ -1,3 +1,6 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 import logging
 from .database import DatabaseManager
 
@@ -5,49 +8,80 @@ logger = logging.getLogger(__name__)
 
 
 class IndexManager:
-    def __init__(self, db_manager: DatabaseManager):
+    INDEXES = [
+        {
+            'name': 'idx_students_room_id',
+            'sql': 'CREATE INDEX IF NOT EXISTS idx_students_room_id ON students(room_id)',
+            'description': 'Room ID bo\'yicha tez qidirish'
+        },
+        {
+            'name': 'idx_students_birthday',
+            'sql': 'CREATE INDEX IF NOT EXISTS idx_students_birthday ON students(birthday)',
+            'description': 'Birthday bo\'yicha yosh hisoblashni tezlashtirish'
+        },
+        {
+            'name': 'idx_students_sex',
+            'sql': 'CREATE INDEX IF NOT EXISTS idx_students_sex ON students(sex)',
+            'description': 'Jins bo\'yicha filtrlashni tezlashtirish'
+        },
+        {
+            'name': 'idx_students_room_sex',
+            'sql': 'CREATE INDEX IF NOT EXISTS idx_students_room_sex ON students(room_id, sex)',
+            'description': 'Composite indeks: room_id va sex (Query 4 uchun)'
+        },
+        {
+            'name': 'idx_students_room_birthday',
+            'sql': 'CREATE INDEX IF NOT EXISTS idx_students_room_birthday ON students(room_id, birthday)',
+            'description': 'Composite indeks: room_id va birthday (Query 2,3 uchun)'
+        }
+    ]
+    
+    # Xona agregatlari uchun yagona qoplovchi indeks: hisobotlar index-only scan bilan bajariladi
+    MINIMAL_INDEXES = [
+        {
+            'name': 'idx_students_room_covering',
+            'sql': 'CREATE INDEX IF NOT EXISTS idx_students_room_covering '
+                   'ON students(room_id, birthday) INCLUDE (sex, id)',
+            'description': 'Qoplovchi indeks: room_id, birthday (+ sex, id) - barcha hisobotlar uchun'
+        }
+    ]
+    
+    INDEX_SETS = {
+        'default': INDEXES,
+        'minimal': MINIMAL_INDEXES
+    }
+    
+    # Kiruvchi qatorlar mavjudlarining shu ulushidan ko'p bo'lsa - katta yuklash
+    LARGE_LOAD_RATIO = 0.2
+    
+    # maintenance_work_mem va max_parallel_maintenance_workers - DatabaseManager ning 'index' sessiya profilida
+    SESSION_STAGE = 'index'
+    
+    def __init__(self, db_manager: DatabaseManager, workers: int = 4, concurrently: bool = False,
+                 index_set: str = 'default'):
+        if index_set not in self.INDEX_SETS:
+            raise ValueError(f"Noma'lum indeks to'plami: {index_set}")
         self.db_manager = db_manager
+        self.index_set = index_set
+        self.indexes = self.INDEX_SETS[index_set]
+        self.workers = workers
+        self.concurrently = concurrently
+        self.dropped_for_load = False
+        self.build_report: List[Dict[str, Any]] = []
     
     def create_indexes(self) -> None:
         logger.info("=" * 50)
         logger.info("INDEKSLARNI YARATISH BOSHLANDI")
         logger.info("=" * 50)
         
-        indexes = [
-            {
-                'name': 'idx_students_room_id',
-                'sql': 'CREATE INDEX IF NOT EXISTS idx_students_room_id ON students(room_id)',
-                'description': 'Room ID bo\'yicha tez qidirish'
-            },
-            {
-                'name': 'idx_students_birthday',
-                'sql': 'CREATE INDEX IF NOT EXISTS idx_students_birthday ON students(birthday)',
-                'description': 'Birthday bo\'yicha yosh hisoblashni tezlashtirish'
-            },
-            {
-                'name': 'idx_students_sex',
-                'sql': 'CREATE INDEX IF NOT EXISTS idx_students_sex ON students(sex)',
-                'description': 'Jins bo\'yicha filtrlashni tezlashtirish'
-            },
-            {
-                'name': 'idx_students_room_sex',
-                'sql': 'CREATE INDEX IF NOT EXISTS idx_students_room_sex ON students(room_id, sex)',
-                'description': 'Composite indeks: room_id va sex (Query 4 uchun)'
-            },
-            {
-                'name': 'idx_students_room_birthday',
-                'sql': 'CREATE INDEX IF NOT EXISTS idx_students_room_birthday ON students(room_id, birthday)',
-                'description': 'Composite indeks: room_id va birthday (Query 2,3 uchun)'
-            }
-        ]
-        
-        for idx in indexes:
-            try:
-                self.db_manager.execute_query(idx['sql'])
-                logger.info(f"✓ {idx['name']} yaratildi - {idx['description']}")
-            except Exception as e:
-                logger.error(f"✗ {idx['name']} yaratishda xatolik: {e}")
-                raise
+        with self.db_manager.session(self.SESSION_STAGE):
+            for idx in self.indexes:
+                try:
+                    self.db_manager.execute_query(idx['sql'])
+                    logger.info(f"✓ {idx['name']} yaratildi - {idx['description']}")
+                except Exception as e:
+                    logger.error(f"✗ {idx['name']} yaratishda xatolik: {e}")
+                    raise
         
         logger.info("=" * 50)
         logger.info("BARCHA INDEKSLAR YARATILDI")
@@ -56,21 +90,117 @@ class IndexManager:
     def drop_indexes(self) -> None:
         logger.info("Indekslarni o'chirish boshlandi...")
         
-        indexes = [
-            'idx_students_room_id',
-            'idx_students_birthday',
-            'idx_students_sex',
-            'idx_students_room_sex',
-            'idx_students_room_birthday'
-        ]
-        
-        for idx_name in indexes:
+        for idx in self.indexes:
+            idx_name = idx['name']
             try:
                 self.db_manager.execute_query(f'DROP INDEX IF EXISTS {idx_name}')
                 logger.info(f"✓ {idx_name} o'chirildi")
             except Exception as e:
                 logger.error(f"✗ {idx_name} o'chirishda xatolik: {e}")
     
+    def _existing_rows(self) -> Optional[int]:
+        """students dagi qatorlar bahosi; ANALYZE qilinmagan bo'lim bo'lsa (reltuples = -1) None."""
+        # Oddiy jadval o'zi, bo'limlangan jadvalda esa bo'limlari (pg_partition_tree oddiy jadval
+        # uchun bo'sh) - relkind 'r' qatorlar saqlanadigan jadvallar
+        rows = self.db_manager.fetch_all("""
+            SELECT COALESCE(SUM(c.reltuples) FILTER (WHERE c.reltuples >= 0), 0)::bigint,
+                   COALESCE(bool_or(c.reltuples < 0), false)
+            FROM pg_class c
+            WHERE c.relkind = 'r'
+              AND (c.oid = 'students'::regclass
+                   OR c.oid IN (SELECT relid FROM pg_partition_tree('students')))
+        """)
+        existing, unknown = rows[0] if rows else (0, False)
+        return None if unknown else existing
+    
+    def is_large_load(self, incoming_rows: int) -> bool:
+        existing = self._existing_rows()
+        if existing is None:
+            if self.db_manager.is_table_empty('students'):
+                existing = 0
+            else:
+                # Hech qachon ANALYZE qilinmagan, lekin bo'sh emas - bo'sh deb hisoblab indekslarni
+                # o'chirib yubormaslik uchun namuna bo'yicha baholaymiz (ANALYZE cheklangan namuna o'qiydi)
+                logger.info("students statistikasi yo'q - ANALYZE bilan baholanadi")
+                self.db_manager.execute_query("ANALYZE students")
+                existing = self._existing_rows() or 0
+        return existing == 0 or incoming_rows >= existing * self.LARGE_LOAD_RATIO
+    
+    def prepare_for_load(self, incoming_rows: int) -> bool:
+        """Katta yuklashdan oldin ikkilamchi indekslarni o'chirish; kichik delta uchun joyida qoldirish."""
+        if not self.is_large_load(incoming_rows):
+            logger.info(f"Kichik yuklash (~{incoming_rows} ta yozuv) - indekslar joyida qoladi")
+            self.dropped_for_load = False
+            return False
+        
+        logger.info(f"Katta yuklash (~{incoming_rows} ta yozuv) - indekslar vaqtincha o'chiriladi")
+        self.drop_indexes()
+        self.dropped_for_load = True
+        return True
+    
+    def finish_load(self) -> None:
+        if self.dropped_for_load:
+            self.rebuild_indexes()
+            self.dropped_for_load = False
+    
+    def _build_index(self, idx: Dict[str, str], concurrently: bool) -> Dict[str, Any]:
+        sql = idx['sql']
+        if concurrently:
+            sql = sql.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1)
+        
+        with self.db_manager.pooled() as db:
+            # CONCURRENTLY tranzaksiya ichida ishlamaydi
+            db.connection.autocommit = True
+            try:
+                # Sessiya profili pooled() da qo'llangan
+                started = time.perf_counter()
+                db.execute_query(sql)
+                seconds = time.perf_counter() - started
+                # Bo'limlangan indeks hajmi - bo'limlardagi indekslar yig'indisi (oddiy indeksda daraxt bo'sh)
+                size = db.fetch_all("""
+                    SELECT size, pg_size_pretty(size) FROM (
+                        SELECT COALESCE(
+                            (SELECT SUM(pg_relation_size(relid)) FROM pg_partition_tree(%s::regclass)),
+                            pg_relation_size(%s::regclass)
+                        )::bigint AS size
+                    ) s
+                """, (idx['name'], idx['name']))[0]
+            finally:
+                db.connection.autocommit = False
+        
+        logger.info(f"✓ {idx['name']} qurildi: {seconds:.2f} s, {size[1]}")
+        return {'name': idx['name'], 'seconds': seconds, 'size_bytes': size[0], 'size': size[1]}
+    
+    def rebuild_indexes(self) -> List[Dict[str, Any]]:
+        """Indekslarni bir nechta ulanishda parallel qurish va har biri uchun vaqt/hajm hisobotini qaytarish."""
+        logger.info("=" * 50)
+        logger.info("INDEKSLARNI PARALLEL QURISH BOSHLANDI")
+        logger.info("=" * 50)
+        
+        concurrently = self.concurrently
+        if concurrently and self.is_partitioned():
+            logger.warning("students bo'limlangan - CREATE INDEX CONCURRENTLY qo'llab-quvvatlanmaydi, "
+                           "indekslar oddiy usulda quriladi")
+            concurrently = False
+        
+        # PostgreSQL bir jadvalda bir vaqtda faqat bitta CONCURRENTLY qurishga ruxsat beradi
+        workers = 1 if concurrently else max(1, min(self.workers, len(self.indexes)))
+        
+        with self.db_manager.session(self.SESSION_STAGE), \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix='index') as pool:
+            futures = [pool.submit(self._build_index, idx, concurrently) for idx in self.indexes]
+            self.build_report = [future.result() for future in futures]
+        
+        total = sum(item['size_bytes'] for item in self.build_report)
+        logger.info(f"✓ {len(self.build_report)} ta indeks qurildi, jami hajm: {total} bayt")
+        return self.build_report
+    
+    def is_partitioned(self) -> bool:
+        rows = self.db_manager.fetch_all(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('students'))"
+        )
+        return bool(rows[0][0])
+    
     def get_index_info(self) -> list:
         """Indekslar haqida ma'lumot olish."""
         query = """
@@ -1,96 +1,429 @@
+import glob
+import gzip
+import io
 import json
-from typing import List, Dict, Any
+import os
+from array import array
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 import logging
+from .batches import RoomBatch, StudentBatch, datetime_to_us
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ixtiyoriy
+    np = None
+
+try:
+    import zstandard as zstd
+except ImportError:  # zstandard ixtiyoriy - faqat .zst fayllar uchun kerak
+    zstd = None
 
 logger = logging.getLogger(__name__)
 
 
 class FileLoader:
+    READ_SIZE = 1 << 20
+    DEFAULT_CHUNK_SIZE = 10000
+    
+    # Shardlar papkasidan olinadigan fayllar (siqilgan bo'lishi ham mumkin)
+    INPUT_SUFFIXES = ('.json', '.ndjson', '.jsonl')
+    COMPRESSED_SUFFIXES = ('.gz', '.zst')
+    # Hajmi sarlavhada bo'lmagan .zst uchun taxminiy siqish darajasi
+    ZSTD_RATIO = 5
+    
+    @staticmethod
+    def is_compressed(file_path: str) -> bool:
+        return file_path.endswith(FileLoader.COMPRESSED_SUFFIXES)
+    
+    @staticmethod
+    def _is_input_name(name: str) -> bool:
+        for suffix in FileLoader.COMPRESSED_SUFFIXES:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+                break
+        return name.endswith(FileLoader.INPUT_SUFFIXES)
+    
+    @staticmethod
+    def expand_inputs(spec: str) -> List[str]:
+        """Fayl, glob yoki shardlar papkasi -> saralangan fayllar ro'yxati."""
+        if os.path.isdir(spec):
+            paths = [
+                os.path.join(spec, name) for name in os.listdir(spec)
+                if FileLoader._is_input_name(name) and os.path.isfile(os.path.join(spec, name))
+            ]
+        elif any(ch in spec for ch in '*?['):
+            paths = [path for path in glob.glob(spec) if os.path.isfile(path)]
+        else:
+            return [spec]
+        return sorted(paths)
+    
+    @staticmethod
+    def open_text(file_path: str):
+        """Oddiy, .gz yoki .zst faylni UTF-8 matn oqimi sifatida ochish."""
+        if file_path.endswith('.gz'):
+            return gzip.open(file_path, 'rt', encoding='utf-8')
+        if file_path.endswith('.zst'):
+            if zstd is None:
+                raise ImportError(f".zst fayllar uchun zstandard o'rnatilgan bo'lishi kerak: {file_path}")
+            reader = zstd.ZstdDecompressor().stream_reader(open(file_path, 'rb'), closefd=True)
+            return io.TextIOWrapper(io.BufferedReader(reader), encoding='utf-8')
+        return open(file_path, 'r', encoding='utf-8')
+    
+    @staticmethod
+    def input_size(file_path: str) -> int:
+        """Siqilmagan hajm: .gz uchun ISIZE (2^32 moduli bo'yicha), .zst uchun taxminan."""
+        size = os.path.getsize(file_path)
+        if file_path.endswith('.gz') and size >= 4:
+            with open(file_path, 'rb') as f:
+                f.seek(-4, os.SEEK_END)
+                return int.from_bytes(f.read(4), 'little')
+        if file_path.endswith('.zst'):
+            if zstd is not None:
+                with open(file_path, 'rb') as f:
+                    content_size = zstd.frame_content_size(f.read(18))
+                if content_size > 0:
+                    return content_size
+            return size * FileLoader.ZSTD_RATIO
+        return size
+    
+    @staticmethod
+    def _detect_format(f) -> Tuple[str, str]:
+        """Birinchi bo'sh bo'lmagan belgi bo'yicha format va o'sha belgi.
+        
+        Siqilgan oqimlarda orqaga seek qilib bo'lmaydi, shuning uchun o'qilgan belgi
+        parserga qaytarib beriladi.
+        """
+        while True:
+            ch = f.read(1)
+            if not ch:
+                return 'ndjson', ''
+            if not ch.isspace():
+                return ('array' if ch == '[' else 'ndjson'), ch
+    
     @staticmethod
-    def load_json(file_path: str) -> List[Dict[str, Any]]:
+    def detect_file_format(file_path: str) -> str:
+        with FileLoader.open_text(file_path) as f:
+            return FileLoader._detect_format(f)[0]
+    
+    @staticmethod
+    def _iter_json_array(f, raw: bool = False, head: str = '') -> Iterator[Any]:
+        decoder = json.JSONDecoder()
+        buffer = head
+        pos = 0
+        eof = False
+        started = False
+        # Keyingi kutilgan belgi: 'first' - '[' dan keyin (qiymat yoki ']'), 'value' - vergul
+        # dan keyin (faqat qiymat), 'separator' - qiymatdan keyin (',' yoki ']')
+        expect = 'first'
+        
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            
+            if pos < len(buffer):
+                ch = buffer[pos]
+                if not started:
+                    if ch != '[':
+                        raise json.JSONDecodeError("JSON massiv kutilgan", buffer, pos)
+                    started = True
+                    pos += 1
+                    continue
+                
+                if ch == ']' and expect != 'value':
+                    # Massivdan keyin faqat bo'sh joy bo'lishi mumkin
+                    rest, offset = buffer, pos + 1
+                    while rest:
+                        if rest[offset:].strip():
+                            raise json.JSONDecodeError("Massivdan keyin ortiqcha ma'lumot", rest, offset)
+                        rest, offset = f.read(FileLoader.READ_SIZE), 0
+                    return
+                
+                if expect == 'separator':
+                    if ch != ',':
+                        raise json.JSONDecodeError("',' yoki ']' kutilgan", buffer, pos)
+                    expect = 'value'
+                    pos += 1
+                    continue
+                
+                if ch in ',]':
+                    raise json.JSONDecodeError("Qiymat kutilgan", buffer, pos)
+                
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                    # Ajratuvchisiz tugagan son ("345." yoki bufer oxiri) keyingi o'qishda davom etishi mumkin
+                    if eof or (end < len(buffer) and buffer[end] in ' \t\r\n,]'):
+                        yield (buffer[pos:end], record) if raw else record
+                        pos = end
+                        expect = 'separator'
+                        continue
+                except json.JSONDecodeError:
+                    # Yozuv to'liq o'qilmagan bo'lishi mumkin
+                    if eof:
+                        raise
+            elif eof:
+                raise json.JSONDecodeError("JSON massiv yopilmagan", buffer, pos)
+            
+            more = f.read(FileLoader.READ_SIZE)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+    
+    @staticmethod
+    def _iter_ndjson(f, raw: bool = False, head: str = '') -> Iterator[Any]:
+        lines = chain([head + f.readline()], f) if head else f
+        for line in lines:
+            line = line.strip()
+            if line:
+                # raw rejimda qator keyinroq (kerak bo'lsa) parse qilinadi
+                yield (line, None) if raw else json.loads(line)
+    
+    @staticmethod
+    def _iter_file(file_path: str, raw: bool = False) -> Iterator[Any]:
+        count = 0
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with FileLoader.open_text(file_path) as f:
+                fmt, head = FileLoader._detect_format(f)
+                if fmt == 'array':
+                    records = FileLoader._iter_json_array(f, raw, head)
+                else:
+                    records = FileLoader._iter_ndjson(f, raw, head)
+                
+                for record in records:
+                    count += 1
+                    yield record
             
-            logger.info(f"✓ Fayl o'qildi: {file_path} ({len(data)} ta yozuv)")
-            return data
+            logger.info(f"✓ Fayl o'qildi: {file_path} ({count} ta yozuv)")
         except FileNotFoundError:
             logger.error(f"✗ Fayl topilmadi: {file_path}")
             raise
         except json.JSONDecodeError as e:
-            logger.error(f"✗ JSON formatida xatolik: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"✗ Kutilmagan xatolik: {e}")
+            logger.error(f"✗ JSON formatida xatolik: {file_path}: {e}")
             raise
     
     @staticmethod
-    def validate_rooms(rooms: List[Dict[str, Any]]) -> bool:
-        required_fields = ['id', 'name']
+    def iter_json(file_path: str, raw: bool = False) -> Iterator[Any]:
+        """JSON massiv yoki NDJSON faylini yozuvma-yozuv o'qish.
         
-        for idx, room in enumerate(rooms):
-            for field in required_fields:
-                if field not in room:
-                    logger.error(f"✗ Room #{idx} da '{field}' maydoni yo'q")
-                    return False
-            
-            if not isinstance(room['id'], int):
-                logger.error(f"✗ Room #{idx} da 'id' integer bo'lishi kerak")
-                return False
+        file_path glob yoki shardlar papkasi ham bo'lishi mumkin - fayllar nom bo'yicha
+        tartibda ketma-ket o'qiladi; .gz va .zst fayllar oqim bilan ochiladi.
+        raw=True bo'lsa (xom_matn, yozuv) juftliklari qaytadi; NDJSON uchun yozuv None
+        bo'ladi va ``parse_raw`` orqali keyinroq olinadi.
+        """
+        paths = FileLoader.expand_inputs(file_path)
+        if not paths:
+            logger.error(f"✗ Fayl topilmadi: {file_path}")
+            raise FileNotFoundError(file_path)
+        for path in paths:
+            yield from FileLoader._iter_file(path, raw)
+    
+    @staticmethod
+    def split_ranges(file_path: str, range_size: int) -> List[Tuple[int, int]]:
+        """Siqilmagan NDJSON faylini qator chegaralariga tekislangan bayt oraliqlariga bo'lish."""
+        size = os.path.getsize(file_path)
+        ranges = []
+        start = 0
+        with open(file_path, 'rb') as f:
+            while start < size:
+                end = start + range_size
+                if end >= size:
+                    end = size
+                else:
+                    # Oraliq keyingi qator boshida tugaydi
+                    f.seek(end)
+                    f.readline()
+                    end = f.tell()
+                ranges.append((start, end))
+                start = end
+        return ranges
+    
+    @staticmethod
+    def iter_ndjson_range(file_path: str, start: int, end: int) -> Iterator[Dict[str, Any]]:
+        """NDJSON faylining [start, end) bayt oralig'idagi yozuvlar (split_ranges chegaralari)."""
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            pos = start
+            while pos < end:
+                line = f.readline()
+                if not line:
+                    break
+                pos += len(line)
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    
+    @staticmethod
+    def iter_json_chunks(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        records = FileLoader.iter_json(file_path)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    @staticmethod
+    def iter_raw_chunks(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Tuple[str, Any]]]:
+        records = FileLoader.iter_json(file_path, raw=True)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    @staticmethod
+    def estimate_record_count(file_path: str, sample_size: int = 1000) -> int:
+        """Birinchi yozuvlarning o'rtacha hajmi bo'yicha fayldagi yozuvlar sonini taxminlash."""
+        sample = list(islice(FileLoader.iter_json(file_path, raw=True), sample_size))
+        if not sample:
+            return 0
+        avg_size = sum(len(text.encode('utf-8')) + 2 for text, _ in sample) / len(sample)
+        total_size = sum(FileLoader.input_size(path) for path in FileLoader.expand_inputs(file_path))
+        return max(len(sample), int(total_size / avg_size))
+    
+    @staticmethod
+    def parse_raw(chunk: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        return [record if record is not None else json.loads(text) for text, record in chunk]
+
+
+class DataTransformer:
+    STUDENT_FIELDS = ('id', 'name', 'birthday', 'sex', 'room')
+    ROOM_FIELDS = ('id', 'name')
+    VALID_SEX = ('M', 'F')
+    # PostgreSQL INTEGER oralig'i (id va room_id ustunlari)
+    INT_MIN, INT_MAX = -(1 << 31), (1 << 31) - 1
+    
+    @staticmethod
+    def _is_int(value: Any) -> bool:
+        # bool ham int ning qism sinfi - id sifatida qabul qilinmaydi
+        return (isinstance(value, int) and not isinstance(value, bool)
+                and DataTransformer.INT_MIN <= value <= DataTransformer.INT_MAX)
+    
+    @staticmethod
+    def _reject(idx: int, record: Any, field: Optional[str], reason: str) -> Dict[str, Any]:
+        return {
+            'index': idx,
+            'id': record.get('id') if isinstance(record, dict) else None,
+            'field': field,
+            'reason': reason,
+            'record': record
+        }
+    
+    @staticmethod
+    def validate_and_transform_rooms(rooms: List[Dict[str, Any]],
+                                     offset: int = 0) -> Tuple[List[tuple], List[Dict[str, Any]]]:
+        rows = []
+        rejects = []
+        reject = DataTransformer._reject
         
-        logger.info("✓ Rooms ma'lumotlari to'g'ri")
-        return True
+        for idx, room in enumerate(rooms, start=offset):
+            if not isinstance(room, dict):
+                rejects.append(reject(idx, room, None, "obyekt bo'lishi kerak"))
+                continue
+            missing = next((f for f in DataTransformer.ROOM_FIELDS if f not in room), None)
+            if missing:
+                rejects.append(reject(idx, room, missing, "maydon yo'q"))
+            elif not DataTransformer._is_int(room['id']):
+                rejects.append(reject(idx, room, 'id', "integer bo'lishi kerak"))
+            else:
+                rows.append((room['id'], room['name']))
+        
+        return rows, rejects
     
     @staticmethod
-    def validate_students(students: List[Dict[str, Any]]) -> bool:
-        required_fields = ['id', 'name', 'birthday', 'sex', 'room']
+    def _iter_valid_students(students: List[Dict[str, Any]], offset: int,
+                             rejects: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], datetime]]:
+        """To'g'ri yozuvlar va parse qilingan birthday; noto'g'rilari rejects ga qo'shiladi.
+        
+        Yagona students validatori - DB yuklash (StudentBatch), memory engine va ustunli kesh
+        (students_to_columns) bir xil yozuvlarni qabul qiladi va rad etadi.
+        """
+        reject = DataTransformer._reject
+        fields = DataTransformer.STUDENT_FIELDS
+        valid_sex = DataTransformer.VALID_SEX
+        is_int = DataTransformer._is_int
+        fromisoformat = datetime.fromisoformat
         
-        for idx, student in enumerate(students):
-            # Maydonlar mavjudligini tekshirish
-            for field in required_fields:
-                if field not in student:
-                    logger.error(f"✗ Student #{idx} da '{field}' maydoni yo'q")
-                    return False
+        for idx, student in enumerate(students, start=offset):
+            if not isinstance(student, dict):
+                rejects.append(reject(idx, student, None, "obyekt bo'lishi kerak"))
+                continue
+            
+            missing = next((f for f in fields if f not in student), None)
+            if missing:
+                rejects.append(reject(idx, student, missing, "maydon yo'q"))
+                continue
+            
+            if not is_int(student['id']):
+                rejects.append(reject(idx, student, 'id', "integer bo'lishi kerak"))
+                continue
             
-            # ID tekshirish
-            if not isinstance(student['id'], int):
-                logger.error(f"✗ Student #{idx} da 'id' integer bo'lishi kerak")
-                return False
+            if not isinstance(student['name'], str):
+                rejects.append(reject(idx, student, 'name', "satr bo'lishi kerak"))
+                continue
             
-            # Sex tekshirish
-            if student['sex'] not in ['M', 'F']:
-                logger.error(f"✗ Student #{idx} da 'sex' 'M' yoki 'F' bo'lishi kerak")
-                return False
+            if student['sex'] not in valid_sex:
+                rejects.append(reject(idx, student, 'sex', "'M' yoki 'F' bo'lishi kerak"))
+                continue
             
-            # Birthday formatini tekshirish
             try:
-                datetime.fromisoformat(student['birthday'])
-            except ValueError:
-                logger.error(f"✗ Student #{idx} da 'birthday' formati noto'g'ri")
-                return False
+                birthday = fromisoformat(student['birthday'])
+            except (TypeError, ValueError):
+                rejects.append(reject(idx, student, 'birthday', "formati noto'g'ri"))
+                continue
+            
+            if student['room'] is not None and not is_int(student['room']):
+                rejects.append(reject(idx, student, 'room', "integer yoki null bo'lishi kerak"))
+                continue
+            
+            yield student, birthday
+    
+    @staticmethod
+    def students_to_batch(students: List[Dict[str, Any]],
+                          offset: int = 0) -> Tuple[StudentBatch, List[Dict[str, Any]]]:
+        """Tekshirish va ustunli StudentBatch ga o'tkazish bitta o'tishda (birthday bir marta parse qilinadi)."""
+        rejects = []
+        ids, birthdays, sex, rooms, no_room = array('q'), array('q'), array('B'), array('i'), array('B')
+        names = []
         
-        logger.info("✓ Students ma'lumotlari to'g'ri")
-        return True
-
-
-class DataTransformer:
+        for student, birthday in DataTransformer._iter_valid_students(students, offset, rejects):
+            ids.append(student['id'])
+            names.append(student['name'])
+            birthdays.append(datetime_to_us(birthday))
+            sex.append(student['sex'] == 'M')
+            room = student['room']
+            rooms.append(0 if room is None else room)
+            no_room.append(room is None)
+        
+        offsets, heap = StudentBatch._heap(names)
+        return StudentBatch(ids, offsets, heap, birthdays, sex, rooms, no_room), rejects
+    
     @staticmethod
-    def transform_rooms(rooms: List[Dict[str, Any]]) -> List[tuple]:
-        return [(room['id'], room['name']) for room in rooms]
+    def rooms_to_batch(rooms: List[Dict[str, Any]], offset: int = 0) -> Tuple[RoomBatch, List[Dict[str, Any]]]:
+        rows, rejects = DataTransformer.validate_and_transform_rooms(rooms, offset)
+        return RoomBatch.from_rows(rows), rejects
     
     @staticmethod
-    def transform_students(students: List[Dict[str, Any]]) -> List[tuple]:
-        transformed = []
-        for student in students:
-            birthday = datetime.fromisoformat(student['birthday'])
-            
-            transformed.append((
-                student['id'],
-                student['name'],
-                birthday,
-                student['sex'],
-                student['room'] 
-            ))
+    def students_to_columns(students: List[Dict[str, Any]],
+                            offset: int = 0) -> Tuple[Dict[str, 'np.ndarray'], List[Dict[str, Any]]]:
+        """Students ni NumPy ustunlariga o'tkazish (birthday datetime64[us]).
+        
+        Tekshiruv students_to_batch bilan bir xil (_iter_valid_students) - memory engine va DB
+        yuklash bir xil yozuvlarni qabul qiladi. room bo'lmagan talabalar uchun no_room = True
+        (room_id = 0) - StudentBatch dagi kabi.
+        """
+        if np is None:
+            raise ImportError("students_to_columns uchun numpy o'rnatilgan bo'lishi kerak")
+        
+        batch, rejects = DataTransformer.students_to_batch(students, offset)
+        male = np.array(batch.sex, dtype=bool)
+        columns = {
+            'id': np.array(batch.ids, dtype=np.int64),
+            'name': np.array(batch.names(), dtype=object),
+            'birthday': np.array(batch.birthdays, dtype=np.int64).astype('datetime64[us]'),
+            'sex': np.where(male, 'M', 'F').astype('U1'),
+            'room_id': np.array(batch.room_ids, dtype=np.int64),
+            'no_room': np.array(batch.no_room, dtype=bool)
+        }
         
-        return transformed
\ No newline at end of file
+        return columns, rejects
@@ -0,0 +1,116 @@
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+from .database import DatabaseManager
+from .loader import FileLoader
+
+logger = logging.getLogger(__name__)
+
+
+class LoadManifest:
+    """Yuklangan fayllar va ularning bo'laklari xeshlarini bazada saqlash.
+
+    Fayl xeshi o'zgarmagan bo'lsa fayl butunlay o'tkazib yuboriladi; o'zgargan faylda
+    faqat xeshi farq qiladigan bo'laklar qayta yuklanadi.
+    """
+
+    READ_SIZE = 1 << 20
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self._table_ready = False
+
+    def ensure_table(self) -> None:
+        if self._table_ready:
+            return
+        self.db_manager.execute_query("""
+            CREATE TABLE IF NOT EXISTS load_manifest (
+                table_name TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                file_size BIGINT NOT NULL,
+                chunk_size INTEGER NOT NULL,
+                record_count BIGINT NOT NULL,
+                loaded_at TIMESTAMP NOT NULL DEFAULT now()
+            );
+            CREATE TABLE IF NOT EXISTS load_manifest_chunks (
+                table_name TEXT NOT NULL,
+                chunk_no INTEGER NOT NULL,
+                chunk_hash TEXT NOT NULL,
+                record_count INTEGER NOT NULL,
+                PRIMARY KEY (table_name, chunk_no)
+            );
+        """)
+        self._table_ready = True
+
+    @staticmethod
+    def file_hash(file_path: str) -> Tuple[str, int]:
+        # Glob yoki shardlar papkasi bo'lsa fayllar nom tartibida ketma-ket xeshlanadi
+        digest = hashlib.sha256()
+        size = 0
+        for path in FileLoader.expand_inputs(file_path):
+            with open(path, 'rb') as f:
+                while True:
+                    block = f.read(LoadManifest.READ_SIZE)
+                    if not block:
+                        break
+                    digest.update(block)
+                    size += len(block)
+        return digest.hexdigest(), size
+
+    @staticmethod
+    def chunk_hash(raw_records: Iterable[str]) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for text in raw_records:
+            digest.update(text.encode('utf-8'))
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def get_file(self, table: str) -> Optional[Dict[str, object]]:
+        self.ensure_table()
+        rows = self.db_manager.fetch_all(
+            "SELECT file_hash, chunk_size, record_count FROM load_manifest WHERE table_name = %s",
+            (table,)
+        )
+        if not rows:
+            return None
+        return {'file_hash': rows[0][0], 'chunk_size': rows[0][1], 'record_count': rows[0][2]}
+
+    def get_chunk_hashes(self, table: str) -> Dict[int, str]:
+        self.ensure_table()
+        rows = self.db_manager.fetch_all(
+            "SELECT chunk_no, chunk_hash FROM load_manifest_chunks WHERE table_name = %s",
+            (table,)
+        )
+        return {row[0]: row[1] for row in rows}
+
+    def save(self, table: str, file_path: str, file_hash: str, file_size: int,
+             chunk_size: int, chunks: Dict[int, Tuple[str, int]]) -> None:
+        """Muvaffaqiyatli yuklashdan keyin manifestni yangilash (bitta tranzaksiyada)."""
+        self.ensure_table()
+        db = self.db_manager
+        record_count = sum(count for _, count in chunks.values())
+        try:
+            db.execute_query("DELETE FROM load_manifest_chunks WHERE table_name = %s", (table,), commit=False)
+            db.execute_batch(
+                "INSERT INTO load_manifest_chunks (table_name, chunk_no, chunk_hash, record_count) "
+                "VALUES (%s, %s, %s, %s)",
+                [(table, no, digest, count) for no, (digest, count) in sorted(chunks.items())],
+                commit=False
+            )
+            db.execute_query("""
+                INSERT INTO load_manifest (table_name, file_path, file_hash, file_size, chunk_size, record_count)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (table_name) DO UPDATE SET
+                    file_path = EXCLUDED.file_path,
+                    file_hash = EXCLUDED.file_hash,
+                    file_size = EXCLUDED.file_size,
+                    chunk_size = EXCLUDED.chunk_size,
+                    record_count = EXCLUDED.record_count,
+                    loaded_at = now()
+            """, (table, file_path, file_hash, file_size, chunk_size, record_count), commit=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        logger.info(f"✓ Manifest yangilandi: {table} ({len(chunks)} ta bo'lak)")
@@ -0,0 +1,302 @@
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+from .loader import FileLoader, DataTransformer
+from .column_cache import ColumnCache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ixtiyoriy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryReportEngine:
+    """QueryExecutor hisobotlarini PostgreSQL siz, fayllardan NumPy ustunlari bilan hisoblash.
+
+    Talabalar room bo'yicha saralanadi va guruhlash bincount / reduceat bilan bajariladi.
+    Natija DB dagi bilan bir xil: yillik yosh EXTRACT(YEAR FROM AGE()) semantikasida,
+    o'rtacha yosh PostgreSQL numeric bo'lish aniqligi va yaxlitlashida hisoblanadi.
+    Takrorlangan id larda (upsert kabi) oxirgi yozuv olinadi.
+    """
+
+    # Yoshni taqqoslash kaliti: (oy * 32 + kun) * sutkadagi mikrosekundlar + kun vaqti
+    US_PER_DAY = 86_400_000_000
+
+    # Top-5 hisobotlarda tenglikda tartib SQL da aniqlanmagan - faqat qiymatlar solishtiriladi
+    TIE_METRICS = {
+        'top_5_youngest_rooms': 'avg_age',
+        'top_5_age_diff_rooms': 'age_diff'
+    }
+
+    def __init__(self, chunk_size: int = FileLoader.DEFAULT_CHUNK_SIZE, today: Optional[date] = None,
+                 column_cache: Optional[ColumnCache] = None):
+        if np is None:
+            raise ImportError("memory engine uchun numpy o'rnatilgan bo'lishi kerak")
+        self.chunk_size = chunk_size
+        self.today = today or date.today()
+        self.column_cache = column_cache
+        self.room_ids: Optional['np.ndarray'] = None
+        self.room_names: Optional['np.ndarray'] = None
+        self.columns: Dict[str, 'np.ndarray'] = {}
+
+    @staticmethod
+    def _check_rejects(kind: str, rejects: List[Dict[str, Any]]) -> None:
+        if rejects:
+            first = rejects[0]
+            logger.error(f"✗ {kind} #{first['index']} da '{first['field']}' {first['reason']}")
+            raise ValueError(f"{kind} ma'lumotlari noto'g'ri formatda")
+
+    @staticmethod
+    def _iter_chunks(file_path: str, chunk_size: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        # (offset, bo'lak) - reject indekslari fayl bo'yicha bo'lishi uchun
+        offset = 0
+        for chunk in FileLoader.iter_json_chunks(file_path, chunk_size):
+            yield offset, chunk
+            offset += len(chunk)
+
+    @staticmethod
+    def _last_wins(ids: 'np.ndarray') -> Optional['np.ndarray']:
+        """Har bir id ning oxirgi uchrashi indekslari; takror bo'lmasa None (nusxa kerak emas)."""
+        reversed_ids = ids[::-1]
+        unique_ids, first_in_reversed = np.unique(reversed_ids, return_index=True)
+        if len(unique_ids) == len(ids):
+            return None
+        return len(ids) - 1 - first_in_reversed
+
+    def load_rooms(self, file_path: str) -> int:
+        ids, names = [], []
+        for offset, chunk in self._iter_chunks(file_path, self.chunk_size):
+            rows, rejects = DataTransformer.validate_and_transform_rooms(chunk, offset)
+            self._check_rejects('Rooms', rejects)
+            ids.extend(r[0] for r in rows)
+            names.extend(r[1] for r in rows)
+
+        self.room_ids = np.array(ids, dtype=np.int64)
+        self.room_names = np.array(names, dtype=object)
+        keep = self._last_wins(self.room_ids)
+        if keep is not None:
+            self.room_ids = self.room_ids[keep]
+            self.room_names = self.room_names[keep]
+
+        logger.info(f"✓ {len(self.room_ids)} ta xona xotiraga yuklandi")
+        return len(self.room_ids)
+
+    def _parse_students(self, file_path: str) -> Dict[str, 'np.ndarray']:
+        parts = []
+        for offset, chunk in self._iter_chunks(file_path, self.chunk_size):
+            columns, rejects = DataTransformer.students_to_columns(chunk, offset)
+            self._check_rejects('Students', rejects)
+            parts.append(columns)
+
+        if not parts:
+            parts.append(DataTransformer.students_to_columns([])[0])
+        return {
+            'id': np.concatenate([p['id'] for p in parts]),
+            'room_id': np.concatenate([p['room_id'] for p in parts]).astype(np.int32),
+            'no_room': np.concatenate([p['no_room'] for p in parts]).astype(np.uint8),
+            'birthday': np.concatenate([p['birthday'] for p in parts]),
+            'male': np.concatenate([p['sex'] == 'M' for p in parts]).astype(np.uint8)
+        }
+
+    def load_students(self, file_path: str) -> int:
+        if self.column_cache is not None:
+            # mmap qilingan ustunlar - takroriy id bo'lmasa nusxasiz ishlatiladi
+            columns, rejects = self.column_cache.load_students(file_path)
+            self._check_rejects('Students', rejects)
+        else:
+            columns = self._parse_students(file_path)
+
+        keep = self._last_wins(columns['id'])
+        names = ('id', 'room_id', 'no_room', 'birthday', 'male')
+        if keep is None:
+            self.columns = {name: columns[name] for name in names}
+        else:
+            self.columns = {name: columns[name][keep] for name in names}
+
+        count = len(self.columns['id'])
+        logger.info(f"✓ {count} ta talaba xotiraga yuklandi")
+        return count
+
+    def load(self, rooms_path: str, students_path: str) -> Dict[str, int]:
+        logger.info("=" * 50)
+        logger.info("MA'LUMOTLARNI XOTIRAGA YUKLASH (memory engine)")
+        logger.info("=" * 50)
+        return {'rooms': self.load_rooms(rooms_path), 'students': self.load_students(students_path)}
+
+    def ages(self, birthdays: 'np.ndarray') -> 'np.ndarray':
+        """EXTRACT(YEAR FROM AGE(birthday)) bugungi sana uchun, vektorlashtirilgan."""
+        b = birthdays.astype('datetime64[us]')
+        years = b.astype('datetime64[Y]').astype(np.int64) + 1970
+        months = b.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        days = (b.astype('datetime64[D]') - b.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64) + 1
+        time_of_day = (b - b.astype('datetime64[D]')).astype(np.int64)
+        key = (months * 32 + days) * self.US_PER_DAY + time_of_day
+
+        today = self.today
+        today_key = (today.month * 32 + today.day) * self.US_PER_DAY
+        past = b <= np.datetime64(today, 'us')
+
+        # O'tgan sanalar: tug'ilgan kun bu yil hali kelmagan bo'lsa bir yil kam.
+        # Kelajak sanalar: AGE() manfiy interval - to'liq yillar soni minus ishorasi bilan.
+        past_age = today.year - years - (key > today_key)
+        future_age = -((years - today.year) - (key < today_key))
+        return np.where(past, past_age, future_age)
+
+    @staticmethod
+    def pg_avg(total: int, count: int) -> Decimal:
+        """PostgreSQL numeric_div: natija shkalasi select_div_scale bo'yicha, yarmi noldan uzoqqa."""
+        def weight_and_first(value: int):
+            value = abs(value)
+            if value == 0:
+                return 0, 0
+            weight = (len(str(value)) - 1) // 4
+            return weight, value // 10000 ** weight
+
+        weight1, first1 = weight_and_first(total)
+        weight2, first2 = weight_and_first(count)
+        qweight = weight1 - weight2
+        if first1 <= first2:
+            qweight -= 1
+        rscale = min(max(16 - qweight * 4, 0), 1000)
+
+        with localcontext() as ctx:
+            ctx.prec = 1100
+            return (Decimal(total) / Decimal(count)).quantize(Decimal(1).scaleb(-rscale), rounding=ROUND_HALF_UP)
+
+    def room_stats(self) -> Dict[str, 'np.ndarray']:
+        """Har bir xona (id bo'yicha tartiblangan) uchun soni, yosh yig'indisi, min/max yosh, M/F soni."""
+        order = np.argsort(self.room_ids, kind='stable')
+        room_ids = self.room_ids[order]
+        room_names = self.room_names[order]
+        n_rooms = len(room_ids)
+
+        # Talabaning xonasi -> xonalar massividagi o'rni (INNER JOIN rooms kabi; NULL xona qo'shilmaydi)
+        students_room = self.columns['room_id'].astype(np.int64)
+        has_room = ~self.columns['no_room'].astype(bool)
+        position = np.searchsorted(room_ids, students_room)
+        known = np.zeros(len(students_room), dtype=bool)
+        if n_rooms:
+            in_range = has_room & (position < n_rooms)
+            known[in_range] = room_ids[position[in_range]] == students_room[in_range]
+
+        unknown = int(np.count_nonzero(~known & has_room))
+        if unknown:
+            logger.warning(f"{unknown} ta talabaning xonasi rooms da yo'q - hisobotlarga kirmaydi")
+
+        room_index = position[known]
+        birthdays = self.columns['birthday'][known]
+        male = self.columns['male'][known]
+        ages = self.ages(birthdays)
+
+        counts = np.bincount(room_index, minlength=n_rooms)
+        age_sums = np.bincount(room_index, weights=ages, minlength=n_rooms).astype(np.int64)
+        male_counts = np.bincount(room_index, weights=male, minlength=n_rooms).astype(np.int64)
+        female_counts = counts - male_counts
+
+        # Xona, keyin birthday bo'yicha saralab - har bir xona segmentidagi min/max birthday
+        min_age = np.zeros(n_rooms, dtype=np.int64)
+        max_age = np.zeros(n_rooms, dtype=np.int64)
+        occupied = np.flatnonzero(counts)
+        if len(occupied):
+            birthday_us = birthdays.astype('datetime64[us]').astype(np.int64)
+            sort = np.lexsort((birthday_us, room_index))
+            sorted_birthdays = birthday_us[sort]
+            starts = np.concatenate(([0], np.cumsum(counts[occupied])[:-1]))
+            oldest = np.minimum.reduceat(sorted_birthdays, starts)
+            youngest = np.maximum.reduceat(sorted_birthdays, starts)
+            max_age[occupied] = self.ages(oldest.astype('datetime64[us]'))
+            min_age[occupied] = self.ages(youngest.astype('datetime64[us]'))
+
+        return {
+            'room_id': room_ids,
+            'room_name': room_names,
+            'student_count': counts,
+            'age_sum': age_sums,
+            'min_age': min_age,
+            'max_age': max_age,
+            'male_count': male_counts,
+            'female_count': female_counts
+        }
+
+    @staticmethod
+    def _row(stats: Dict[str, 'np.ndarray'], i: int) -> Dict[str, Any]:
+        return {'room_id': int(stats['room_id'][i]), 'room_name': stats['room_name'][i]}
+
+    def _top_5_youngest_rooms(self, stats: Dict[str, 'np.ndarray']) -> List[Dict[str, Any]]:
+        occupied = np.flatnonzero(stats['student_count'])
+        if not len(occupied):
+            return []
+        approx = stats['age_sum'][occupied] / stats['student_count'][occupied]
+        # Aniq (numeric) qiymat faqat 5-o'ringa yaqin nomzodlar uchun hisoblanadi
+        k = min(5, len(occupied)) - 1
+        threshold = np.partition(approx, k)[k]
+        candidates = occupied[approx <= threshold + abs(threshold) * 1e-9 + 1e-12]
+        exact = [
+            (self.pg_avg(int(stats['age_sum'][i]), int(stats['student_count'][i])), int(i))
+            for i in candidates
+        ]
+        exact.sort()
+        return [
+            {**self._row(stats, i), 'avg_age': float(avg) if avg else 0.0}
+            for avg, i in exact[:5]
+        ]
+
+    def _top_5_age_diff_rooms(self, stats: Dict[str, 'np.ndarray']) -> List[Dict[str, Any]]:
+        occupied = np.flatnonzero(stats['student_count'])
+        age_diff = stats['max_age'][occupied] - stats['min_age'][occupied]
+        top = occupied[np.argsort(-age_diff, kind='stable')[:5]]
+        result = []
+        for i in top:
+            diff = int(stats['max_age'][i] - stats['min_age'][i])
+            result.append({**self._row(stats, i), 'age_diff': float(diff) if diff else 0.0})
+        return result
+
+    def execute_all(self) -> Dict[str, List[Dict[str, Any]]]:
+        logger.info("=" * 50)
+        logger.info("HISOBOTLARNI XOTIRADA HISOBLASH (memory engine)")
+        logger.info("=" * 50)
+
+        stats = self.room_stats()
+        n_rooms = len(stats['room_id'])
+        mixed = np.flatnonzero((stats['male_count'] > 0) & (stats['female_count'] > 0))
+
+        results = {
+            'room_student_count': [
+                {**self._row(stats, i), 'student_count': int(stats['student_count'][i])}
+                for i in range(n_rooms)
+            ],
+            'top_5_youngest_rooms': self._top_5_youngest_rooms(stats),
+            'top_5_age_diff_rooms': self._top_5_age_diff_rooms(stats),
+            'mixed_gender_rooms': [self._row(stats, i) for i in mixed]
+        }
+
+        for name, rows in results.items():
+            logger.info(f"✓ {name}: {len(rows)} ta natija")
+        return results
+
+    @classmethod
+    def diff(cls, expected: Dict[str, List[Dict[str, Any]]],
+             actual: Dict[str, List[Dict[str, Any]]]) -> Dict[str, str]:
+        """Ikki engine natijalarini solishtirish; farqli hisobotlar -> sabab."""
+        differences = {}
+        for name in expected.keys() | actual.keys():
+            left, right = expected.get(name), actual.get(name)
+            if left == right:
+                continue
+            metric = cls.TIE_METRICS.get(name)
+            if metric and left is not None and right is not None \
+                    and [r[metric] for r in left] == [r[metric] for r in right]:
+                # Bir xil qiymatli xonalar tartibi farq qiladi
+                continue
+            if left is None or right is None:
+                differences[name] = "hisobot faqat bitta engine da bor"
+            elif len(left) != len(right):
+                differences[name] = f"natijalar soni: {len(left)} != {len(right)}"
+            else:
+                index = next(i for i, (a, b) in enumerate(zip(left, right)) if a != b)
+                differences[name] = f"#{index}: {left[index]} != {right[index]}"
+        return differences
+
@@ -0,0 +1,237 @@
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+
+try:
+    import resource
+except ImportError:  # Windows da resource moduli yo'q - RSS yozilmaydi
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class RoundTripCounter:
+    """DB round-triplari hisoblagichi - DatabaseManager va uning klonlari uchun umumiy."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def add(self, count: int = 1) -> None:
+        with self._lock:
+            self._value += count
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class RunMetrics:
+    """BigDataApp.run bosqichlari metrikalari: JSON hisobot va Prometheus matn formati.
+
+    Har bir bosqich uchun devor vaqti, CPU vaqti (butun jarayon - oqimlar ham), qatorlar
+    va qator/s, o'qilgan baytlar, DB round-triplar va jarayonning eng katta RSS i.
+    profile_dir berilsa har bir bosqich cProfile bilan (faqat shu bosqich oqimida) yoziladi;
+    profile_dir yoki trace_memory bilan tracemalloc cho'qqisi ham o'lchanadi. Parallel bosqichlarda (masalan, bir vaqtda
+    bajarilgan hisobotlar) round-trip va xotira qiymatlari taxminiy.
+    """
+
+    PREFIX = 'bigdata'
+
+    # Prometheus metrikasi -> (bosqich yozuvidagi maydon, tavsif)
+    PROMETHEUS_METRICS = {
+        'stage_wall_seconds': ('wall_seconds', "Bosqich davomiyligi, sekund"),
+        'stage_cpu_seconds': ('cpu_seconds', "Bosqichdagi jarayon CPU vaqti, sekund"),
+        'stage_rows': ('rows', "Bosqichda qayta ishlangan qatorlar"),
+        'stage_rows_per_second': ('rows_per_sec', "Qatorlar/sekund"),
+        'stage_bytes_read': ('bytes_read', "Bosqichda o'qilgan baytlar"),
+        'stage_bytes_written': ('bytes_written', "Bosqichda yozilgan baytlar"),
+        'stage_db_round_trips': ('round_trips', "Bosqichdagi DB round-triplar"),
+        'stage_peak_rss_bytes': ('peak_rss_bytes', "Bosqich oxiridagi jarayon RSS cho'qqisi"),
+        'stage_tracemalloc_peak_bytes': ('tracemalloc_peak_bytes', "Bosqichdagi tracemalloc cho'qqisi"),
+        'stage_busy_seconds': ('busy_seconds', "Pipeline bosqichining band vaqti"),
+        'stage_idle_seconds': ('idle_seconds', "Pipeline bosqichining kirish kutgan vaqti"),
+        'stage_blocked_seconds': ('blocked_seconds', "Pipeline bosqichining to'la navbatni kutgan vaqti")
+    }
+
+    def __init__(self, round_trips: Optional[RoundTripCounter] = None, profile_dir: Optional[str] = None,
+                 trace_memory: bool = False):
+        self.round_trips = round_trips or RoundTripCounter()
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory or bool(profile_dir)
+        self.stages: List[Dict[str, Any]] = []
+        self.explain_files: Dict[str, str] = {}
+        # Bosqich -> amaldagi PostgreSQL sessiya sozlamalari
+        self.session_profiles: Dict[str, Dict[str, str]] = {}
+        self.started_at = datetime.now()
+        self.status = 'running'
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if profile_dir:
+            os.makedirs(os.path.join(profile_dir, 'profile'), exist_ok=True)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @staticmethod
+    def peak_rss() -> Optional[int]:
+        if resource is None:
+            return None
+        # Linux da kilobaytlarda
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _profile_path(self, name: str) -> str:
+        return os.path.join(self.profile_dir, 'profile', f"{name}.prof")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Bosqichni o'lchash; chaqiruvchi yozuvga 'rows', 'bytes_read' ni qo'shishi mumkin."""
+        record = {'stage': name, 'rows': 0, 'bytes_read': 0}
+        # cProfile bitta oqimda bir vaqtda faqat bittasi - ichki bosqichlar profil qilinmaydi
+        profiler = None
+        if self.profile_dir and not getattr(self._local, 'profiling', False):
+            profiler = cProfile.Profile()
+            self._local.profiling = True
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+
+        round_trips = self.round_trips.value
+        cpu = time.process_time()
+        started = time.perf_counter()
+        status = 'ok'
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException:
+            status = 'failed'
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._local.profiling = False
+            wall = time.perf_counter() - started
+            record.update(
+                status=status,
+                wall_seconds=wall,
+                cpu_seconds=time.process_time() - cpu,
+                round_trips=self.round_trips.value - round_trips,
+                rows_per_sec=record['rows'] / wall if wall > 0 else 0.0,
+                peak_rss_bytes=self.peak_rss()
+            )
+            if self.trace_memory:
+                record['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            if profiler is not None:
+                record['profile'] = self._profile_path(name)
+                profiler.dump_stats(record['profile'])
+            with self._lock:
+                self.stages.append(record)
+
+    def add_stage(self, name: str, **values: Any) -> None:
+        """Tashqarida o'lchangan bosqich (masalan, yuklash pipeline ining read/transform/write)."""
+        with self._lock:
+            self.stages.append({'stage': name, **values})
+
+    def add_pipeline(self, pipeline: Any, prefix: str = '') -> None:
+        """LoadPipeline bosqichlari: read (parse), transform (tekshirish va o'zgartirish), write (DB)."""
+        base = f"{prefix}.{pipeline.name}" if prefix else pipeline.name
+        for stats in pipeline.stats.values():
+            self.add_stage(
+                f"{base}.{stats['stage']}",
+                busy_seconds=stats['busy'],
+                idle_seconds=stats['idle'],
+                blocked_seconds=stats['blocked'],
+                chunks=stats['items']
+            )
+
+    def to_dict(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        report = {
+            'started_at': self.started_at.isoformat(),
+            'status': self.status,
+            'wall_seconds': time.perf_counter() - self._started,
+            'cpu_seconds': time.process_time(),
+            'db_round_trips': self.round_trips.value,
+            'peak_rss_bytes': self.peak_rss(),
+            'stages': self.stages
+        }
+        if self.session_profiles:
+            report['session_profiles'] = self.session_profiles
+        if self.explain_files:
+            report['explain'] = self.explain_files
+        if extra:
+            report.update(extra)
+        return report
+
+    def write_json(self, path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(extra), f, ensure_ascii=False, indent=2, default=str)
+        logger.info(f"✓ Run hisoboti yozildi: {path}")
+
+    @staticmethod
+    def _label(value: str) -> str:
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for metric, (field, help_text) in self.PROMETHEUS_METRICS.items():
+            samples = [
+                (stage['stage'], stage[field]) for stage in self.stages
+                if stage.get(field) is not None
+            ]
+            if not samples:
+                continue
+            name = f"{self.PREFIX}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(f'{name}{{stage="{self._label(stage)}"}} {value}' for stage, value in samples)
+
+        report = self.to_dict()
+        for metric, field, help_text in (
+            ('run_wall_seconds', 'wall_seconds', "Butun ishga tushirish davomiyligi, sekund"),
+            ('run_cpu_seconds', 'cpu_seconds', "Butun jarayon CPU vaqti, sekund"),
+            ('run_db_round_trips', 'db_round_trips', "Jami DB round-triplar"),
+            ('run_peak_rss_bytes', 'peak_rss_bytes', "Jarayonning RSS cho'qqisi")
+        ):
+            if report[field] is None:
+                continue
+            name = f"{self.PREFIX}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {report[field]}")
+
+        name = f"{self.PREFIX}_run_success"
+        lines.append(f"# HELP {name} 1 - muvaffaqiyatli, 0 - xatolik")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {1 if self.status == 'ok' else 0}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # node_exporter textfile collector yarim yozilgan faylni o'qimasligi uchun
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        logger.info(f"✓ Prometheus metrikalari yozildi: {path}")
+
+    def print_summary(self) -> None:
+        logger.info("=" * 50)
+        logger.info("BOSQICHLAR METRIKALARI")
+        logger.info("=" * 50)
+        for stage in self.stages:
+            if 'wall_seconds' not in stage:
+                continue
+            logger.info(
+                f"  {stage['stage']}: {stage['wall_seconds']:.2f} s, CPU {stage['cpu_seconds']:.2f} s, "
+                f"{stage['rows']} qator ({stage['rows_per_sec']:.0f}/s), "
+                f"{stage['round_trips']} round-trip"
+            )
@@ -0,0 +1,287 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+from .database import DatabaseManager
+from .data_loader import DataLoader
+from .manifest import LoadManifest
+from .indexes import IndexManager
+from .column_cache import ColumnCache
+from .checkpoint import LoadCheckpoint, DeadLetter
+from .batches import StudentBatch, np
+from .room_stats import RoomStatsManager
+from .partitions import PartitionRouter, StudentPartitions
+
+logger = logging.getLogger(__name__)
+
+# (jadval, batchlar) - oddiy jadvalda 'students', bo'limlarda bo'lim nomi
+WorkItem = Tuple[str, List[StudentBatch]]
+
+
+class ParallelDataLoader(DataLoader):
+    """Students ni bir nechta ulanish orqali parallel yuklash.
+
+    Rooms oddiy yo'l bilan (bitta ulanishda) commit qilinadi, keyin students
+    bo'laklari N ta workerga taqsimlanadi. Har bir worker o'z ulanishi va
+    tranzaksiyasiga ega; hamma worker tugagach, xatolik bo'lmasa commit qiladi.
+
+    Oddiy jadvalda qatorlar workerlarga id % workers bo'yicha taqsimlanadi: bir xil id doim
+    bitta workerga tushadi, shuning uchun fayldagi takroriy id o'sha tranzaksiyada darhol
+    UniqueViolation beradi va workerlar bir-birining commit qilinmagan qatorini kutmaydi
+    (barrierda kutayotgan worker bilan o'zaro qulflanish bo'lmaydi).
+
+    students hash bo'limlangan bo'lsa, bo'sh jadvalga yuklashda bo'laklar mijoz tomonida
+    bo'limlarga ajratiladi va har bir worker o'z bo'limlariga (bo'lim % workers) to'g'ridan-
+    to'g'ri COPY qiladi - workerlar bir xil bo'lim va indekslar uchun raqobatlashmaydi.
+
+    Ma'lum narx: bo'limlarga to'g'ridan-to'g'ri COPY ota jadvalning statement triggerlarini
+    (room_stats) ishga tushirmaydi, id yagonaligini esa bo'limlangan jadval umuman saqlamaydi.
+    Shuning uchun commit dan keyin takroriy id lar GROUP BY id bilan tekshiriladi va room_stats
+    to'liq qayta hisoblanadi - ikkalasi ham butun students bo'yicha o'qish. Bu yo'l faqat bo'sh
+    jadvalga ishlaydi, ya'ni narx yuklangan qatorlar soniga proporsional (taxminan yana bitta
+    o'qish va saralash). Oddiy jadvalda ham workerlar triggerni o'chirgani uchun room_stats qayta
+    hisoblanadi; to'ldirilgan jadvalga upsert qilinganda bu butun jadval narxi.
+    """
+
+    QUEUE_TIMEOUT = 0.5
+
+    def __init__(self, db_manager: DatabaseManager, workers: int = 4,
+                 chunk_size: int = DataLoader.DEFAULT_CHUNK_SIZE, strategy: str = 'auto',
+                 manifest: Optional[LoadManifest] = None, force_reload: bool = False,
+                 index_manager: Optional[IndexManager] = None, column_cache: Optional[ColumnCache] = None,
+                 parse_workers: int = 1, pipeline_depth: int = DataLoader.DEFAULT_PIPELINE_DEPTH,
+                 checkpoint: Optional[LoadCheckpoint] = None, dead_letter: Optional[DeadLetter] = None):
+        super().__init__(db_manager, chunk_size=chunk_size, strategy=strategy,
+                         manifest=manifest, force_reload=force_reload, index_manager=index_manager,
+                         column_cache=column_cache, parse_workers=parse_workers,
+                         pipeline_depth=pipeline_depth, checkpoint=checkpoint, dead_letter=dead_letter)
+        if workers < 1:
+            raise ValueError("workers soni 1 dan kichik bo'lmasligi kerak")
+        self.workers = workers
+        self.worker_stats: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _finish(db: DatabaseManager, failed: threading.Event, barrier: threading.Barrier) -> None:
+        # Barcha workerlar tugashini kutib, birga commit yoki rollback qilamiz
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            failed.set()
+
+        if db is None:
+            return
+        if failed.is_set():
+            db.rollback()
+        else:
+            db.commit()
+
+    def _worker(self, worker_id: int, work: queue.Queue, use_copy: bool,
+                failed: threading.Event, barrier: threading.Barrier) -> Dict[str, Any]:
+        stats = {'worker': worker_id, 'rows': 0, 'batches': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+        started = time.perf_counter()
+        finished = False
+
+        try:
+            with self.db_manager.pooled() as db:
+                try:
+                    # Workerlar bir xil xonalarni yangilab bir-birini bloklamasligi uchun
+                    # room_stats triggeri o'chiriladi va yuklashdan keyin qayta hisoblanadi
+                    db.execute_query(f"SET LOCAL {RoomStatsManager.DEFERRED_SETTING} = 'on'", commit=False)
+                    while not failed.is_set():
+                        item = work.get()
+                        if item is None:
+                            break
+
+                        table, batches = item
+                        if use_copy:
+                            db.bulk_copy(table, self.STUDENT_COLUMNS, batches, commit=False)
+                        else:
+                            for batch in batches:
+                                db.execute_batch(self.STUDENT_UPSERT, batch, commit=False)
+
+                        stats['rows'] += sum(len(batch) for batch in batches)
+                        stats['batches'] += len(batches)
+                except Exception:
+                    failed.set()
+                    raise
+                finally:
+                    finished = True
+                    self._finish(db, failed, barrier)
+        except Exception as e:
+            logger.error(f"✗ Worker #{worker_id} xatolik: {e}")
+            failed.set()
+            if not finished:
+                self._finish(None, failed, barrier)
+            raise
+
+        stats['seconds'] = time.perf_counter() - started
+        if stats['seconds'] > 0:
+            stats['rows_per_sec'] = stats['rows'] / stats['seconds']
+        return stats
+
+    def _route(self, batches: Iterator[StudentBatch], queues: List[queue.Queue],
+               router: Optional[PartitionRouter]) -> Iterator[Tuple[queue.Queue, WorkItem]]:
+        """(navbat, ish) juftliklari; bo'limlarda har bir bo'lim uchun chunk_size gacha yig'iladi."""
+        if router is None:
+            for batch in batches:
+                for worker, part in self._split_ids(batch, len(queues)):
+                    yield queues[worker], ('students', [part])
+            return
+
+        pending: Dict[int, List[StudentBatch]] = {}
+        pending_rows: Dict[int, int] = {}
+        for batch in batches:
+            for partition, part in router.split(batch):
+                pending.setdefault(partition, []).append(part)
+                pending_rows[partition] = pending_rows.get(partition, 0) + len(part)
+                # Kichik bo'laklar alohida COPY bo'lmasligi uchun
+                if pending_rows[partition] >= self.chunk_size:
+                    yield queues[partition % len(queues)], (router.tables[partition], pending.pop(partition))
+                    pending_rows[partition] = 0
+        for partition, parts in sorted(pending.items()):
+            yield queues[partition % len(queues)], (router.tables[partition], parts)
+
+    @staticmethod
+    def _split_ids(batch: StudentBatch, workers: int) -> List[Tuple[int, StudentBatch]]:
+        """(worker indeksi, id % workers shu workerga teng qatorlar) - qatorlar tartibi saqlanadi."""
+        if workers == 1:
+            return [(0, batch)]
+        if np is not None:
+            owners = np.frombuffer(batch.ids, dtype=batch.ids.typecode) % workers
+            groups = [(worker, np.flatnonzero(owners == worker)) for worker in range(workers)]
+        else:
+            indices: Dict[int, List[int]] = {}
+            for index, student_id in enumerate(batch.ids):
+                indices.setdefault(student_id % workers, []).append(index)
+            groups = sorted(indices.items())
+        return [(worker, batch.take(rows)) for worker, rows in groups if len(rows)]
+
+    def _produce(self, items: Iterator[Tuple[queue.Queue, WorkItem]], queues: List[queue.Queue],
+                 failed: threading.Event) -> None:
+        """queues - har bir worker uchun uning navbati (umumiy navbat bo'lsa bir xil obyekt)."""
+        try:
+            for work, item in items:
+                while not failed.is_set():
+                    try:
+                        work.put(item, timeout=self.QUEUE_TIMEOUT)
+                        break
+                    except queue.Full:
+                        continue
+                if failed.is_set():
+                    return
+        except Exception:
+            failed.set()
+            raise
+        finally:
+            for work in queues:
+                while True:
+                    try:
+                        work.put(None, timeout=self.QUEUE_TIMEOUT)
+                        break
+                    except queue.Full:
+                        # Worker to'xtagan bo'lsa navbatni bo'shatamiz
+                        if failed.is_set():
+                            self._drain(work)
+
+    @staticmethod
+    def _drain(work: queue.Queue) -> None:
+        try:
+            while True:
+                work.get_nowait()
+        except queue.Empty:
+            pass
+
+    def load_students(self, file_path: str) -> int:
+        self.partitions = StudentPartitions(self.db_manager).partitions()
+        empty = self.db_manager.is_table_empty('students')
+        if (self.strategy == 'merge' or self.partitions) and not empty:
+            # Merge bitta to'plamli so'rov - parallel yuklash kerak emas
+            logger.info("merge strategiyasi: students bitta ulanishda yuklanadi")
+            return super().load_students(file_path)
+        if self.partitions and self.strategy == 'upsert':
+            logger.info("Bo'limlangan students da upsert merge orqali: bitta ulanishda yuklanadi")
+            return super().load_students(file_path)
+        if self.checkpoint is not None:
+            # Checkpoint bo'laklar tartibida commit qilinishini talab qiladi
+            logger.info("--resume: students bitta ulanishda bo'laklab commit qilinadi")
+            return super().load_students(file_path)
+
+        if not self._begin_manifest('students', file_path):
+            return 0
+        self._begin_checkpoint('students', 'Students', file_path)
+
+        workers = self.workers
+        if self.partitions and len(self.partitions) < workers:
+            # Har bir bo'lim bitta workerda
+            workers = len(self.partitions)
+        pool_max = self.db_manager.pool_max if self.db_manager.pool is not None else 0
+        if pool_max and pool_max < workers:
+            # Barcha workerlar bir vaqtda ulanishga ega bo'lishi kerak (barrier)
+            logger.warning(f"Pool hajmi {pool_max} - workerlar soni {workers} dan {pool_max} ga kamaytirildi")
+            workers = pool_max
+
+        logger.info("=" * 50)
+        logger.info(f"STUDENTS MA'LUMOTLARINI PARALLEL YUKLASH BOSHLANDI ({workers} worker)")
+        logger.info("=" * 50)
+
+        use_copy = self.strategy != 'upsert' and empty
+        if self.partitions:
+            router = StudentPartitions(self.db_manager).router()
+            logger.info(f"students: {len(self.partitions)} ta bo'lim, bo'laklar bo'limlarga yo'naltiriladi")
+        else:
+            router = None
+        queues = [queue.Queue(maxsize=2) for _ in range(workers)]
+        failed = threading.Event()
+        barrier = threading.Barrier(workers)
+
+        merged = None
+        self._prepare_indexes(file_path)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='loader') as pool:
+                futures = [
+                    pool.submit(self._worker, worker_id, queues[worker_id], use_copy, failed, barrier)
+                    for worker_id in range(workers)
+                ]
+                items = self._route(self.iter_student_batches(file_path), queues, router)
+                self._produce(items, queues, failed)
+                errors = [error for error in (future.exception() for future in futures) if error is not None]
+                if errors and not all(isinstance(error, self.DUPLICATE_ERRORS) for error in errors):
+                    raise errors[0]
+                self.worker_stats = [future.result() for future in futures] if not errors else []
+            
+            duplicates = bool(errors)
+            if not duplicates and self._has_duplicate_ids('students'):
+                # Bo'limlarda unikal id yo'q - takrorlar faqat commit dan keyin ko'rinadi; jadval bo'sh edi,
+                # shuning uchun bu tekshiruv yuklangan qatorlarni bir marta o'qiydi
+                self.db_manager.execute_query("TRUNCATE students", commit=False)
+                duplicates = True
+                self.worker_stats = []
+            if duplicates:
+                # Barcha workerlar rollback qilgan - bitta ulanishda merge (oxirgi yozuv qoladi)
+                logger.warning("students: faylda takroriy id - parallel yuklash bekor qilindi, "
+                               "merge bilan qayta yuklanadi")
+                self._restart_rejects('Students', 'students')
+                merged = self._merge_batches('students', self.STUDENT_COLUMNS, self.iter_student_batches(file_path))
+        finally:
+            self._finish_indexes()
+            self.db_manager.generation.bump()
+
+        self._finish_manifest('students', file_path)
+
+        room_stats = RoomStatsManager(self.db_manager)
+        if room_stats.is_installed():
+            # Triggerlar o'chirilgan (bo'limlarda umuman ishlamaydi) - to'liq qayta hisoblash, O(jadval)
+            room_stats.rebuild()
+
+        count = merged or 0
+        for stats in self.worker_stats:
+            count += stats['rows']
+            logger.info(
+                f"  Worker #{stats['worker']}: {stats['rows']} ta yozuv, "
+                f"{stats['seconds']:.2f} s, {stats['rows_per_sec']:.0f} yozuv/s"
+            )
+
+        logger.info(f"✓ {count} ta talaba yuklandi")
+        return count
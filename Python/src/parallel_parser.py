@@ -0,0 +1,176 @@
+import multiprocessing
+import os
+import queue
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+from .loader import FileLoader, DataTransformer
+from .batches import RecordBatch
+
+logger = logging.getLogger(__name__)
+
+# (fayl, boshlanish, oxir) - oxir None bo'lsa butun fayl (shard)
+Task = Tuple[str, int, Optional[int]]
+
+
+# Worker jarayonidagi natija navbatlari va to'xtash belgisi - pul initializeri orqali bir marta
+# uzatiladi, vazifaga faqat slot raqami beriladi (navbatlarni vazifa argumenti qilib bo'lmaydi)
+_slots: List[Any] = []
+_stop = None
+
+
+def _init_worker(slots: List[Any], stop) -> None:
+    global _slots, _stop
+    for results in slots:
+        # Erta to'xtaganda pipe ga yozilmay qolgan bo'lak jarayon chiqishini kutdirmasin
+        results.cancel_join_thread()
+    _slots = slots
+    _stop = stop
+
+
+def _put(results, item, stop) -> bool:
+    # To'lgan navbatda kutish; iste'molchi to'xtagan bo'lsa False
+    while True:
+        try:
+            results.put(item, timeout=ParallelParser.POLL_SECONDS)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
+
+
+def _parse_task(table: str, task: Task, chunk_size: int, slot: int) -> None:
+    """Worker jarayonida bitta shard yoki bayt oralig'ini parse qilib, batchlarga aylantirish.
+
+    Har bir bo'lak (batch, rejectlar, bo'lak oxiri) tayyor bo'lishi bilan ``slot``
+    navbatiga qo'yiladi, oxirida None; indekslar vazifa boshidan. Navbat cheklangan -
+    iste'molchi ulgurmasa worker kutadi, butun shard xotirada yig'ilmaydi. To'xtash
+    belgisi o'rnatilsa (iste'molchi to'xtadi) vazifa tugatilmasdan chiqiladi.
+    """
+    results, stop = _slots[slot], _stop
+    path, start, end = task
+    if end is None:
+        records = FileLoader.iter_json(path)
+    else:
+        records = FileLoader.iter_ndjson_range(path, start, end)
+    to_batch = DataTransformer.students_to_batch if table == 'students' else DataTransformer.rooms_to_batch
+
+    count = 0
+    while not stop.is_set():
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            _put(results, None, stop)
+            return
+        batch, rejects = to_batch(chunk, count)
+        count += len(chunk)
+        if not _put(results, (batch, rejects, count), stop):
+            return
+
+
+class ParallelParser:
+    """Shardlar yoki katta NDJSON faylining bayt oraliqlarini jarayonlar pulida parse qilish.
+
+    Har bir vazifa (shard yoki oraliq) alohida jarayonda JSON parse va tekshiruvdan o'tib,
+    ixcham RecordBatch larga aylanadi. Natijalar vazifalar tartibida qaytariladi - takroriy
+    id larda oxirgi yozuv yutishi ketma-ket o'qishdagidek saqlanadi. Bir vaqtda ko'pi bilan
+    ``max_pending`` ta vazifa bajarilmoqda, har biri bo'laklarni o'z slotidagi ``QUEUE_SIZE``
+    o'rinli navbat orqali beradi - xotirada taxminan max_pending * (QUEUE_SIZE + 1) ta bo'lak.
+    Navbatlar pul kontekstining multiprocessing.Queue lari: bo'lak workerdan to'g'ridan-to'g'ri
+    pipe orqali keladi (Manager jarayoni orqali ikki marta pickle qilinmaydi).
+    """
+
+    # Siqilmagan NDJSON shu hajmdan katta bo'lsa oraliqlarga bo'linadi
+    RANGE_SIZE = 32 << 20
+    # Har bir vazifa navbatida kutishi mumkin bo'lgan tayyor bo'laklar soni
+    QUEUE_SIZE = 2
+    # Navbat bo'sh bo'lsa worker xatosini tekshirish oralig'i
+    POLL_SECONDS = 1.0
+
+    def __init__(self, workers: int = os.cpu_count() or 1,
+                 chunk_size: int = FileLoader.DEFAULT_CHUNK_SIZE,
+                 range_size: int = RANGE_SIZE, max_pending: Optional[int] = None):
+        if workers < 1:
+            raise ValueError("parse workerlar soni 1 dan kichik bo'lmasligi kerak")
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.range_size = range_size
+        self.max_pending = max_pending or workers * 2
+
+    def plan(self, file_path: str) -> List[Task]:
+        tasks = []
+        for path in FileLoader.expand_inputs(file_path):
+            splittable = (
+                not FileLoader.is_compressed(path)
+                and os.path.getsize(path) > self.range_size
+                and FileLoader.detect_file_format(path) == 'ndjson'
+            )
+            if splittable:
+                tasks.extend((path, start, end) for start, end in FileLoader.split_ranges(path, self.range_size))
+            else:
+                tasks.append((path, 0, None))
+        return tasks
+
+    @staticmethod
+    def _context():
+        # Loader oqimlari ishlayotganda fork xavfli (qulflar nusxalanadi) - toza jarayonlar
+        methods = multiprocessing.get_all_start_methods()
+        return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+    def _drain(self, future: Future, results) -> Iterator[Tuple[RecordBatch, List[Dict[str, Any]], int]]:
+        while True:
+            try:
+                item = results.get(timeout=self.POLL_SECONDS)
+            except queue.Empty:
+                if future.done() and future.exception() is not None:
+                    raise future.exception()
+                continue
+            if item is None:
+                return
+            yield item
+
+    def iter_results(self, table: str, file_path: str) -> Iterator[Tuple[RecordBatch, List[Dict[str, Any]], int]]:
+        """(batch, rejectlar, bo'lak oxiri) tartib bilan; indekslar butun kirish bo'yicha."""
+        tasks = self.plan(file_path)
+        if not tasks:
+            logger.error(f"✗ Fayl topilmadi: {file_path}")
+            raise FileNotFoundError(file_path)
+        logger.info(f"{file_path}: {len(tasks)} ta vazifa, {self.workers} ta parse jarayoni")
+
+        context = self._context()
+        stop = context.Event()
+        slots = [context.Queue(self.QUEUE_SIZE) for _ in range(self.max_pending)]
+        free = deque(range(self.max_pending))
+        pool = ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), mp_context=context,
+                                   initializer=_init_worker, initargs=(slots, stop))
+        try:
+            remaining = iter(tasks)
+            pending = deque()
+
+            def submit() -> None:
+                for task in islice(remaining, len(free)):
+                    slot = free.popleft()
+                    pending.append((pool.submit(_parse_task, table, task, self.chunk_size, slot), slot))
+
+            offset = 0
+            while True:
+                # Iste'molchi batchlarni yuklayotganda workerlar keyingi vazifalarni parse qiladi
+                submit()
+                if not pending:
+                    break
+                future, slot = pending.popleft()
+                end = 0
+                for batch, rejects, end in self._drain(future, slots[slot]):
+                    for reject in rejects:
+                        reject['index'] += offset
+                    yield batch, rejects, offset + end
+                offset += end
+                # None olindi - navbat bo'sh, slot keyingi vazifaga beriladi
+                free.append(slot)
+        finally:
+            # Erta to'xtaganda (xato, byudjet) to'lgan navbatda kutayotgan workerlar ham chiqadi
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            for results in slots:
+                results.close()
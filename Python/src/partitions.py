@@ -0,0 +1,185 @@
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from .database import DatabaseManager
+from .batches import StudentBatch
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionRouter:
+    """StudentBatch qatorlarini room_id bo'yicha hash bo'limlariga ajratish (mijoz tomonida).
+
+    Xona -> bo'lim xaritasi serverning o'z hash funksiyasi (satisfies_hash_partition) bilan
+    olinadi, shuning uchun qatorlar aynan PostgreSQL yo'naltiradigan bo'limga tushadi.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, tables: List[str], room_partitions: Dict[Optional[int], int]):
+        self.db_manager = db_manager
+        self.tables = tables
+        self.room_partitions = room_partitions
+
+    def _resolve(self, room_id: Optional[int]) -> int:
+        # rooms da yo'q xona (FK xatosi bo'ladi) yoki xonasiz talaba - serverdan so'raladi
+        rows = self.db_manager.fetch_all(
+            "SELECT i FROM generate_series(0, %s - 1) AS i "
+            "WHERE satisfies_hash_partition('students'::regclass, %s, i, %s::integer)",
+            (len(self.tables), len(self.tables), room_id)
+        )
+        partition = rows[0][0]
+        self.room_partitions[room_id] = partition
+        return partition
+
+    def split(self, batch: StudentBatch) -> List[Tuple[int, StudentBatch]]:
+        """(bo'lim indeksi, shu bo'limga tegishli qatorlar) - qatorlar tartibi saqlanadi."""
+        groups: Dict[int, List[int]] = defaultdict(list)
+        room_partitions = self.room_partitions
+        # Xonasiz talabalar None kaliti ostida
+        for index, room_id in enumerate(batch.room_values()):
+            partition = room_partitions.get(room_id)
+            if partition is None:
+                partition = self._resolve(room_id)
+            groups[partition].append(index)
+        if len(groups) == 1:
+            return [(next(iter(groups)), batch)]
+        return [(partition, batch.take(indices)) for partition, indices in sorted(groups.items())]
+
+
+class StudentPartitions:
+    """students jadvalining ixtiyoriy room_id bo'yicha hash bo'limlari (PARTITION BY HASH).
+
+    Bo'limlangan jadvalda unikal kalit bo'lim kalitini o'z ichiga olishi kerak, room_id esa
+    NULL bo'lishi mumkin - shuning uchun id da PRIMARY KEY o'rniga oddiy indeks bor va id
+    yagonaligini yuklovchi saqlaydi (merge: o'zgargan qatorlar o'chirilib qayta qo'shiladi;
+    bo'sh jadvalga COPY dan keyin takroriy id tekshiriladi va topilsa merge bilan qayta yuklanadi).
+    migrate() oddiy jadval va istalgan bo'limlar soni orasida ma'lumotlar bilan ko'chiradi.
+    """
+
+    TABLE = 'students'
+    ID_INDEX = 'idx_students_id'
+    # Yangi ustunlar ta'rifi sql/schema.sql dagi bilan bir xil bo'lishi kerak
+    COLUMNS = """
+        id INTEGER NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        birthday TIMESTAMP NOT NULL,
+        sex CHAR(1) NOT NULL CHECK (sex IN ('M', 'F')),
+        room_id INTEGER,
+        FOREIGN KEY (room_id) REFERENCES rooms(id) ON DELETE SET NULL
+    """
+    COLUMN_NAMES = 'id, name, birthday, sex, room_id'
+    BOUND_PATTERN = re.compile(r'modulus (\d+), remainder (\d+)', re.IGNORECASE)
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    @classmethod
+    def partition_name(cls, remainder: int) -> str:
+        return f"{cls.TABLE}_p{remainder}"
+
+    def partitions(self, table: str = TABLE) -> List[str]:
+        """Bo'limlar nomlari remainder tartibida; jadval bo'limlanmagan bo'lsa bo'sh ro'yxat."""
+        rows = self.db_manager.fetch_all("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_partitioned_table p ON p.partrelid = i.inhparent
+            WHERE i.inhparent = to_regclass(%s)
+        """, (table,))
+        bounds = []
+        for name, bound in rows:
+            match = self.BOUND_PATTERN.search(bound or '')
+            if match is None:
+                raise ValueError(f"{table}: {name} hash bo'limi emas ({bound})")
+            bounds.append((int(match.group(2)), name))
+        return [name for _, name in sorted(bounds)]
+
+    def count(self) -> int:
+        return len(self.partitions())
+
+    def router(self) -> PartitionRouter:
+        tables = self.partitions()
+        if not tables:
+            raise ValueError("students jadvali bo'limlanmagan")
+        rows = self.db_manager.fetch_all("""
+            SELECT r.id, p.i
+            FROM rooms r
+            CROSS JOIN generate_series(0, %s - 1) AS p(i)
+            WHERE satisfies_hash_partition('students'::regclass, %s, p.i, r.id)
+        """, (len(tables), len(tables)))
+        return PartitionRouter(self.db_manager, tables, dict(rows))
+
+    def _create_statements(self, partitions: int) -> List[str]:
+        if partitions == 0:
+            return [f"CREATE TABLE {self.TABLE} ({self.COLUMNS})"]
+        statements = [f"CREATE TABLE {self.TABLE} ({self.COLUMNS}) PARTITION BY HASH (room_id)"]
+        statements.extend(
+            f"CREATE TABLE {self.partition_name(i)} PARTITION OF {self.TABLE} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+            for i in range(partitions)
+        )
+        return statements
+
+    def _key_statement(self, partitions: int) -> str:
+        if partitions == 0:
+            return f"ALTER TABLE {self.TABLE} ADD PRIMARY KEY (id)"
+        # Bo'limlangan indeks - har bir bo'limda alohida (id bo'yicha merge va qidiruv uchun)
+        return f"CREATE INDEX {self.ID_INDEX} ON {self.TABLE} (id)"
+
+    def migrate(self, partitions: int) -> Dict[str, Any]:
+        """students ni ``partitions`` ta hash bo'limli (0 - oddiy) jadvalga ma'lumotlari bilan ko'chirish.
+
+        Bitta tranzaksiyada: eski jadval (va bo'limlari) qayta nomlanadi, yangisi yaratilib
+        qatorlar ko'chiriladi, eskisi o'chiriladi. Ikkilamchi indekslar va room_stats triggerlari
+        eski jadval bilan o'chadi - ularni chaqiruvchi qayta o'rnatadi.
+        """
+        if partitions < 0 or partitions == 1:
+            raise ValueError("bo'limlar soni 0 (bo'limsiz) yoki 2 dan katta bo'lishi kerak")
+
+        current = self.partitions()
+        if len(current) == partitions and (partitions or self._exists()):
+            logger.info(f"students allaqachon {partitions} ta bo'limda - migratsiya kerak emas")
+            return {'partitions': partitions, 'rows': None, 'seconds': 0.0}
+
+        logger.info("=" * 50)
+        logger.info(f"STUDENTS MIGRATSIYASI: {len(current)} -> {partitions} ta bo'lim")
+        logger.info("=" * 50)
+
+        old_table = f"{self.TABLE}_migrating"
+        db = self.db_manager
+        started = time.perf_counter()
+        try:
+            db.execute_query(f"LOCK TABLE {self.TABLE} IN ACCESS EXCLUSIVE MODE", commit=False)
+            db.execute_query(f"ALTER TABLE {self.TABLE} RENAME TO {old_table}", commit=False)
+            for name in current:
+                # Yangi bo'limlar nomlari bilan to'qnashmasligi uchun
+                db.execute_query(f"ALTER TABLE {name} RENAME TO {name}_migrating", commit=False)
+            for statement in self._create_statements(partitions):
+                db.execute_query(statement, commit=False)
+            db.execute_query(
+                f"INSERT INTO {self.TABLE} ({self.COLUMN_NAMES}) SELECT {self.COLUMN_NAMES} FROM {old_table}",
+                commit=False
+            )
+            rows = db.cursor.rowcount
+            # Eski indekslar (students_pkey va boshqalar) nomlari bo'shashi uchun avval o'chiriladi
+            db.execute_query(f"DROP TABLE {old_table} CASCADE", commit=False)
+            db.execute_query(self._key_statement(partitions), commit=False)
+            db.execute_query(f"COMMENT ON TABLE {self.TABLE} IS 'List of students'", commit=False)
+            db.execute_query(
+                f"COMMENT ON COLUMN {self.TABLE}.room_id IS 'reference column to rooms ttable'", commit=False
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        db.execute_query(f"ANALYZE {self.TABLE}")
+        db.generation.bump()
+
+        seconds = time.perf_counter() - started
+        logger.info(f"✓ {rows} ta talaba {partitions} ta bo'limli jadvalga ko'chirildi: {seconds:.2f} s")
+        return {'partitions': partitions, 'rows': rows, 'seconds': seconds}
+
+    def _exists(self) -> bool:
+        rows = self.db_manager.fetch_all("SELECT to_regclass(%s) IS NOT NULL", (self.TABLE,))
+        return bool(rows[0][0])
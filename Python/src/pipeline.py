@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Failure:
+    """Bosqichdagi xatolik - navbat orqali iste'molchigacha yetkaziladi."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+class LoadPipeline:
+    """Yuklashni bosqichlarga bo'lish: read -> transform -> write, orasida chegaralangan navbatlar.
+
+    read va har bir oraliq bosqich alohida oqimda ishlaydi, write esa ``run`` qaytargan
+    iteratorni o'qiydigan chaqiruvchi oqim. Navbat to'lsa oldingi bosqich kutadi (backpressure),
+    shuning uchun xotirada ko'pi bilan har bir navbatda ``queue_size`` ta element bo'ladi.
+    DB round-trip paytida (psycopg2 GIL ni bo'shatadi) keyingi bo'laklar parse qilinadi.
+
+    Har bir bosqich uchun: busy - ish vaqti, idle - kirish kutish, blocked - navbat to'lganda
+    chiqishni kutish. Eng katta busy - tor joy.
+    """
+
+    QUEUE_TIMEOUT = 0.5
+
+    def __init__(self, name: str, queue_size: int = 4):
+        if queue_size < 1:
+            raise ValueError("navbat hajmi 1 dan kichik bo'lmasligi kerak")
+        self.name = name
+        self.queue_size = queue_size
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._stop = threading.Event()
+
+    def _stage_stats(self, stage: str) -> Dict[str, Any]:
+        stats = {'stage': stage, 'busy': 0.0, 'idle': 0.0, 'blocked': 0.0, 'items': 0}
+        self.stats[stage] = stats
+        return stats
+
+    def _put(self, work: queue.Queue, item: Any, stats: Dict[str, Any]) -> bool:
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    work.put(item, timeout=self.QUEUE_TIMEOUT)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats['blocked'] += time.perf_counter() - started
+
+    def _get(self, work: queue.Queue, stats: Dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    return work.get(timeout=self.QUEUE_TIMEOUT)
+                except queue.Empty:
+                    continue
+            return _END
+        finally:
+            stats['idle'] += time.perf_counter() - started
+
+    def _read(self, source: Iterator[Any], out: queue.Queue, stats: Dict[str, Any]) -> None:
+        try:
+            while True:
+                started = time.perf_counter()
+                item = next(source, _END)
+                stats['busy'] += time.perf_counter() - started
+                if item is _END:
+                    break
+                stats['items'] += 1
+                if not self._put(out, item, stats):
+                    return
+            self._put(out, _END, stats)
+        except BaseException as e:
+            self._put(out, _Failure(e), stats)
+        finally:
+            # Manba generator (masalan, jarayonlar puli) shu oqimda yopiladi
+            close = getattr(source, 'close', None)
+            if close is not None:
+                close()
+
+    def _transform(self, fn: Callable[[Any], Any], inp: queue.Queue, out: queue.Queue,
+                   stats: Dict[str, Any]) -> None:
+        while True:
+            item = self._get(inp, stats)
+            if item is _END or isinstance(item, _Failure):
+                self._put(out, item, stats)
+                return
+            try:
+                started = time.perf_counter()
+                result = fn(item)
+                stats['busy'] += time.perf_counter() - started
+            except BaseException as e:
+                self._put(out, _Failure(e), stats)
+                return
+            stats['items'] += 1
+            if not self._put(out, result, stats):
+                return
+
+    def run(self, source: Iterator[Any], stages: List[Tuple[str, Callable[[Any], Any]]],
+            sink: str = 'write') -> Iterator[Any]:
+        """Manbani bosqichlardan o'tkazib, natijalarni (sink bosqichi uchun) qaytarish."""
+        self.stats = {}
+        self._stop.clear()
+        work = queue.Queue(maxsize=self.queue_size)
+        threads = [threading.Thread(target=self._read, args=(iter(source), work, self._stage_stats('read')),
+                                    name=f"{self.name}-read", daemon=True)]
+        for stage, fn in stages:
+            out = queue.Queue(maxsize=self.queue_size)
+            threads.append(threading.Thread(target=self._transform, args=(fn, work, out, self._stage_stats(stage)),
+                                            name=f"{self.name}-{stage}", daemon=True))
+            work = out
+        sink_stats = self._stage_stats(sink)
+
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(work, sink_stats)
+                if item is _END:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                started = time.perf_counter()
+                yield item
+                sink_stats['busy'] += time.perf_counter() - started
+                sink_stats['items'] += 1
+        finally:
+            # Iste'molchi to'xtasa (xatolik yoki yopilish) oldingi bosqichlar ham to'xtaydi
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        self.print_statistics()
+
+    def bottleneck(self) -> Optional[str]:
+        if not self.stats:
+            return None
+        return max(self.stats.values(), key=lambda s: s['busy'])['stage']
+
+    def print_statistics(self) -> None:
+        logger.info(f"Pipeline ({self.name}): tor joy - {self.bottleneck()}")
+        for stats in self.stats.values():
+            logger.info(
+                f"  {stats['stage']}: band {stats['busy']:.2f} s, kutish {stats['idle']:.2f} s, "
+                f"navbat to'la {stats['blocked']:.2f} s, {stats['items']} ta"
+            )
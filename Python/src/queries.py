@@ -1,135 +1,445 @@
-from typing import List, Dict, Any
+import os
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 import logging
+from .age_cutoffs import AgeCutoffs
 from .database import DatabaseManager
+from .report_engine import CombinedReportEngine
+from .result_cache import ResultCache
+from .metrics import RunMetrics
+from .room_stats import RoomStatsManager
+from .partitions import StudentPartitions
 
 logger = logging.getLogger(__name__)
 
+Rows = Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]
+
 
 class QueryExecutor:
-    def __init__(self, db_manager: DatabaseManager):
+    # Natija kaliti -> hisobot metodi
+    REPORTS = {
+        'room_student_count': 'get_room_student_count',
+        'top_5_youngest_rooms': 'get_top_5_rooms_by_min_avg_age',
+        'top_5_age_diff_rooms': 'get_top_5_rooms_by_max_age_diff',
+        'mixed_gender_rooms': 'get_mixed_gender_rooms'
+    }
+    
+    # Hisobot ustunlari - natija bo'sh bo'lsa ham (masalan, CSV sarlavhasi uchun)
+    REPORT_COLUMNS = {
+        'room_student_count': ('room_id', 'room_name', 'student_count'),
+        'top_5_youngest_rooms': ('room_id', 'room_name', 'avg_age'),
+        'top_5_age_diff_rooms': ('room_id', 'room_name', 'age_diff'),
+        'mixed_gender_rooms': ('room_id', 'room_name')
+    }
+    
+    # Hisobot SQL so'rovlari (EXPLAIN va boshqa rejimlar ham shulardan foydalanadi)
+    QUERIES = {
+        'room_student_count': """
+        SELECT 
+            r.id as room_id,
+            r.name as room_name,
+            COUNT(s.id) as student_count
+        FROM rooms r
+        LEFT JOIN students s ON r.id = s.room_id
+        GROUP BY r.id, r.name
+        ORDER BY r.id
+    """,
+        'top_5_youngest_rooms': """
+        SELECT 
+            r.id as room_id,
+            r.name as room_name,
+            AVG(EXTRACT(YEAR FROM AGE(s.birthday))) as avg_age
+        FROM rooms r
+        INNER JOIN students s ON r.id = s.room_id
+        GROUP BY r.id, r.name
+        ORDER BY avg_age ASC
+        LIMIT 5
+    """,
+        'top_5_age_diff_rooms': """
+        SELECT 
+            r.id as room_id,
+            r.name as room_name,
+            MAX(EXTRACT(YEAR FROM AGE(s.birthday))) - 
+            MIN(EXTRACT(YEAR FROM AGE(s.birthday))) as age_diff
+        FROM rooms r
+        INNER JOIN students s ON r.id = s.room_id
+        GROUP BY r.id, r.name
+        ORDER BY age_diff DESC
+        LIMIT 5
+    """,
+        'mixed_gender_rooms': """
+        SELECT DISTINCT
+            r.id as room_id,
+            r.name as room_name
+        FROM rooms r
+        INNER JOIN students s ON r.id = s.room_id
+        GROUP BY r.id, r.name
+        HAVING COUNT(DISTINCT s.sex) > 1
+        ORDER BY r.id
+    """
+    }
+    
+    # Bo'limlangan students uchun: avval students bo'lim kaliti (room_id) bo'yicha guruhlanadi -
+    # partition-wise aggregation da har bir bo'lim alohida (parallel) agregatlanadi, keyin rooms
+    # bilan birlashtiriladi. Natijalar QUERIES dagi bilan bir xil
+    PARTITIONED_QUERIES = {
+        'room_student_count': """
+        WITH room_counts AS (
+            SELECT room_id, COUNT(*) AS student_count
+            FROM students
+            WHERE room_id IS NOT NULL
+            GROUP BY room_id
+        )
+        SELECT 
+            r.id as room_id,
+            r.name as room_name,
+            COALESCE(c.student_count, 0) as student_count
+        FROM rooms r
+        LEFT JOIN room_counts c ON r.id = c.room_id
+        ORDER BY r.id
+    """,
+        'top_5_youngest_rooms': """
+        WITH room_ages AS (
+            SELECT room_id, AVG(EXTRACT(YEAR FROM AGE(birthday))) AS avg_age
+            FROM students
+            WHERE room_id IS NOT NULL
+            GROUP BY room_id
+        )
+        SELECT 
+            r.id as room_id,
+            r.name as room_name,
+            a.avg_age
+        FROM rooms r
+        INNER JOIN room_ages a ON r.id = a.room_id
+        ORDER BY a.avg_age ASC
+        LIMIT 5
+    """,
+        'top_5_age_diff_rooms': """
+        WITH room_ages AS (
+            SELECT
+                room_id,
+                MAX(EXTRACT(YEAR FROM AGE(birthday))) - 
+                MIN(EXTRACT(YEAR FROM AGE(birthday))) AS age_diff
+            FROM students
+            WHERE room_id IS NOT NULL
+            GROUP BY room_id
+        )
+        SELECT 
+            r.id as room_id,
+            r.name as room_name,
+            a.age_diff
+        FROM rooms r
+        INNER JOIN room_ages a ON r.id = a.room_id
+        ORDER BY a.age_diff DESC
+        LIMIT 5
+    """,
+        'mixed_gender_rooms': """
+        WITH mixed AS (
+            -- sex faqat 'M' yoki 'F': COUNT(DISTINCT) o'rniga parallel agregatlanadigan MIN/MAX
+            SELECT room_id
+            FROM students
+            WHERE room_id IS NOT NULL
+            GROUP BY room_id
+            HAVING MIN(sex) <> MAX(sex)
+        )
+        SELECT 
+            r.id as room_id,
+            r.name as room_name
+        FROM rooms r
+        INNER JOIN mixed m ON r.id = m.room_id
+        ORDER BY r.id
+    """
+    }
+    
+    # Yosh chegaralari rejimi: xona bo'yicha birthday agregatlari (room_id, birthday) indeksidan
+    CUTOFF_QUERIES = {
+        'top_5_youngest_rooms': """
+        WITH room_ages AS (
+            SELECT
+                room_id,
+                AVG(""" + AgeCutoffs.expr('birthday') + """) AS avg_age
+            FROM students
+            WHERE room_id IS NOT NULL
+            GROUP BY room_id
+        )
+        SELECT 
+            r.id as room_id,
+            r.name as room_name,
+            a.avg_age
+        FROM rooms r
+        INNER JOIN room_ages a ON r.id = a.room_id
+        ORDER BY a.avg_age ASC
+        LIMIT 5
+    """,
+        'top_5_age_diff_rooms': """
+        WITH room_birthdays AS (
+            SELECT
+                room_id,
+                MIN(birthday) AS min_birthday,
+                MAX(birthday) AS max_birthday
+            FROM students
+            WHERE room_id IS NOT NULL
+            GROUP BY room_id
+        )
+        SELECT 
+            r.id as room_id,
+            r.name as room_name,
+            (""" + AgeCutoffs.expr('b.min_birthday') + """) -
+            (""" + AgeCutoffs.expr('b.max_birthday') + """) as age_diff
+        FROM rooms r
+        INNER JOIN room_birthdays b ON r.id = b.room_id
+        ORDER BY age_diff DESC
+        LIMIT 5
+    """
+    }
+    
+    def __init__(self, db_manager: DatabaseManager, concurrent: bool = False, combined: bool = False,
+                 use_room_stats: bool = False, age_mode: str = 'extract',
+                 cache: Optional[ResultCache] = None, metrics: Optional[RunMetrics] = None,
+                 partitioned: Optional[bool] = None):
+        if age_mode not in AgeCutoffs.MODES:
+            raise ValueError(f"Noma'lum yosh rejimi: {age_mode}")
         self.db_manager = db_manager
+        self.concurrent = concurrent
+        self.combined = combined
+        self.use_room_stats = use_room_stats
+        self.age_mode = age_mode
+        self.cache = cache
+        self.metrics = metrics
+        # None - birinchi so'rovda bazadan aniqlanadi
+        self.partitioned = partitioned
+        self.engine = CombinedReportEngine(db_manager, age_mode=age_mode)
     
-    def get_room_student_count(self) -> List[Dict[str, Any]]:
-        query = """
-            SELECT 
-                r.id as room_id,
-                r.name as room_name,
-                COUNT(s.id) as student_count
-            FROM rooms r
-            LEFT JOIN students s ON r.id = s.room_id
-            GROUP BY r.id, r.name
-            ORDER BY r.id
-        """
+    def is_partitioned(self) -> bool:
+        if self.partitioned is None:
+            self.partitioned = StudentPartitions(self.db_manager).count() > 0
+        return self.partitioned
+    
+    def _query(self, name: str) -> str:
+        return (self.PARTITIONED_QUERIES if self.is_partitioned() else self.QUERIES)[name]
+    
+    def _age_query(self, name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        # Chegaralar har bir so'rov uchun bir marta, bugungi sana bo'yicha hisoblanadi
+        if self.age_mode == 'cutoff':
+            return self.CUTOFF_QUERIES[name], AgeCutoffs.params(self.db_manager)
+        return self._query(name), None
+    
+    def report_query(self, name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Hisobotning joriy jadval va yosh rejimidagi alohida so'rovi va parametrlari (EXPLAIN uchun)."""
+        if name in self.CUTOFF_QUERIES:
+            return self._age_query(name)
+        return self._query(name), None
+    
+    def _fetch(self, query: str, params: Optional[Dict[str, Any]], lazy: bool) -> Iterable[tuple]:
+        if lazy:
+            # Server tomonidagi kursor - qatorlar itersize bo'laklarida keladi
+            return self.db_manager.fetch_iter(query, params)
+        return self.db_manager.fetch_all(query, params)
+    
+    @staticmethod
+    def _finish(rows: Iterator[Dict[str, Any]], lazy: bool, message: str) -> Rows:
+        if not lazy:
+            formatted_results = list(rows)
+            logger.info(f"✓ {len(formatted_results)} {message}")
+            return formatted_results
+        
+        def stream() -> Iterator[Dict[str, Any]]:
+            count = 0
+            for row in rows:
+                count += 1
+                yield row
+            logger.info(f"✓ {count} {message}")
+        return stream()
+    
+    def get_room_student_count(self, lazy: bool = False) -> Rows:
+        query = self._query('room_student_count')
         
         logger.info("Executing Query 1: Room student count")
-        results = self.db_manager.fetch_all(query)
+        results = self._fetch(query, None, lazy)
         
         # Natijalarni dictionary formatiga o'tkazish
-        formatted_results = []
-        for row in results:
-            formatted_results.append({
+        formatted_results = (
+            {
                 'room_id': row[0],
                 'room_name': row[1],
                 'student_count': row[2]
-            })
-        
-        logger.info(f"✓ {len(formatted_results)} ta xona topildi")
-        return formatted_results
-    
-    def get_top_5_rooms_by_min_avg_age(self) -> List[Dict[str, Any]]:
-        query = """
-            SELECT 
-                r.id as room_id,
-                r.name as room_name,
-                AVG(EXTRACT(YEAR FROM AGE(s.birthday))) as avg_age
-            FROM rooms r
-            INNER JOIN students s ON r.id = s.room_id
-            GROUP BY r.id, r.name
-            ORDER BY avg_age ASC
-            LIMIT 5
-        """
+            }
+            for row in results
+        )
+        return self._finish(formatted_results, lazy, "ta xona topildi")
+    
+    def get_top_5_rooms_by_min_avg_age(self, lazy: bool = False) -> Rows:
+        query, params = self._age_query('top_5_youngest_rooms')
         
         logger.info("Executing Query 2: Top 5 rooms with youngest students")
-        results = self.db_manager.fetch_all(query)
+        results = self._fetch(query, params, lazy)
         
-        formatted_results = []
-        for row in results:
-            formatted_results.append({
+        formatted_results = (
+            {
                 'room_id': row[0],
                 'room_name': row[1],
                 'avg_age': float(row[2]) if row[2] else 0.0
-            })
-        
-        logger.info(f"✓ {len(formatted_results)} ta xona topildi")
-        return formatted_results
-    
-    def get_top_5_rooms_by_max_age_diff(self) -> List[Dict[str, Any]]:
-        query = """
-            SELECT 
-                r.id as room_id,
-                r.name as room_name,
-                MAX(EXTRACT(YEAR FROM AGE(s.birthday))) - 
-                MIN(EXTRACT(YEAR FROM AGE(s.birthday))) as age_diff
-            FROM rooms r
-            INNER JOIN students s ON r.id = s.room_id
-            GROUP BY r.id, r.name
-            ORDER BY age_diff DESC
-            LIMIT 5
-        """
+            }
+            for row in results
+        )
+        return self._finish(formatted_results, lazy, "ta xona topildi")
+    
+    def get_top_5_rooms_by_max_age_diff(self, lazy: bool = False) -> Rows:
+        query, params = self._age_query('top_5_age_diff_rooms')
         
         logger.info("Executing Query 3: Top 5 rooms with largest age difference")
-        results = self.db_manager.fetch_all(query)
+        results = self._fetch(query, params, lazy)
         
-        formatted_results = []
-        for row in results:
-            formatted_results.append({
+        formatted_results = (
+            {
                 'room_id': row[0],
                 'room_name': row[1],
                 'age_diff': float(row[2]) if row[2] else 0.0
-            })
-        
-        logger.info(f"✓ {len(formatted_results)} ta xona topildi")
-        return formatted_results
-    
-    def get_mixed_gender_rooms(self) -> List[Dict[str, Any]]:
-        query = """
-            SELECT DISTINCT
-                r.id as room_id,
-                r.name as room_name
-            FROM rooms r
-            INNER JOIN students s ON r.id = s.room_id
-            GROUP BY r.id, r.name
-            HAVING COUNT(DISTINCT s.sex) > 1
-            ORDER BY r.id
-        """
+            }
+            for row in results
+        )
+        return self._finish(formatted_results, lazy, "ta xona topildi")
+    
+    def get_mixed_gender_rooms(self, lazy: bool = False) -> Rows:
+        query = self._query('mixed_gender_rooms')
         
         logger.info("Executing Query 4: Mixed gender rooms")
-        results = self.db_manager.fetch_all(query)
+        results = self._fetch(query, None, lazy)
         
-        formatted_results = []
-        for row in results:
-            formatted_results.append({
+        formatted_results = (
+            {
                 'room_id': row[0],
                 'room_name': row[1]
-            })
+            }
+            for row in results
+        )
+        return self._finish(formatted_results, lazy, "ta aralash xona topildi")
+    
+    def iter_all_queries(self) -> Dict[str, Iterator[Dict[str, Any]]]:
+        """Barcha hisobotlar generatorlar sifatida - yozuvchi ularni ketma-ket iste'mol qilishi kerak.
+        
+        So'rov generator birinchi marta o'qilganda bajariladi; keshdan o'tmaydi.
+        """
+        if self.db_manager.connection is None:
+            self.db_manager.connect()
+        return {
+            name: self._lazy_report(method)
+            for name, method in self.REPORTS.items()
+        }
+    
+    def _lazy_report(self, method: str) -> Iterator[Dict[str, Any]]:
+        # Hisobot (va uning log xabari) faqat navbati kelganda boshlanadi
+        yield from getattr(self, method)(lazy=True)
+    
+    def _measured(self, name: str, compute: Callable[[], Any]) -> Any:
+        if self.metrics is None:
+            return compute()
+        with self.metrics.stage(f"report.{name}") as stage:
+            result = compute()
+            stage['rows'] = sum(len(rows) for rows in result.values()) if isinstance(result, dict) else len(result)
+            return result
+    
+    def _run_pooled(self, method: str) -> List[Dict[str, Any]]:
+        with self.db_manager.pooled() as db:
+            executor = QueryExecutor(db, age_mode=self.age_mode, partitioned=self.is_partitioned())
+            return getattr(executor, method)()
+    
+    def _execute_concurrently(self) -> Dict[str, List[Dict[str, Any]]]:
+        # Har bir hisobot alohida ulanishda - umumiy vaqt eng sekin so'rovga teng
+        self.is_partitioned()  # asosiy ulanishda, oqimlardan oldin
+        with ThreadPoolExecutor(max_workers=len(self.REPORTS), thread_name_prefix='report') as pool:
+            futures = {
+                name: pool.submit(self._measured, name, partial(self._run_pooled, method))
+                for name, method in self.REPORTS.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
+    
+    def explain_reports(self, output_dir: str) -> Dict[str, str]:
+        """Har bir hisobot so'rovi uchun EXPLAIN (ANALYZE, BUFFERS) rejasi - fayl nomlari.
+        
+        Joriy yosh rejimidagi alohida hisobot so'rovlari tahlil qilinadi (combined/room_stats
+        rejimlarida ham - ularning yagona so'rovi alohida o'lchanadi).
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        files = {}
+        for name in self.REPORTS:
+            query, params = self.report_query(name)
+            plan = self.db_manager.fetch_all(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+            path = os.path.join(output_dir, f"{name}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(row[0] for row in plan) + '\n')
+            files[name] = path
+        logger.info(f"✓ EXPLAIN rejalari yozildi: {output_dir}")
+        return files
+    
+    def cached_results(self, today: date) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Barcha hisobotlar keshda bo'lsa - ularni qaytarish (hisobot so'rovlarisiz)."""
+        if self.cache is None:
+            return None
         
-        logger.info(f"✓ {len(formatted_results)} ta aralash xona topildi")
-        return formatted_results
+        results = {}
+        for name in self.REPORTS:
+            found, value = self.cache.get(name, None, today)
+            if not found:
+                return None
+            results[name] = value
+        return results
     
     def execute_all_queries(self) -> Dict[str, List[Dict[str, Any]]]:
         logger.info("=" * 50)
         logger.info("BARCHA SO'ROVLARNI BAJARISH BOSHLANDI")
         logger.info("=" * 50)
         
-        results = {
-            'room_student_count': self.get_room_student_count(),
-            'top_5_youngest_rooms': self.get_top_5_rooms_by_min_avg_age(),
-            'top_5_age_diff_rooms': self.get_top_5_rooms_by_max_age_diff(),
-            'mixed_gender_rooms': self.get_mixed_gender_rooms()
-        }
+        # Yoshlar server sanasi bo'yicha hisoblanadi - kesh kaliti ham shu sana bilan.
+        # Sana saqlangan server siljishidan topiladi: keshda bo'lsa PostgreSQL ga ulanilmaydi
+        today = self.cache.server_today() if self.cache is not None else None
+        results = self.cached_results(today) if today is not None else None
+        if results is None:
+            if self.db_manager.connection is None:
+                self.db_manager.connect()
+            if self.cache is not None:
+                server_today, offset = self.db_manager.fetch_all(
+                    "SELECT CURRENT_DATE, EXTRACT(TIMEZONE FROM now())::integer"
+                )[0]
+                self.cache.set_server_offset(offset)
+                if server_today != today:
+                    # Siljish hali ma'lum emas edi yoki eskirgan - server sanasi bilan qayta qidirish
+                    results = self.cached_results(server_today)
+                today = server_today
+        
+        if results is not None:
+            logger.info("✓ Barcha hisobotlar keshdan olindi")
+        else:
+            results = self._execute_reports()
+            if self.cache is not None:
+                for name, value in results.items():
+                    self.cache.put(name, None, today, value)
+        
+        if self.cache is not None:
+            self.cache.print_statistics()
         
         logger.info("=" * 50)
         logger.info("BARCHA SO'ROVLAR BAJARILDI")
         logger.info("=" * 50)
         
+        return results
+    
+    def _execute_reports(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self.use_room_stats:
+            # Yig'ma jadvaldan - vaqt xonalar soniga proporsional
+            results = self._measured('room_stats', lambda: self.engine.derive(
+                RoomStatsManager(self.db_manager).fetch_room_stats()
+            ))
+        elif self.combined:
+            # Bitta skan - barcha hisobotlar bitta agregatdan
+            results = self._measured('combined', self.engine.execute_all)
+        elif self.concurrent:
+            results = self._execute_concurrently()
+        else:
+            results = {
+                name: self._measured(name, getattr(self, method))
+                for name, method in self.REPORTS.items()
+            }
         return results
\ No newline at end of file
@@ -0,0 +1,172 @@
+from typing import Any, Callable, Dict, List
+import logging
+from .age_cutoffs import AgeCutoffs
+from .database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+RoomStats = List[Dict[str, Any]]
+Derivation = Callable[[RoomStats], List[Dict[str, Any]]]
+
+
+def _room_student_count(stats: RoomStats) -> List[Dict[str, Any]]:
+    return [
+        {'room_id': r['room_id'], 'room_name': r['room_name'], 'student_count': r['student_count']}
+        for r in stats
+    ]
+
+
+def _top_5_youngest_rooms(stats: RoomStats) -> List[Dict[str, Any]]:
+    occupied = [r for r in stats if r['student_count'] > 0]
+    occupied.sort(key=lambda r: r['avg_age'])
+    return [
+        {
+            'room_id': r['room_id'],
+            'room_name': r['room_name'],
+            'avg_age': float(r['avg_age']) if r['avg_age'] else 0.0
+        }
+        for r in occupied[:5]
+    ]
+
+
+def _top_5_age_diff_rooms(stats: RoomStats) -> List[Dict[str, Any]]:
+    occupied = [r for r in stats if r['student_count'] > 0]
+    occupied.sort(key=lambda r: r['max_age'] - r['min_age'], reverse=True)
+    result = []
+    for r in occupied[:5]:
+        age_diff = r['max_age'] - r['min_age']
+        result.append({
+            'room_id': r['room_id'],
+            'room_name': r['room_name'],
+            'age_diff': float(age_diff) if age_diff else 0.0
+        })
+    return result
+
+
+def _mixed_gender_rooms(stats: RoomStats) -> List[Dict[str, Any]]:
+    return [
+        {'room_id': r['room_id'], 'room_name': r['room_name']}
+        for r in stats if r['sex_count'] > 1
+    ]
+
+
+class CombinedReportEngine:
+    """Barcha xona hisobotlarini students jadvalini bir marta o'qib hisoblash.
+
+    Har bir xona uchun bitta agregat qator olinadi (soni, yosh yig'indisi/o'rtachasi/min/max,
+    M/F soni), hisobotlar esa shu agregatdan Python tomonida chiqariladi. Yangi hisobot
+    qo'shish uchun ``register`` orqali agregatdan natija chiqaruvchi funksiya beriladi.
+    """
+
+    AGGREGATE_QUERY = """
+        WITH student_ages AS (
+            SELECT
+                room_id,
+                sex,
+                EXTRACT(YEAR FROM AGE(birthday)) AS age
+            FROM students
+            WHERE room_id IS NOT NULL
+        ),
+        room_agg AS (
+            SELECT
+                room_id,
+                COUNT(*) AS student_count,
+                SUM(age) AS age_sum,
+                AVG(age) AS avg_age,
+                MIN(age) AS min_age,
+                MAX(age) AS max_age,
+                COUNT(*) FILTER (WHERE sex = 'M') AS male_count,
+                COUNT(*) FILTER (WHERE sex = 'F') AS female_count
+            FROM student_ages
+            GROUP BY room_id
+        )
+        SELECT
+            r.id AS room_id,
+            r.name AS room_name,
+            COALESCE(a.student_count, 0),
+            a.age_sum,
+            a.avg_age,
+            a.min_age,
+            a.max_age,
+            COALESCE(a.male_count, 0),
+            COALESCE(a.female_count, 0)
+        FROM rooms r
+        LEFT JOIN room_agg a ON a.room_id = r.id
+        ORDER BY r.id
+    """
+
+    # Yosh chegaralari rejimi: min/max yosh xonaning min/max birthday idan olinadi
+    CUTOFF_AGGREGATE_QUERY = """
+        WITH room_agg AS (
+            SELECT
+                room_id,
+                COUNT(*) AS student_count,
+                SUM(""" + AgeCutoffs.expr('birthday') + """) AS age_sum,
+                AVG(""" + AgeCutoffs.expr('birthday') + """) AS avg_age,
+                MIN(birthday) AS min_birthday,
+                MAX(birthday) AS max_birthday,
+                COUNT(*) FILTER (WHERE sex = 'M') AS male_count,
+                COUNT(*) FILTER (WHERE sex = 'F') AS female_count
+            FROM students
+            WHERE room_id IS NOT NULL
+            GROUP BY room_id
+        )
+        SELECT
+            r.id AS room_id,
+            r.name AS room_name,
+            COALESCE(a.student_count, 0),
+            a.age_sum,
+            a.avg_age,
+            """ + AgeCutoffs.expr('a.max_birthday') + """,
+            """ + AgeCutoffs.expr('a.min_birthday') + """,
+            COALESCE(a.male_count, 0),
+            COALESCE(a.female_count, 0)
+        FROM rooms r
+        LEFT JOIN room_agg a ON a.room_id = r.id
+        ORDER BY r.id
+    """
+
+    STAT_FIELDS = (
+        'room_id', 'room_name', 'student_count', 'age_sum', 'avg_age',
+        'min_age', 'max_age', 'male_count', 'female_count'
+    )
+
+    DEFAULT_DERIVATIONS: Dict[str, Derivation] = {
+        'room_student_count': _room_student_count,
+        'top_5_youngest_rooms': _top_5_youngest_rooms,
+        'top_5_age_diff_rooms': _top_5_age_diff_rooms,
+        'mixed_gender_rooms': _mixed_gender_rooms
+    }
+
+    def __init__(self, db_manager: DatabaseManager, age_mode: str = 'extract'):
+        self.db_manager = db_manager
+        self.age_mode = age_mode
+        self.derivations: Dict[str, Derivation] = dict(self.DEFAULT_DERIVATIONS)
+
+    def register(self, name: str, derivation: Derivation) -> None:
+        self.derivations[name] = derivation
+
+    @classmethod
+    def rows_to_stats(cls, rows: List[tuple]) -> RoomStats:
+        stats = []
+        for row in rows:
+            room = dict(zip(cls.STAT_FIELDS, row))
+            room['sex_count'] = (room['male_count'] > 0) + (room['female_count'] > 0)
+            stats.append(room)
+        return stats
+
+    def fetch_room_stats(self) -> RoomStats:
+        logger.info("Executing combined query: per-room aggregate")
+        if self.age_mode == 'cutoff':
+            rows = self.db_manager.fetch_all(self.CUTOFF_AGGREGATE_QUERY, AgeCutoffs.params(self.db_manager))
+        else:
+            rows = self.db_manager.fetch_all(self.AGGREGATE_QUERY)
+        stats = self.rows_to_stats(rows)
+        logger.info(f"✓ {len(stats)} ta xona agregati olindi")
+        return stats
+
+    def derive(self, stats: RoomStats) -> Dict[str, List[Dict[str, Any]]]:
+        return {name: derivation(stats) for name, derivation in self.derivations.items()}
+
+    def execute_all(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self.derive(self.fetch_room_stats())
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DataGeneration:
+    """Ma'lumotlar avlodi hisoblagichi - har bir yuklash va tozalashda oshiriladi.
+
+    Fayl yo'li berilsa qiymat faylda saqlanadi: qayta ishga tushirishdan keyin ham
+    va boshqa jarayonlar bilan ham umumiy bo'ladi. Ilovadan tashqarida (to'g'ridan-to'g'ri
+    SQL bilan) qilingan o'zgarishlar hisoblagichga ta'sir qilmaydi.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        if self.path is None:
+            return self._value
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def bump(self) -> int:
+        with self._lock:
+            value = self.value + 1
+            if self.path is None:
+                self._value = value
+            else:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(str(value))
+                os.replace(tmp_path, self.path)
+            return value
+
+
+class ResultCache:
+    """Hisobot natijalari keshi: xotiradagi LRU va ixtiyoriy disk qatlami.
+
+    Kalit: hisobot nomi, parametrlar, ma'lumotlar avlodi va bugungi sana
+    (yoshlar har kuni o'zgaradi). Sana serverning CURRENT_DATE i - yoshlar so'rovlarda
+    shu sana bo'yicha hisoblanadi, mijoz soat mintaqasi boshqa bo'lishi mumkin. Serverga
+    ulanmasdan uni topish uchun oxirgi so'rovdagi server mintaqasining UTC dan siljishi
+    saqlanadi (server_today). Disk qatlamida faqat joriy avlod va sana fayllari
+    saqlanadi, eskilari yozish paytida o'chiriladi. Kesh faqat o'zining ``*.rcache.json``
+    fayllarini o'qiydi va o'chiradi - papkadagi boshqa fayllarga (kirish JSON lari,
+    results.json) tegmaydi.
+    """
+
+    DEFAULT_MAX_ENTRIES = 128
+    # Server mintaqasi siljishi (soniya) saqlanadigan fayl - SUFFIX siz, eski yozuvlar bilan o'chmaydi
+    SERVER_OFFSET_FILE = 'server_utc_offset'
+    SUFFIX = '.rcache.json'
+
+    def __init__(self, generation: DataGeneration, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 cache_dir: Optional[str] = None):
+        self.generation = generation
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._memory: 'OrderedDict[Tuple, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._server_offset: Optional[int] = None
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, name: str, params: Optional[Dict[str, Any]], today: date) -> Tuple:
+        return (
+            name,
+            json.dumps(params or {}, sort_keys=True, default=str),
+            self.generation.value,
+            today.isoformat()
+        )
+
+    def server_offset(self) -> Optional[int]:
+        if self._server_offset is None and self.cache_dir:
+            try:
+                with open(os.path.join(self.cache_dir, self.SERVER_OFFSET_FILE), 'r', encoding='utf-8') as f:
+                    self._server_offset = int(f.read().strip())
+            except (FileNotFoundError, ValueError):
+                return None
+        return self._server_offset
+
+    def set_server_offset(self, offset: int) -> None:
+        """Server sessiyasi mintaqasining UTC dan siljishi: EXTRACT(TIMEZONE FROM now())."""
+        with self._lock:
+            self._server_offset = offset
+            if not self.cache_dir:
+                return
+            path = os.path.join(self.cache_dir, self.SERVER_OFFSET_FILE)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(str(offset))
+            os.replace(tmp_path, path)
+
+    def server_today(self) -> Optional[date]:
+        """Serverning CURRENT_DATE i mahalliy soat va saqlangan siljishdan; siljish noma'lum bo'lsa None.
+
+        Yozgi vaqtga o'tishda siljish keyingi keshdan o'tmagan so'rovgacha eskirgan bo'ladi
+        (faqat yarim tun atrofidagi bir soatga ta'sir qiladi).
+        """
+        offset = self.server_offset()
+        if offset is None:
+            return None
+        return (datetime.now(timezone.utc) + timedelta(seconds=offset)).date()
+
+    @staticmethod
+    def _prefix(key: Tuple) -> str:
+        return f"{key[3]}_g{key[2]}_"
+
+    def _disk_path(self, key: Tuple) -> str:
+        digest = hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{self._prefix(key)}{digest}{self.SUFFIX}")
+
+    def _entries(self) -> List[str]:
+        return [entry for entry in os.listdir(self.cache_dir) if entry.endswith(self.SUFFIX)]
+
+    def _read_disk(self, key: Tuple) -> Tuple[bool, Any]:
+        if not self.cache_dir:
+            return False, None
+        try:
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                return True, json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False, None
+
+    def _write_disk(self, key: Tuple, value: Any) -> None:
+        if not self.cache_dir:
+            return
+        prefix = self._prefix(key)
+        for entry in self._entries():
+            # Boshqa sana yoki avlodga tegishli fayllar endi hech qachon o'qilmaydi
+            if not entry.startswith(prefix):
+                os.remove(os.path.join(self.cache_dir, entry))
+
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _remember(self, key: Tuple, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, name: str, params: Optional[Dict[str, Any]], today: date) -> Tuple[bool, Any]:
+        key = self.key(name, params, today)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return True, self._memory[key]
+
+            found, value = self._read_disk(key)
+            if found:
+                self.stats['disk_hits'] += 1
+                self._remember(key, value)
+                return True, value
+
+            self.stats['misses'] += 1
+            return False, None
+
+    def put(self, name: str, params: Optional[Dict[str, Any]], today: date, value: Any) -> None:
+        key = self.key(name, params, today)
+        with self._lock:
+            self._remember(key, value)
+            self._write_disk(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self.cache_dir:
+                for entry in self._entries():
+                    os.remove(os.path.join(self.cache_dir, entry))
+
+    def print_statistics(self) -> None:
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        ratio = hits / total * 100 if total else 0.0
+        logger.info(
+            f"Natijalar keshi: {hits}/{total} topildi ({ratio:.0f}%) - "
+            f"xotira {self.stats['memory_hits']}, disk {self.stats['disk_hits']}, "
+            f"topilmadi {self.stats['misses']}"
+        )
@@ -0,0 +1,129 @@
+from typing import Any, Dict, List
+import logging
+from .database import DatabaseManager
+from .report_engine import CombinedReportEngine, RoomStats
+
+logger = logging.getLogger(__name__)
+
+
+class RoomStatsManager:
+    """room_stats yig'ma jadvalini o'rnatish, qayta hisoblash va undan hisobot olish.
+
+    Jadval students triggerlari orqali inkremental yangilanadi (sql/room_stats.sql).
+    Hisobotlar students emas, faqat xonalar soniga proporsional qatorlarni o'qiydi.
+    """
+
+    DEFERRED_SETTING = 'room_stats.deferred'
+
+    # Yillik yosh: n * bugungi_yil - sum(tug'ilgan_yil) - (bu yil tug'ilgan kuni hali kelmaganlar)
+    REPORT_QUERY = """
+        WITH today AS (
+            SELECT
+                EXTRACT(YEAR FROM CURRENT_DATE) AS year,
+                room_stats_birth_key(CURRENT_DATE::timestamp) AS birth_key
+        ),
+        not_yet AS (
+            SELECT c.room_id, SUM(c.student_count) AS student_count
+            FROM room_birthday_counts c, today t
+            WHERE c.birth_key > t.birth_key
+            GROUP BY c.room_id
+        ),
+        room_ages AS (
+            SELECT
+                rs.room_id,
+                rs.student_count,
+                rs.student_count * t.year - rs.birth_year_sum - COALESCE(ny.student_count, 0) AS age_sum,
+                EXTRACT(YEAR FROM AGE(rs.max_birthday)) AS min_age,
+                EXTRACT(YEAR FROM AGE(rs.min_birthday)) AS max_age,
+                rs.male_count,
+                rs.female_count
+            FROM room_stats rs
+            CROSS JOIN today t
+            LEFT JOIN not_yet ny ON ny.room_id = rs.room_id
+            WHERE rs.student_count > 0
+        )
+        SELECT
+            r.id AS room_id,
+            r.name AS room_name,
+            COALESCE(a.student_count, 0),
+            a.age_sum,
+            a.age_sum / a.student_count::numeric AS avg_age,
+            a.min_age,
+            a.max_age,
+            COALESCE(a.male_count, 0),
+            COALESCE(a.female_count, 0)
+        FROM rooms r
+        LEFT JOIN room_ages a ON a.room_id = r.id
+        ORDER BY r.id
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    def is_installed(self) -> bool:
+        rows = self.db_manager.fetch_all("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'trg_room_stats_insert' AND NOT tgisinternal
+            )
+        """)
+        return bool(rows[0][0])
+
+    def install(self, sql_file: str = 'sql/room_stats.sql') -> None:
+        logger.info("room_stats yig'ma jadvali o'rnatilmoqda...")
+        self.db_manager.create_schema(sql_file)
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """students dan to'liq qayta hisoblash (bulk yuklashdan keyin ham ishlatiladi)."""
+        self.db_manager.execute_query("""
+            TRUNCATE room_stats, room_birthday_counts;
+            INSERT INTO room_stats SELECT * FROM room_stats_recompute();
+            INSERT INTO room_birthday_counts SELECT * FROM room_birthday_counts_recompute();
+        """)
+        logger.info("✓ room_stats qayta hisoblandi")
+
+    def check_consistency(self) -> List[Dict[str, Any]]:
+        """Yig'ma jadvalni to'liq qayta hisoblash bilan solishtirish; farqli xonalarni qaytaradi."""
+        query = """
+            WITH stored AS (
+                SELECT * FROM room_stats WHERE student_count > 0
+            ),
+            fresh AS (
+                SELECT * FROM room_stats_recompute()
+            ),
+            stored_counts AS (
+                SELECT * FROM room_birthday_counts
+            ),
+            fresh_counts AS (
+                SELECT * FROM room_birthday_counts_recompute()
+            )
+            SELECT room_id, 'room_stats' AS source FROM (
+                (SELECT * FROM stored EXCEPT SELECT * FROM fresh)
+                UNION
+                (SELECT * FROM fresh EXCEPT SELECT * FROM stored)
+            ) d
+            UNION
+            SELECT room_id, 'room_birthday_counts' AS source FROM (
+                (SELECT * FROM stored_counts EXCEPT SELECT * FROM fresh_counts)
+                UNION
+                (SELECT * FROM fresh_counts EXCEPT SELECT * FROM stored_counts)
+            ) c
+            ORDER BY room_id
+        """
+        mismatches = [
+            {'room_id': row[0], 'source': row[1]}
+            for row in self.db_manager.fetch_all(query)
+        ]
+
+        if mismatches:
+            logger.warning(f"✗ room_stats nomuvofiq: {len(mismatches)} ta xona")
+        else:
+            logger.info("✓ room_stats to'liq qayta hisoblash bilan mos")
+        return mismatches
+
+    def fetch_room_stats(self) -> RoomStats:
+        logger.info("Executing summary query: room_stats")
+        stats = CombinedReportEngine.rows_to_stats(self.db_manager.fetch_all(self.REPORT_QUERY))
+        logger.info(f"✓ {len(stats)} ta xona agregati olindi")
+        return stats
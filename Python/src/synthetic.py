@@ -0,0 +1,215 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SyntheticDataset:
+    """Benchmark uchun rooms va students ma'lumotlarining deterministik generatori.
+
+    Bir xil parametrlar va seed bilan fayllar baytma-bayt bir xil chiqadi (faqat
+    random.Random.random() ishlatiladi). Taqsimot sozlamalari:
+
+    - room_distribution: 'uniform' - xonalar teng, 'zipf' - xona hajmlari 1 / rank^zipf_s
+      (bir nechta katta xona va ko'p kichik xonalar); empty_rooms - bo'sh xonalar ulushi;
+    - age_min / age_max (yil); room_age_spread berilsa har bir xonadagi yoshlar shu
+      oraliqda (top_5_age_diff_rooms uchun), aks holda hamma yoshlar butun oraliqda;
+    - male_ratio va single_gender_rooms - bir jinsli xonalar ulushi (mixed_gender_rooms uchun).
+
+    Tug'ilgan kunlar bugungi sanaga emas, reference_date ga nisbatan generatsiya qilinadi.
+    """
+
+    ROOM_DISTRIBUTIONS = ('uniform', 'zipf')
+    REFERENCE_DATE = date(2024, 9, 1)
+    BATCH_SIZE = 10000
+
+    FIRST_NAMES = (
+        'Aziz', 'Dilnoza', 'Jasur', 'Kamola', 'Otabek', 'Malika', 'Sardor', 'Nodira',
+        'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+        'David', 'Elizabeth', 'William', 'Barbara', 'Peggy', 'Christian', 'Juan', 'Susan'
+    )
+    LAST_NAMES = (
+        'Karimov', 'Rahimova', 'Tursunov', 'Yusupova', 'Aliyev', 'Saidova', 'Ergashev',
+        'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+        'Rodriguez', 'Martinez', 'Wilson', 'Anderson', 'Ryan', 'Bush', 'Moore', 'Clark'
+    )
+
+    def __init__(self, rooms: int, students: int, seed: int = 0,
+                 room_distribution: str = 'uniform', zipf_s: float = 1.1, empty_rooms: float = 0.0,
+                 age_min: int = 16, age_max: int = 30, room_age_spread: Optional[int] = None,
+                 male_ratio: float = 0.5, single_gender_rooms: float = 0.0,
+                 reference_date: date = REFERENCE_DATE):
+        if rooms < 1 or students < 0:
+            raise ValueError("xonalar soni 1 dan, talabalar soni 0 dan kichik bo'lmasligi kerak")
+        if room_distribution not in self.ROOM_DISTRIBUTIONS:
+            raise ValueError(f"Noma'lum room_distribution: {room_distribution}")
+        if not 0 <= age_min <= age_max:
+            raise ValueError("0 <= age_min <= age_max bo'lishi kerak")
+        if room_age_spread is not None and not 0 <= room_age_spread <= age_max - age_min:
+            raise ValueError("room_age_spread 0 va age_max - age_min oralig'ida bo'lishi kerak")
+        for name, value in (('empty_rooms', empty_rooms), ('male_ratio', male_ratio),
+                            ('single_gender_rooms', single_gender_rooms)):
+            if not 0 <= value <= 1:
+                raise ValueError(f"{name} 0 va 1 oralig'ida bo'lishi kerak")
+        if empty_rooms == 1 and students:
+            raise ValueError("Hamma xonalar bo'sh bo'lsa talabalar joylashtirilmaydi")
+
+        self.rooms = rooms
+        self.students = students
+        self.seed = seed
+        self.room_distribution = room_distribution
+        self.zipf_s = zipf_s
+        self.empty_rooms = empty_rooms
+        self.age_min = age_min
+        self.age_max = age_max
+        self.room_age_spread = room_age_spread
+        self.male_ratio = male_ratio
+        self.single_gender_rooms = single_gender_rooms
+        self.reference_date = reference_date
+
+    def spec(self) -> Dict[str, Any]:
+        return {
+            'rooms': self.rooms,
+            'students': self.students,
+            'seed': self.seed,
+            'room_distribution': self.room_distribution,
+            'zipf_s': self.zipf_s,
+            'empty_rooms': self.empty_rooms,
+            'age_min': self.age_min,
+            'age_max': self.age_max,
+            'room_age_spread': self.room_age_spread,
+            'male_ratio': self.male_ratio,
+            'single_gender_rooms': self.single_gender_rooms,
+            'reference_date': self.reference_date.isoformat()
+        }
+
+    def fingerprint(self) -> str:
+        encoded = json.dumps(self.spec(), sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:12]
+
+    def _rng(self, stream: str) -> random.Random:
+        # Har bir oqim alohida - talabalar soni o'zgarsa xonalar atributlari o'zgarmaydi
+        return random.Random(f"{self.seed}:{stream}")
+
+    def _room_profiles(self) -> Tuple[List[float], List[int], List[int]]:
+        """Xonalar uchun (og'irliklar yig'indisi, yosh oralig'i boshi, jinsi: -1 aralash, 1 M, 0 F)."""
+        rng = self._rng('rooms')
+        n = self.rooms
+
+        if self.room_distribution == 'zipf':
+            # Ranglar xonalar bo'yicha aralashtiriladi - katta xonalar id lar boshida to'planmaydi
+            ranks = list(range(1, n + 1))
+            for i in range(n - 1, 0, -1):
+                j = int(rng.random() * (i + 1))
+                ranks[i], ranks[j] = ranks[j], ranks[i]
+            weights = [rank ** -self.zipf_s for rank in ranks]
+        else:
+            weights = [1.0] * n
+
+        for i in range(n):
+            if rng.random() < self.empty_rooms:
+                weights[i] = 0.0
+        if not any(weights):
+            # Hamma xonalar bo'sh chiqib qolsa bittasi to'ldiriladi
+            weights[0] = 1.0
+
+        age_starts = []
+        spread = self.room_age_spread
+        for _ in range(n):
+            if spread is None:
+                age_starts.append(self.age_min)
+            else:
+                age_starts.append(self.age_min + int(rng.random() * (self.age_max - self.age_min - spread + 1)))
+
+        genders = []
+        for _ in range(n):
+            if rng.random() < self.single_gender_rooms:
+                genders.append(1 if rng.random() < self.male_ratio else 0)
+            else:
+                genders.append(-1)
+
+        return list(accumulate(weights)), age_starts, genders
+
+    def iter_rooms(self) -> Iterator[Dict[str, Any]]:
+        for room_id in range(self.rooms):
+            yield {'id': room_id, 'name': f"Room #{room_id}"}
+
+    def iter_students(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('students')
+        cum_weights, age_starts, genders = self._room_profiles()
+        room_ids = range(self.rooms)
+        spread = self.age_max - self.age_min if self.room_age_spread is None else self.room_age_spread
+        first_names, last_names = self.FIRST_NAMES, self.LAST_NAMES
+        reference = self.reference_date
+
+        student_id = 0
+        while student_id < self.students:
+            count = min(self.BATCH_SIZE, self.students - student_id)
+            for room_id in rng.choices(room_ids, cum_weights=cum_weights, k=count):
+                # Yosh [start, start + spread + 1) yil oralig'ida, kun aniqligida
+                age_days = (age_starts[room_id] + rng.random() * (spread + 1)) * 365.25
+                gender = genders[room_id]
+                if gender < 0:
+                    male = rng.random() < self.male_ratio
+                else:
+                    male = gender == 1
+                name = (f"{first_names[int(rng.random() * len(first_names))]} "
+                        f"{last_names[int(rng.random() * len(last_names))]}")
+                yield {
+                    'birthday': f"{reference - timedelta(days=int(age_days))}T00:00:00.000000",
+                    'id': student_id,
+                    'name': name,
+                    'room': room_id,
+                    'sex': 'M' if male else 'F'
+                }
+                student_id += 1
+
+    @staticmethod
+    def _write(records: Iterator[Dict[str, Any]], path: str, fmt: str) -> None:
+        opener = gzip.open if path.endswith('.gz') else open
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with opener(tmp_path, 'wt', encoding='utf-8') as f:
+            if fmt == 'ndjson':
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False))
+                    f.write('\n')
+            else:
+                f.write('[')
+                for i, record in enumerate(records):
+                    f.write(',\n' if i else '\n')
+                    f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n]\n')
+        # Uzilgan generatsiya keyingi safar tayyor fayl deb olinmasligi uchun
+        os.replace(tmp_path, path)
+
+    def write(self, output_dir: str, fmt: str = 'ndjson', compress: bool = False) -> Tuple[str, str]:
+        """rooms va students fayllarini yozish; shu parametrlar bilan yozilgan bo'lsa qayta ishlatiladi.
+
+        Fayl nomlarida parametrlar xeshi bor: (rooms_path, students_path).
+        """
+        if fmt not in ('ndjson', 'json'):
+            raise ValueError(f"Noma'lum format: {fmt}")
+        os.makedirs(output_dir, exist_ok=True)
+        suffix = f".{fmt}.gz" if compress else f".{fmt}"
+        key = f"{self.rooms}x{self.students}-{self.fingerprint()}"
+        rooms_path = os.path.join(output_dir, f"rooms-{key}{suffix}")
+        students_path = os.path.join(output_dir, f"students-{key}{suffix}")
+
+        for path, records in ((rooms_path, self.iter_rooms), (students_path, self.iter_students)):
+            if os.path.exists(path):
+                logger.info(f"✓ Mavjud fayl ishlatiladi: {path}")
+                continue
+            self._write(records(), path, fmt)
+            logger.info(f"✓ Generatsiya qilindi: {path}")
+
+        spec_path = os.path.join(output_dir, f"spec-{key}.json")
+        with open(spec_path, 'w', encoding='utf-8') as f:
+            json.dump(self.spec(), f, indent=2)
+        return rooms_path, students_path
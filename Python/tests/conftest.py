@@ -0,0 +1,36 @@
+import json
+import os
+import sys
+
+import psycopg2
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import Config  # noqa: E402
+from src.database import DatabaseManager  # noqa: E402
+
+
+SCHEMA_FILE = os.path.join(ROOT, Config.SQL_DIR, 'schema.sql')
+
+
+def write_json(path, records) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f)
+    return str(path)
+
+
+@pytest.fixture
+def db():
+    """Sinov bazasi (TEST_DB_NAME, default students_test) yangi schema bilan; server bo'lmasa skip."""
+    params = Config.get_db_config()
+    params['database'] = os.getenv('TEST_DB_NAME', 'students_test')
+    manager = DatabaseManager(**params)
+    try:
+        manager.connect()
+    except psycopg2.Error as e:
+        pytest.skip(f"PostgreSQL mavjud emas: {e}")
+    manager.create_schema(SCHEMA_FILE)
+    yield manager
+    manager.disconnect()
@@ -0,0 +1,78 @@
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import write_json
+from src.age_cutoffs import AgeCutoffs
+from src.data_loader import DataLoader
+from src.queries import QueryExecutor
+
+
+US = timedelta(microseconds=1)
+DAYS = [date(2024, 2, 29), date(2023, 2, 28), date(2023, 3, 1), date(2024, 2, 28), date(2024, 12, 31)]
+
+
+def birthdays(today):
+    """Har bir yosh chegarasining o'zi, atrofi (mikrosekund va kun ichidagi vaqt) va 29-fevrallar."""
+    values = []
+    for years in (1, 4, 20, 21, 99):
+        edge = AgeCutoffs.cutoff(today, years)
+        values += [edge, edge - US, edge + US, edge + timedelta(hours=12), edge - timedelta(hours=12)]
+    for year in (2000, 2003, 2020, 2023):
+        values += [datetime(year, 2, 28, 23, 59, 59, 999999), datetime(year, 3, 1)]
+    for year in (2000, 2004, 2020):
+        values += [datetime(year, 2, 29), datetime(year, 2, 29, 18, 30)]
+    return values
+
+
+def test_feb29_cutoff_on_non_leap_year():
+    # 29-fevralda tug'ilgan kabisa bo'lmagan yilda 1-martda yosh qo'shadi
+    assert AgeCutoffs.cutoff(date(2024, 2, 29), 1) == datetime(2023, 3, 1) - US
+    assert AgeCutoffs.cutoff(date(2024, 2, 29), 4) == datetime(2020, 2, 29)
+
+
+@pytest.mark.parametrize('today', DAYS, ids=str)
+def test_bounds_count_full_years(today):
+    bounds = AgeCutoffs.bounds(today)
+    ages = {b: len(bounds) - bisect_right(bounds, b) for b in birthdays(today)}
+
+    # Chegaraning o'zida yosh to'ladi, bir mikrosekund keyin hali yo'q
+    for years in (1, 20, 99):
+        edge = AgeCutoffs.cutoff(today, years)
+        assert ages[edge] == years and ages[edge + US] == years - 1
+    if today == date(2024, 2, 29):
+        assert ages[datetime(2020, 2, 29)] == 4 and ages[datetime(2020, 2, 29, 18, 30)] == 3
+        assert ages[datetime(2023, 2, 28, 23, 59, 59, 999999)] == 1 and ages[datetime(2023, 3, 1)] == 0
+
+
+@pytest.mark.parametrize('today', DAYS, ids=str)
+def test_cutoff_expr_matches_age(db, today):
+    # Kelajakdagi sanalar AGE(b) ga - ya'ni haqiqiy CURRENT_DATE ga qaytadi, sobit sanada solishtirilmaydi
+    births = [b for b in birthdays(today) if b <= datetime(today.year, today.month, today.day)]
+    params = dict(AgeCutoffs.params_for(today), births=births)
+    rows = db.fetch_all(
+        "SELECT b, EXTRACT(YEAR FROM AGE(%(age_today)s, b)), " + AgeCutoffs.expr('b')
+        + " FROM unnest(%(births)s::timestamp[]) AS b",
+        params
+    )
+
+    assert [(b, int(cutoff)) for b, _, cutoff in rows] == [(b, int(age)) for b, age, _ in rows]
+
+
+def test_cutoff_queries_match_age_queries(db, tmp_path):
+    today = db.fetch_all("SELECT CURRENT_DATE")[0][0]
+    values = birthdays(today)
+    rooms = write_json(tmp_path / 'rooms.json', [{'id': i, 'name': f"Room {i}"} for i in range(8)])
+    students = write_json(tmp_path / 'students.json', [
+        {'id': i, 'name': f"S{i}", 'birthday': b.isoformat(), 'sex': 'MF'[i % 2], 'room': i % 8}
+        for i, b in enumerate(values)
+    ])
+    DataLoader(db).load_all(rooms, students)
+
+    expected = QueryExecutor(db).execute_all_queries()
+    actual = QueryExecutor(db, age_mode='cutoff').execute_all_queries()
+
+    # Teng qiymatlarda LIMIT 5 turli xonalarni tanlashi mumkin - qiymatlar solishtiriladi
+    for name, column in (('top_5_youngest_rooms', 'avg_age'), ('top_5_age_diff_rooms', 'age_diff')):
+        assert [row[column] for row in actual[name]] == [row[column] for row in expected[name]]
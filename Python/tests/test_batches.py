@@ -0,0 +1,70 @@
+from array import array
+from datetime import datetime
+
+import pytest
+
+from conftest import write_json
+from src import batches
+from src.batches import RecordBatch, StudentBatch
+from src.data_loader import DataLoader
+from src.loader import DataTransformer
+
+
+ROWS = [
+    (1, 'Ali', datetime(2001, 2, 3, 4, 5, 6), 'M', -1),
+    (2, 'Vali\tTab', datetime(1999, 12, 31), 'F', None),
+    (3, 'Guli', datetime(2004, 2, 29), 'F', 0),
+    (4, "O'tkir", datetime(1970, 1, 1), 'M', -(1 << 31))
+]
+
+
+def test_record_batch_is_abstract():
+    with pytest.raises(TypeError):
+        RecordBatch(array('q'), array('q', [0]), b'')
+
+
+def test_room_minus_one_is_not_null():
+    batch = StudentBatch.from_rows(ROWS)
+
+    assert list(batch.rows()) == ROWS
+    lines = batch.copy_text().splitlines()
+    assert lines[0].endswith('\t-1')
+    assert lines[1].endswith('\t\\N')
+    assert lines[2].endswith('\t0')
+
+
+def test_students_to_batch_keeps_negative_rooms():
+    students = [
+        {'id': r[0], 'name': r[1], 'birthday': r[2].isoformat(), 'sex': r[3], 'room': r[4]}
+        for r in ROWS
+    ]
+    batch, rejects = DataTransformer.students_to_batch(students)
+
+    assert rejects == []
+    assert list(batch.rows()) == ROWS
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_take(monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(batches, 'np', None)
+    batch = StudentBatch.from_rows(ROWS)
+
+    assert list(batch.take([3, 1, 1, 0]).rows()) == [ROWS[3], ROWS[1], ROWS[1], ROWS[0]]
+    assert list(batch.take([]).rows()) == []
+
+
+def test_load_room_minus_one(db, tmp_path):
+    rooms = write_json(tmp_path / 'rooms.json', [{'id': -1, 'name': 'Minus'}, {'id': 0, 'name': 'Zero'}])
+    students = [
+        {'id': 1, 'name': 'Ali', 'birthday': '2001-02-03T00:00:00', 'sex': 'M', 'room': -1},
+        {'id': 2, 'name': 'Vali', 'birthday': '2002-03-04T00:00:00', 'sex': 'F', 'room': None},
+        {'id': 3, 'name': 'Guli', 'birthday': '2003-04-05T00:00:00', 'sex': 'F', 'room': 0}
+    ]
+    students_path = write_json(tmp_path / 'students.json', students)
+    expected = [(1, -1), (2, None), (3, 0)]
+
+    # Bo'sh jadvalga COPY, keyin qatorma-qator upsert
+    for strategy in ('auto', 'upsert'):
+        DataLoader(db, strategy=strategy).load_all(rooms, students_path)
+        assert db.fetch_all("SELECT id, room_id FROM students ORDER BY id") == expected
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from conftest import write_json
+from src.checkpoint import DeadLetter, LoadCheckpoint
+from src.data_loader import DataLoader
+
+
+STUDENTS = 100
+CHUNK = 10
+
+
+def dataset(tmp_path):
+    rooms = write_json(tmp_path / 'rooms.json', [{'id': i, 'name': f"Room {i}"} for i in range(3)])
+    students = write_json(tmp_path / 'students.json', [
+        # Har 7-yozuv noto'g'ri - har bir bo'lakda 1-2 ta
+        {'id': i, 'name': f"S{i}", 'birthday': '2000-01-01T00:00:00', 'sex': 'X' if i % 7 == 0 else 'M',
+         'room': i % 3}
+        for i in range(STUDENTS)
+    ])
+    return rooms, students
+
+
+def interrupt_after(monkeypatch, chunks):
+    """students ning ``chunks``-bo'lagi checkpoint yozilayotganda uziladi (bo'lak rollback bo'ladi)."""
+    save = LoadCheckpoint.save
+    calls = []
+
+    def failing_save(self, table, *args, **kwargs):
+        if table == 'students' and not kwargs.get('completed'):
+            calls.append(args)
+            if len(calls) == chunks:
+                raise ConnectionError("uzilish")
+        return save(self, table, *args, **kwargs)
+
+    monkeypatch.setattr(LoadCheckpoint, 'save', failing_save)
+
+
+def load(db, rooms, students, dead_letter):
+    return DataLoader(db, chunk_size=CHUNK, checkpoint=LoadCheckpoint(db),
+                      dead_letter=dead_letter).load_all(rooms, students)
+
+
+def dead_letter_indexes(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line)['index'] for line in f if json.loads(line)['table'] == 'students']
+
+
+@pytest.mark.parametrize('interrupt_at', [1, 4, 10])
+def test_resume_after_interrupt(db, tmp_path, monkeypatch, interrupt_at):
+    rooms, students = dataset(tmp_path)
+    rejects_path = str(tmp_path / 'rejects.ndjson')
+
+    with monkeypatch.context() as patch:
+        interrupt_after(patch, interrupt_at)
+        with pytest.raises(ConnectionError):
+            load(db, rooms, students, DeadLetter(rejects_path))
+    committed = (interrupt_at - 1) * CHUNK
+    assert [row[0] for row in db.fetch_all("SELECT id FROM students ORDER BY id")] == \
+        [i for i in range(committed) if i % 7]
+
+    dead_letter = DeadLetter(rejects_path)
+    load(db, rooms, students, dead_letter)
+
+    valid = [i for i in range(STUDENTS) if i % 7]
+    assert [row[0] for row in db.fetch_all("SELECT id FROM students ORDER BY id")] == valid
+    # Uzilgan bo'lakning rejectlari qayta yozilgan, lekin ikki marta emas
+    assert dead_letter_indexes(rejects_path) == [i for i in range(STUDENTS) if i % 7 == 0]
+    assert dead_letter.counts['Students'] == STUDENTS - len(valid)
+    assert LoadCheckpoint(db).get('students', students, db.fetch_all(
+        "SELECT file_hash FROM load_checkpoints WHERE table_name = 'students'")[0][0]) == {
+        'chunk_size': CHUNK, 'records_done': STUDENTS, 'rows_loaded': len(valid),
+        'rejected': STUDENTS - len(valid), 'completed': True
+    }
+
+
+@pytest.mark.parametrize('max_rejects, fails', [(14, True), (15, False)])
+def test_resume_counts_earlier_rejects_in_budget(db, tmp_path, monkeypatch, max_rejects, fails):
+    rooms, students = dataset(tmp_path)
+    rejects_path = str(tmp_path / 'rejects.ndjson')
+
+    with monkeypatch.context() as patch:
+        interrupt_after(patch, 4)
+        with pytest.raises(ConnectionError):
+            load(db, rooms, students, DeadLetter(rejects_path, max_rejects=max_rejects))
+
+    # Jami 15 ta noto'g'ri yozuv: 5 tasi uzilishdan oldin commit qilingan bo'laklarda
+    resumed = DeadLetter(rejects_path, max_rejects=max_rejects)
+    if fails:
+        with pytest.raises(ValueError):
+            load(db, rooms, students, resumed)
+    else:
+        load(db, rooms, students, resumed)
+        assert db.fetch_all("SELECT COUNT(*) FROM students")[0][0] == STUDENTS - 15
+    assert len(set(dead_letter_indexes(rejects_path))) == len(dead_letter_indexes(rejects_path))
+
+
+def test_rewind_drops_only_uncommitted_entries(tmp_path):
+    path = tmp_path / 'rejects.ndjson'
+    dead_letter = DeadLetter(str(path))
+    dead_letter.start('Rooms', 'rooms')
+    dead_letter.add('Rooms', 'rooms', [{'index': 5, 'id': None, 'field': 'id', 'reason': 'x', 'record': {}}])
+    dead_letter.start('Students', 'students')
+    dead_letter.add('Students', 'students', [
+        {'index': i, 'id': i, 'field': 'sex', 'reason': 'x', 'record': {}} for i in (3, 12, 25)
+    ])
+    dead_letter.close()
+
+    DeadLetter(str(path)).start('Students', 'students', rejected=1, records_done=20)
+
+    entries = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [(e['table'], e['index']) for e in entries] == [('rooms', 5), ('students', 3), ('students', 12)]
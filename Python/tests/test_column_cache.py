@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from conftest import write_json
+from src.column_cache import ColumnCache
+
+
+STUDENTS = [
+    {'id': 1, 'name': 'Ali', 'birthday': '2001-02-03T04:05:06', 'sex': 'M', 'room': -1},
+    {'id': 2, 'name': 'Vali', 'birthday': '2002-03-04T00:00:00', 'sex': 'F', 'room': None},
+    {'id': 3, 'name': 'Xato', 'birthday': 'kecha', 'sex': 'F', 'room': 0},
+    {'id': 4, 'name': 'Guli', 'birthday': '2004-02-29T00:00:00', 'sex': 'F', 'room': 0}
+]
+
+
+def test_cached_chunks_keep_rooms_and_rejects(tmp_path):
+    path = write_json(tmp_path / 'students.json', STUDENTS)
+    cache = ColumnCache(str(tmp_path / 'cache'), chunk_size=2)
+
+    # Birinchi marta quriladi, ikkinchi marta mmap bilan o'qiladi
+    for _ in range(2):
+        columns, rejects = cache.load_students(path)
+        chunks = list(ColumnCache.iter_student_chunks(columns, rejects, chunk_size=2))
+
+        assert [end for _, _, end in chunks] == [2, 4]
+        assert [[r['index'] for r in chunk_rejects] for _, chunk_rejects, _ in chunks] == [[], [2]]
+        assert [row for batch, _, _ in chunks for row in batch.rows()] == [
+            (1, 'Ali', datetime(2001, 2, 3, 4, 5, 6), 'M', -1),
+            (2, 'Vali', datetime(2002, 3, 4), 'F', None),
+            (4, 'Guli', datetime(2004, 2, 29), 'F', 0)
+        ]
+
+
+def test_old_cache_version_is_rebuilt(tmp_path):
+    path = write_json(tmp_path / 'students.json', STUDENTS)
+    cache = ColumnCache(str(tmp_path / 'cache'))
+    cache.load_students(path)
+    entry_dir = next((tmp_path / 'cache').iterdir())
+    meta = entry_dir / 'meta.json'
+    meta.write_text(meta.read_text().replace(f'"version": {ColumnCache.VERSION}', '"version": 2'))
+
+    assert not cache._is_valid(str(entry_dir))
+    columns, _ = cache.load_students(path)
+    assert columns['no_room'].tolist() == [0, 1, 0]
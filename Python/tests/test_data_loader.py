@@ -0,0 +1,86 @@
+import pytest
+
+from conftest import write_json
+from src.checkpoint import DeadLetter
+from src.data_loader import DataLoader
+from src.partitions import StudentPartitions
+
+
+def student(i, name=None, room=1, sex='M'):
+    return {'id': i, 'name': name or f"S{i}", 'birthday': '2000-01-01T00:00:00', 'sex': sex, 'room': room}
+
+
+def rooms_file(tmp_path):
+    return write_json(tmp_path / 'rooms.json', [{'id': i, 'name': f"Room {i}"} for i in (1, 2)])
+
+
+def table(db):
+    return db.fetch_all("SELECT id, name, sex, room_id FROM students ORDER BY id")
+
+
+@pytest.mark.parametrize('chunk_size', [2, 1000])
+def test_copy_into_empty_table_keeps_last_duplicate(db, tmp_path, chunk_size):
+    records = [student(i) for i in range(6)]
+    # Takrorlar bir bo'lak ichida va boshqa bo'laklarda; noto'g'ri yozuv ham bor
+    records += [student(1, 'Birinchi takror'), dict(student(9), sex='X'), student(4, room=None),
+                student(1, 'Oxirgi', room=2)]
+    students = write_json(tmp_path / 'students.json', records)
+    dead_letter = DeadLetter(str(tmp_path / 'rejects.ndjson'))
+
+    stats = DataLoader(db, chunk_size=chunk_size, dead_letter=dead_letter).load_all(rooms_file(tmp_path), students)
+
+    # Merge fayldagi har bir id ni bir marta sanaydi
+    assert stats['students'] == 6
+    assert table(db) == [
+        (0, 'S0', 'M', 1), (1, 'Oxirgi', 'M', 2), (2, 'S2', 'M', 1),
+        (3, 'S3', 'M', 1), (4, 'S4', 'M', None), (5, 'S5', 'M', 1)
+    ]
+    # COPY bekor qilinib qayta o'qilganda reject ikki marta sanalmaydi
+    assert dead_letter.counts['Students'] == 1
+
+
+@pytest.mark.parametrize('partitions', [0, 2])
+def test_merge_counts(db, tmp_path, partitions):
+    rooms = rooms_file(tmp_path)
+    if partitions:
+        StudentPartitions(db).migrate(partitions)
+    first = write_json(tmp_path / 'first.json', [student(i) for i in range(5)])
+    DataLoader(db).load_all(rooms, first)
+
+    second = write_json(tmp_path / 'second.json', [
+        student(0),                      # o'zgarmagan
+        student(1, 'Yangi ism'),         # faqat ism
+        student(2, room=2),              # xona (bo'limlarda boshqa bo'limga o'tishi mumkin)
+        student(3, room=None),           # xonasiz
+        student(4, sex='F'),
+        student(7), student(8),          # yangi
+        student(8, 'Oxirgi'),            # takror - oxirgisi
+        student(0)
+    ])
+    loader = DataLoader(db, strategy='merge', chunk_size=3)
+    loader.load_all(rooms, second)
+
+    assert loader.merge_stats['students'] == {'total': 7, 'inserted': 2, 'updated': 4, 'unchanged': 1}
+    assert table(db) == [
+        (0, 'S0', 'M', 1), (1, 'Yangi ism', 'M', 1), (2, 'S2', 'M', 2), (3, 'S3', 'M', None),
+        (4, 'S4', 'F', 1), (7, 'S7', 'M', 1), (8, 'Oxirgi', 'M', 1)
+    ]
+    assert loader.merge_stats['rooms'] == {'total': 2, 'inserted': 0, 'updated': 0, 'unchanged': 2}
+
+
+def test_merge_staging_is_transaction_local(db, tmp_path):
+    rooms = rooms_file(tmp_path)
+    DataLoader(db).load_all(rooms, write_json(tmp_path / 'first.json', [student(0)]))
+    loader = DataLoader(db, strategy='merge')
+    batches = lambda: loader.iter_student_batches(write_json(tmp_path / 'second.json', [student(0, 'B'), student(1)]))
+
+    # commit=False: chaqiruvchi tranzaksiyasi bo'linmaydi, rollback hammasini qaytaradi
+    loader._merge_batches('students', loader.STUDENT_COLUMNS, batches(), commit=False)
+    loader._merge_batches('students', loader.STUDENT_COLUMNS, batches(), commit=False)
+    db.rollback()
+    assert table(db) == [(0, 'S0', 'M', 1)]
+
+    loader._merge_batches('students', loader.STUDENT_COLUMNS, batches())
+    assert table(db) == [(0, 'B', 'M', 1), (1, 'S1', 'M', 1)]
+    # ON COMMIT DROP - doimiy staging jadval qolmaydi
+    assert db.fetch_all("SELECT to_regclass('students_staging')")[0][0] is None
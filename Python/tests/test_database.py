@@ -0,0 +1,39 @@
+from src.database import DatabaseManager
+
+
+def manager(db, **kwargs):
+    return DatabaseManager(db.host, db.database, db.user, db.password, db.port, **kwargs)
+
+
+def work_mem(db):
+    return db.fetch_all("SELECT current_setting('work_mem')")[0][0]
+
+
+def test_session_switch_keeps_open_transaction(db):
+    other = manager(db, session_profiles={'reports': {'work_mem': '7MB'}})
+    other.connect()
+    try:
+        default = work_mem(other)
+        other.execute_query("INSERT INTO rooms (id, name) VALUES (1, 'A')", commit=False)
+        with other.session('reports'):
+            assert work_mem(other) == '7MB'
+            other.execute_query("INSERT INTO rooms (id, name) VALUES (2, 'B')", commit=False)
+        assert work_mem(other) == default
+
+        # Bosqich almashishi chaqiruvchining tranzaksiyasini commit qilmagan
+        assert db.fetch_all("SELECT COUNT(*) FROM rooms")[0][0] == 0
+        other.rollback()
+        assert other.fetch_all("SELECT COUNT(*) FROM rooms")[0][0] == 0
+    finally:
+        other.disconnect()
+
+
+def test_session_on_idle_connection_persists(db):
+    other = manager(db, session_profiles={'reports': {'work_mem': '7MB'}}, session_stage='reports')
+    other.connect()
+    try:
+        # Bo'sh ulanishda qo'llangan sozlama keyingi rollback dan keyin ham qoladi
+        other.rollback()
+        assert work_mem(other) == '7MB'
+    finally:
+        other.disconnect()
@@ -0,0 +1,74 @@
+import csv
+import gzip
+import io
+
+import pytest
+
+from src.formatter import ResultFormatter
+
+
+DATASETS = {
+    'reports': {
+        'room_student_count': [
+            {'room_id': -1, 'room_name': 'Room #-1', 'student_count': 3},
+            {'room_id': 0, 'room_name': "O'tkir & <Do'stlar> \"A\"", 'student_count': 0}
+        ],
+        'top_5_youngest_rooms': [{'room_id': 7, 'room_name': 'Xona ё', 'avg_age': 20.25}],
+        'mixed_gender_rooms': []
+    },
+    'special_values': {
+        'edge': [{'name': '', 'value': None, 'flag': True}, {}]
+    },
+    'no_reports': {}
+}
+
+
+def stream(data):
+    # Oqimli yozuvchilar ro'yxat emas, generatorlarni oladi
+    return {name: (row for row in rows) for name, rows in data.items()}
+
+
+@pytest.mark.parametrize('data', DATASETS.values(), ids=DATASETS.keys())
+@pytest.mark.parametrize('fmt', ['json', 'xml'])
+def test_streamed_output_matches_to_string(data, fmt):
+    f = io.StringIO()
+    summary = getattr(ResultFormatter, f"write_{fmt}")(stream(data), f)
+
+    assert f.getvalue() == getattr(ResultFormatter, f"to_{fmt}")(data)
+    assert {name: entry['count'] for name, entry in summary.items()} == {
+        name: len(rows) for name, rows in data.items()
+    }
+
+
+@pytest.mark.parametrize('fmt', ['json', 'xml', 'ndjson'])
+def test_gzip_output(tmp_path, fmt):
+    data = DATASETS['reports']
+    path = tmp_path / f"results.{fmt}.gz"
+    ResultFormatter.write_results(stream(data), fmt, str(path), compress=True)
+
+    plain = io.StringIO()
+    getattr(ResultFormatter, f"write_{fmt}")(stream(data), plain)
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        assert f.read() == plain.getvalue()
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_csv_empty_report_keeps_header(tmp_path, compress):
+    data = DATASETS['reports']
+    path = str(tmp_path / ('results.csv.gz' if compress else 'results.csv'))
+    columns = {'mixed_gender_rooms': ['room_id', 'room_name']}
+    ResultFormatter.write_results(stream(data), 'csv', path, compress=compress, columns=columns)
+
+    opener = gzip.open if compress else open
+    with opener(ResultFormatter.csv_path(path, 'mixed_gender_rooms'), 'rt', encoding='utf-8', newline='') as f:
+        assert list(csv.reader(f)) == [['room_id', 'room_name']]
+    with opener(ResultFormatter.csv_path(path, 'room_student_count'), 'rt', encoding='utf-8', newline='') as f:
+        assert list(csv.DictReader(f)) == [
+            {key: str(value) for key, value in row.items()} for row in data['room_student_count']
+        ]
+
+
+def test_csv_path():
+    assert ResultFormatter.csv_path('out/results.csv', 'a') == 'out/results.a.csv'
+    assert ResultFormatter.csv_path('out/results.csv.gz', 'a') == 'out/results.a.csv.gz'
+    assert ResultFormatter.csv_path('results', 'a') == 'results.a.csv'
@@ -0,0 +1,26 @@
+from conftest import write_json
+from src.data_loader import DataLoader
+from src.index_advisor import IndexAdvisor
+from src.indexes import IndexManager
+
+
+def test_advise_measures_write_cost_and_rolls_back(db, tmp_path):
+    rooms = write_json(tmp_path / 'rooms.json', [{'id': i, 'name': f"Room {i}"} for i in range(5)])
+    students = write_json(tmp_path / 'students.json', [
+        {'id': i, 'name': f"S{i}", 'birthday': f"{1990 + i % 20}-01-0{1 + i % 9}T00:00:00",
+         'sex': 'MF'[i % 2], 'room': i % 5}
+        for i in range(300)
+    ])
+    DataLoader(db).load_all(rooms, students)
+    IndexManager(db).create_indexes()
+    indexes = sorted(idx['name'] for idx in IndexAdvisor(db).current_indexes(db))
+
+    advisor = IndexAdvisor(db)
+    advisor.WRITE_SAMPLE = 100
+    summary = advisor.advise()['summary']
+
+    assert summary['write_rows'] == 100
+    assert summary['write_seconds_before'] > 0 and summary['write_seconds_after'] > 0
+    # Baholash hammasini qaytaradi
+    assert db.fetch_all("SELECT COUNT(*) FROM students")[0][0] == 300
+    assert sorted(idx['name'] for idx in advisor.current_indexes(db)) == indexes
@@ -0,0 +1,101 @@
+import gzip
+import json
+
+import pytest
+
+from src.loader import FileLoader, zstd
+
+
+RECORDS = [
+    {'id': 1, 'name': 'Ali "]" [, {', 'room': None},
+    {'id': 2, 'name': 'Vali \\"} ] \\\\', 'nested': {'a': [1, {'b': ']'}]}},
+    {'id': 3, 'name': "O'tkir ё\n\t", 'room': -1}
+]
+
+
+def write(path, text):
+    if str(path).endswith('.gz'):
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write(text)
+    elif str(path).endswith('.zst'):
+        path.write_bytes(zstd.ZstdCompressor().compress(text.encode('utf-8')))
+    else:
+        path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def as_array(records):
+    return '  \n[' + ',\n '.join(json.dumps(r, ensure_ascii=False) for r in records) + ']\n\n'
+
+
+def as_ndjson(records):
+    return '\n'.join(json.dumps(r, ensure_ascii=False) for r in records) + '\n\n'
+
+
+@pytest.mark.parametrize('read_size', [1, 3, 7, 1 << 20])
+@pytest.mark.parametrize('suffix', ['.json', '.json.gz', '.json.zst'])
+@pytest.mark.parametrize('render', [as_array, as_ndjson])
+def test_records_split_across_buffers(tmp_path, monkeypatch, read_size, suffix, render):
+    if suffix.endswith('.zst') and zstd is None:
+        pytest.skip("zstandard o'rnatilmagan")
+    monkeypatch.setattr(FileLoader, 'READ_SIZE', read_size)
+    path = write(tmp_path / f"students{suffix}", render(RECORDS))
+
+    assert list(FileLoader.iter_json(path)) == RECORDS
+
+
+def test_raw_array_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileLoader, 'READ_SIZE', 5)
+    path = write(tmp_path / 'students.json', as_array(RECORDS))
+
+    assert [(json.loads(text), record) for text, record in FileLoader.iter_json(path, raw=True)] == \
+        [(r, r) for r in RECORDS]
+
+
+@pytest.mark.parametrize('text', [
+    '[{"id": 1}] {"id": 2}',
+    '[{"id": 1}]]',
+    '[{"id": 1}\n',
+    '[{"id": 1}, {"id": 2',
+    '[{"id": 1}, {"id": "\\"]}]',
+    '[{"id": 1} {"id": 2}]',
+    '[{"id": 1}\n\n{"id": 2}]',
+    '[,{"id": 1}]',
+    '[{"id": 1},]',
+    '[{"id": 1},,{"id": 2}]',
+    '[,]',
+    '[,,{"id": 1},]'
+], ids=['trailing_record', 'extra_bracket', 'unclosed', 'truncated_record', 'unterminated_string',
+        'missing_comma', 'missing_comma_newline', 'leading_comma', 'trailing_comma', 'double_comma',
+        'only_comma', 'stray_commas'])
+@pytest.mark.parametrize('read_size', [2, 1 << 20])
+def test_malformed_array(tmp_path, monkeypatch, text, read_size):
+    monkeypatch.setattr(FileLoader, 'READ_SIZE', read_size)
+    path = write(tmp_path / 'students.json', text)
+
+    with pytest.raises(json.JSONDecodeError):
+        list(FileLoader.iter_json(path))
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('[]', []),
+    (' [ ] ', []),
+    ('[\n{"id": 1}\n,\n{"id": 2}\n]\n', [{'id': 1}, {'id': 2}]),
+    ('[1,"a",[2],null]', [1, 'a', [2], None]),
+    ('[12, 345.5e1, true, false]', [12, 3455.0, True, False])
+])
+@pytest.mark.parametrize('read_size', [1, 1 << 20])
+def test_array_separators(tmp_path, monkeypatch, text, expected, read_size):
+    monkeypatch.setattr(FileLoader, 'READ_SIZE', read_size)
+    path = write(tmp_path / 'students.json', text)
+
+    assert list(FileLoader.iter_json(path)) == expected == json.loads(text)
+
+
+def test_truncated_ndjson_line(tmp_path):
+    path = write(tmp_path / 'students.ndjson.gz', as_ndjson(RECORDS) + '{"id": 4, "name": "Ya')
+
+    records = FileLoader.iter_json(path)
+    assert [next(records) for _ in RECORDS] == RECORDS
+    with pytest.raises(json.JSONDecodeError):
+        next(records)
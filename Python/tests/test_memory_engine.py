@@ -0,0 +1,54 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import write_json
+from src.data_loader import DataLoader
+from src.memory_engine import MemoryReportEngine
+from src.queries import QueryExecutor
+
+
+def dataset(tmp_path, students: int = 500, seed: int = 7):
+    """Chegaraviy holatlar bilan: xona -1 va 0, xonasizlar, bo'sh xonalar, 29-fevral, vaqt qismi."""
+    rng = random.Random(seed)
+    room_ids = [-1, 0] + list(range(1, 30))
+    rooms = [{'id': room_id, 'name': f"Room #{room_id}"} for room_id in room_ids]
+    occupied = room_ids[:-5]
+
+    records = []
+    for student_id in range(students):
+        birthday = datetime(1960, 1, 1) + timedelta(days=rng.randrange(60 * 365), seconds=rng.randrange(3) * 3600)
+        if student_id % 50 == 0:
+            birthday = datetime(rng.choice([1996, 2000, 2004]), 2, 29)
+        records.append({
+            'id': student_id,
+            'name': f"Student {student_id}",
+            'birthday': birthday.isoformat(),
+            'sex': rng.choice('MF'),
+            'room': None if student_id % 17 == 0 else rng.choice(occupied)
+        })
+    # Takroriy id - oxirgi yozuv qoladi
+    records.append(dict(records[1], room=-1))
+    return write_json(tmp_path / 'rooms.json', rooms), write_json(tmp_path / 'students.json', records)
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'combined': True},
+    {'age_mode': 'cutoff'}
+])
+def test_memory_engine_matches_sql_reports(db, tmp_path, options):
+    rooms_path, students_path = dataset(tmp_path)
+    DataLoader(db).load_all(rooms_path, students_path)
+    today = db.fetch_all("SELECT CURRENT_DATE")[0][0]
+
+    expected = QueryExecutor(db, **options).execute_all_queries()
+    engine = MemoryReportEngine(chunk_size=64, today=today)
+    engine.load(rooms_path, students_path)
+    actual = engine.execute_all()
+
+    assert MemoryReportEngine.diff(expected, actual) == {}
+    # -1 xonadagi talabalar xonasizlar bilan aralashmaydi
+    counts = {row['room_id']: row['student_count'] for row in actual['room_student_count']}
+    assert counts[-1] == db.fetch_all("SELECT COUNT(*) FROM students WHERE room_id = -1")[0][0] > 0
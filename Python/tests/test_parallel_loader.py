@@ -0,0 +1,48 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from conftest import write_json
+from src import batches, parallel_loader
+from src.batches import StudentBatch
+from src.parallel_loader import ParallelDataLoader
+
+
+def students(count):
+    return [
+        {'id': i, 'name': f"Student {i}", 'birthday': '2000-01-01T00:00:00', 'sex': 'MF'[i % 2], 'room': i % 3 + 1}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_split_ids_keeps_each_id_on_one_worker(monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(parallel_loader, 'np', None)
+        monkeypatch.setattr(batches, 'np', None)
+    ids = [5, -3, 8, 2, 5, -6, 9]
+    batch = StudentBatch.from_rows([(i, f"S{i}", datetime(2000, 1, 1), 'M', None) for i in ids])
+
+    parts = ParallelDataLoader._split_ids(batch, 3)
+
+    # Bo'sh guruh tashlab yuboriladi, qatorlar tartibi saqlanadi
+    assert [(worker, [row[0] for row in part.rows()]) for worker, part in parts] == [
+        (0, [-3, -6, 9]), (2, [5, 8, 2, 5])
+    ]
+
+
+def test_duplicate_ids_across_workers_fall_back_to_merge(db, tmp_path):
+    rooms = write_json(tmp_path / 'rooms.json', [{'id': i, 'name': f"Room {i}"} for i in (1, 2, 3)])
+    records = students(400)
+    # Takroriy id lar boshqa bo'laklarda - oxirgi yozuv qoladi
+    records += [dict(records[7], name='Oxirgi'), dict(records[250], room=None)]
+    students_path = write_json(tmp_path / 'students.json', records)
+
+    started = time.perf_counter()
+    ParallelDataLoader(db, workers=4, chunk_size=50).load_all(rooms, students_path)
+
+    assert time.perf_counter() - started < 30
+    assert db.fetch_all("SELECT COUNT(*) FROM students")[0][0] == 400
+    assert db.fetch_all("SELECT name FROM students WHERE id = 7")[0][0] == 'Oxirgi'
+    assert db.fetch_all("SELECT room_id FROM students WHERE id = 250")[0][0] is None
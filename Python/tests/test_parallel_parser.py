@@ -0,0 +1,38 @@
+import json
+
+from src.parallel_parser import ParallelParser
+
+
+def write_shards(directory, shards, per_shard):
+    directory.mkdir()
+    for shard in range(shards):
+        with open(directory / f"students_{shard:02d}.ndjson", 'w', encoding='utf-8') as f:
+            for i in range(shard * per_shard, (shard + 1) * per_shard):
+                birthday = 'xato' if i % 37 == 0 else '2000-01-01T00:00:00'
+                f.write(json.dumps({'id': i, 'name': f"S{i}", 'birthday': birthday, 'sex': 'M', 'room': None}) + '\n')
+    return str(directory)
+
+
+def test_results_in_task_order_with_reused_slots(tmp_path):
+    path = write_shards(tmp_path / 'shards', shards=7, per_shard=25)
+    # 7 ta vazifa, 2 ta slot - slotlar qayta ishlatiladi
+    parser = ParallelParser(workers=2, chunk_size=10, max_pending=2)
+
+    ids, rejects, ends = [], [], []
+    for batch, chunk_rejects, end in parser.iter_results('students', path):
+        ids.extend(row[0] for row in batch.rows())
+        rejects.extend(reject['index'] for reject in chunk_rejects)
+        ends.append(end)
+
+    assert ids == [i for i in range(175) if i % 37]
+    assert rejects == [i for i in range(175) if i % 37 == 0]
+    assert ends[-1] == 175 and ends == sorted(ends)
+
+
+def test_early_stop_does_not_hang(tmp_path):
+    path = write_shards(tmp_path / 'shards', shards=4, per_shard=2000)
+    results = ParallelParser(workers=2, chunk_size=100).iter_results('students', path)
+
+    next(results)
+    # Workerlar to'lgan navbatlarda kutmoqda - generator yopilganda chiqishi kerak
+    results.close()
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+from conftest import write_json
+from src.data_loader import DataLoader
+from src.database import DatabaseManager
+from src.queries import QueryExecutor
+from src.result_cache import DataGeneration, ResultCache
+
+
+def test_server_today_from_stored_offset(tmp_path):
+    cache = ResultCache(DataGeneration(), cache_dir=str(tmp_path))
+    assert cache.server_today() is None
+
+    for offset in (14 * 3600, -12 * 3600):
+        cache.set_server_offset(offset)
+        # Yangi jarayon siljishni diskdan o'qiydi
+        reopened = ResultCache(DataGeneration(), cache_dir=str(tmp_path))
+        assert reopened.server_today() == (datetime.now(timezone.utc) + timedelta(seconds=offset)).date()
+
+
+def test_cached_reports_do_not_connect(db, tmp_path):
+    rooms = write_json(tmp_path / 'rooms.json', [{'id': 1, 'name': 'A'}, {'id': 2, 'name': 'B'}])
+    students = write_json(tmp_path / 'students.json', [
+        {'id': 1, 'name': 'Ali', 'birthday': '2001-02-03T00:00:00', 'sex': 'M', 'room': 1},
+        {'id': 2, 'name': 'Vali', 'birthday': '2003-04-05T00:00:00', 'sex': 'F', 'room': 1}
+    ])
+    DataLoader(db).load_all(rooms, students)
+    cache_dir = str(tmp_path / 'cache')
+    generation_path = str(tmp_path / 'cache' / 'generation')
+
+    expected = QueryExecutor(db, cache=ResultCache(DataGeneration(generation_path), cache_dir=cache_dir)) \
+        .execute_all_queries()
+
+    # Ulanib bo'lmaydigan server - keshdan o'qishda ulanish urinishi bo'lmasligi kerak
+    offline = DatabaseManager('/nonexistent', 'none', 'none', 'none')
+    cache = ResultCache(DataGeneration(generation_path), cache_dir=cache_dir)
+    results = QueryExecutor(offline, cache=cache).execute_all_queries()
+
+    assert results == expected
+    assert offline.connection is None
+    assert cache.stats['misses'] == 0
+
+
+def test_disk_tier_only_touches_its_own_files(tmp_path):
+    # --cache-dir data: kirish fayllari va oldingi natijalar kesh bilan bir papkada
+    foreign = ['students.json', 'rooms.json', 'results.json']
+    for name in foreign:
+        (tmp_path / name).write_text('[]', encoding='utf-8')
+    generation = DataGeneration()
+    cache = ResultCache(generation, cache_dir=str(tmp_path))
+    today = datetime(2024, 2, 29).date()
+
+    cache.put('room_student_count', None, today, [{'room_id': 1}])
+    generation.bump()
+    # Yangi avlod yozilganda eski kesh fayli o'chadi, boshqalari qoladi
+    cache.put('room_student_count', None, today, [{'room_id': 2}])
+    assert len([p for p in tmp_path.iterdir() if p.name.endswith(ResultCache.SUFFIX)]) == 1
+
+    cache.clear()
+    assert sorted(p.name for p in tmp_path.iterdir() if p.suffix == '.json') == sorted(foreign)
@@ -0,0 +1,119 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import ROOT, write_json
+from src.data_loader import DataLoader
+from src.memory_engine import MemoryReportEngine
+from src.queries import QueryExecutor
+from src.room_stats import RoomStatsManager
+
+
+ROOM_STATS_FILE = os.path.join(ROOT, 'sql', 'room_stats.sql')
+
+
+@pytest.fixture
+def room_stats(db, tmp_path):
+    rng = random.Random(3)
+    rooms = write_json(tmp_path / 'rooms.json', [{'id': i, 'name': f"Room {i}"} for i in range(-1, 8)])
+    students = write_json(tmp_path / 'students.json', [
+        {
+            'id': i,
+            'name': f"S{i}",
+            # 29-fevral va vaqt qismi bilan tug'ilgan kunlar ham
+            'birthday': (datetime(2000, 2, 29, 18) if i % 13 == 0 else
+                         datetime(1980, 1, 1) + timedelta(days=rng.randrange(30 * 365), hours=rng.choice([0, 6]))
+                         ).isoformat(),
+            'sex': rng.choice('MF'),
+            'room': None if i % 11 == 0 else rng.randrange(-1, 6)
+        }
+        for i in range(200)
+    ])
+    DataLoader(db).load_all(rooms, students)
+    manager = RoomStatsManager(db)
+    manager.install(ROOM_STATS_FILE)
+    return manager
+
+
+def assert_consistent(db, manager):
+    assert manager.check_consistency() == []
+    expected = QueryExecutor(db).execute_all_queries()
+    actual = QueryExecutor(db, use_room_stats=True).execute_all_queries()
+    assert MemoryReportEngine.diff(expected, actual) == {}
+
+
+def room_extremes(db, room_id):
+    return db.fetch_all(
+        "SELECT (SELECT id FROM students WHERE room_id = %s ORDER BY birthday, id LIMIT 1), "
+        "(SELECT id FROM students WHERE room_id = %s ORDER BY birthday DESC, id LIMIT 1)",
+        (room_id, room_id)
+    )[0]
+
+
+def test_insert(db, room_stats):
+    assert_consistent(db, room_stats)
+    db.execute_query("""
+        INSERT INTO students (id, name, birthday, sex, room_id) VALUES
+            (1000, 'Yangi', '1950-01-01', 'M', 1),
+            (1001, 'Yosh', '2020-12-31 23:00', 'F', 1),
+            (1002, 'Xonasiz', '2001-01-01', 'F', NULL),
+            (1003, 'Bo''sh xona', '1999-03-01', 'M', 7)
+    """)
+    assert_consistent(db, room_stats)
+
+
+def test_update_room_move_and_values(db, room_stats):
+    oldest, youngest = room_extremes(db, 2)
+    # Chegaraviy (min/max) talabalar boshqa xonaga ko'chadi - 2-xonada qayta hisoblanadi
+    db.execute_query("UPDATE students SET room_id = 3 WHERE id IN (%s, %s)", (oldest, youngest))
+    assert_consistent(db, room_stats)
+
+    db.execute_query("UPDATE students SET room_id = NULL WHERE room_id = 4 AND id % 2 = 0")
+    db.execute_query("UPDATE students SET room_id = 4 WHERE room_id IS NULL AND id % 3 = 0")
+    db.execute_query("UPDATE students SET sex = CASE sex WHEN 'M' THEN 'F' ELSE 'M' END WHERE room_id = 5")
+    db.execute_query("UPDATE students SET birthday = birthday + INTERVAL '1 day' WHERE room_id = -1")
+    assert_consistent(db, room_stats)
+
+
+def test_update_name_only_skips_summary(db, room_stats):
+    before = db.fetch_all("SELECT room_id, xmin::text FROM room_stats ORDER BY room_id")
+    before_counts = db.fetch_all("SELECT room_id, birth_key, xmin::text FROM room_birthday_counts ORDER BY 1, 2")
+
+    db.execute_query("UPDATE students SET name = name || ' (yangi)'")
+
+    # O'zgarmagan qatorlar uchun yig'ma jadvallar umuman yozilmaydi
+    assert db.fetch_all("SELECT room_id, xmin::text FROM room_stats ORDER BY room_id") == before
+    assert db.fetch_all("SELECT room_id, birth_key, xmin::text FROM room_birthday_counts ORDER BY 1, 2") \
+        == before_counts
+    assert_consistent(db, room_stats)
+
+
+def test_delete(db, room_stats):
+    oldest, youngest = room_extremes(db, 1)
+    db.execute_query("DELETE FROM students WHERE id IN (%s, %s)", (oldest, youngest))
+    assert_consistent(db, room_stats)
+
+    # Xonadagi oxirgi talabalar ham o'chadi
+    db.execute_query("DELETE FROM students WHERE room_id = 0")
+    assert_consistent(db, room_stats)
+
+
+def test_truncate(db, room_stats):
+    db.execute_query("TRUNCATE students")
+
+    assert db.fetch_all("SELECT COUNT(*) FROM room_stats")[0][0] == 0
+    assert db.fetch_all("SELECT COUNT(*) FROM room_birthday_counts")[0][0] == 0
+    assert_consistent(db, room_stats)
+
+
+def test_deferred_load_is_rebuilt(db, room_stats):
+    db.execute_query(f"SET LOCAL {RoomStatsManager.DEFERRED_SETTING} = 'on'", commit=False)
+    db.execute_query("INSERT INTO students (id, name, birthday, sex, room_id) VALUES (2000, 'K', '1990-05-05', 'F', 2)")
+    mismatches = room_stats.check_consistency()
+    assert sorted(m['source'] for m in mismatches) == ['room_birthday_counts', 'room_stats']
+    assert {m['room_id'] for m in mismatches} == {2}
+
+    room_stats.rebuild()
+    assert_consistent(db, room_stats)